@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+In-process serialisation microbenchmarks – no sockets, no servers.
+
+Times the codec work that every end-to-end number contains, per size:
+
+    pool_copy     [PROTOTYPE_RECORD.copy() for _ in range(n)]   (server pool build)
+    json_encode   json.dumps({"records": records}).encode()     (REST-JSON response)
+    json_decode   json.loads(body)                              (REST-JSON client)
+    pb_construct  RecordListResponse(records=records)           (dict → pb2.Record)
+    pb_encode     SerializeToString() of that message
+    pb_decode     RecordListResponse.FromString(body)           (gRPC / REST-proto client)
+
+Each case is warmed up, then timed `--repeats` times. Each sample runs the
+case in a loop for at least `--min-sample-ms`, so tiny sizes are not
+clock-bound. Samples outside Tukey's fences (1.5 × IQR) are flagged as
+outliers and left out of the summary. GC is off while timing, as with
+timeit, unless `--keep-gc` is given.
+
+Usage
+-----
+python benchmark_serialization.py
+python benchmark_serialization.py --sizes 1 100 10000 --ops json_encode pb_encode --repeats 30
+PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=python python benchmark_serialization.py --out data/serialization/pure_python.csv
+
+Writes one row per sample (`--out`) plus a per-(op, size) summary next to it
+(`<out>_summary.csv`); both carry the protobuf backend that was active.
+"""
+
+import argparse
+import gc
+import json
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmark_single_request import DEFAULT_SIZES
+from grpc_server import records_pb2 as pb2
+from utils.constants import PROTOTYPE_RECORD
+from utils.protobuf_backend import active_backend
+
+OUTPUT_FILE = Path("data/serialization/serialization_microbench.csv")
+OPS = ("pool_copy", "json_encode", "json_decode", "pb_construct", "pb_encode", "pb_decode")
+
+DEFAULT_REPEATS = 15
+DEFAULT_WARMUP = 3
+DEFAULT_MIN_SAMPLE_MS = 50.0
+IQR_FENCE = 1.5
+
+
+def build_cases(size: int) -> Dict[str, Tuple[Callable, Optional[int]]]:
+    """op → (zero-argument callable, payload bytes or None) for `size` records."""
+    records = [PROTOTYPE_RECORD.copy() for _ in range(size)]
+    json_body = json.dumps({"records": records}).encode()
+    msg = pb2.RecordListResponse(records=records)
+    pb_body = msg.SerializeToString()
+    return {
+        "pool_copy":    (lambda: [PROTOTYPE_RECORD.copy() for _ in range(size)], None),
+        "json_encode":  (lambda: json.dumps({"records": records}).encode(), len(json_body)),
+        "json_decode":  (lambda: json.loads(json_body), len(json_body)),
+        "pb_construct": (lambda: pb2.RecordListResponse(records=records), None),
+        "pb_encode":    (msg.SerializeToString, len(pb_body)),
+        "pb_decode":    (lambda: pb2.RecordListResponse.FromString(pb_body), len(pb_body)),
+    }
+
+
+def time_loops(fn: Callable, loops: int) -> int:
+    """Wall time (ns) of `loops` back-to-back calls; results are dropped as they come."""
+    t0 = perf_counter_ns()
+    for _ in range(loops):
+        fn()
+    return perf_counter_ns() - t0
+
+
+def calibrate(fn: Callable, min_sample_ns: int) -> int:
+    """Smallest loop count from 1, 2, 5, 10, 20, … whose run lasts min_sample_ns."""
+    base = 1
+    while True:
+        for loops in (base, 2 * base, 5 * base):
+            if time_loops(fn, loops) >= min_sample_ns:
+                return loops
+        base *= 10
+
+
+def run_case(fn: Callable, warmup: int, repeats: int, min_sample_ns: int,
+             keep_gc: bool) -> Tuple[list, int]:
+    """Per-call ns of each of `repeats` samples, and the loop count per sample."""
+    for _ in range(warmup):
+        fn()
+    loops = calibrate(fn, min_sample_ns)
+
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    if not keep_gc:
+        gc.disable()
+    try:
+        samples = [time_loops(fn, loops) / loops for _ in range(repeats)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples, loops
+
+
+def tukey_outliers(samples: np.ndarray) -> np.ndarray:
+    """Mask of samples outside [Q1 − 1.5·IQR, Q3 + 1.5·IQR]."""
+    q1, q3 = np.percentile(samples, [25, 75])
+    fence = IQR_FENCE * (q3 - q1)
+    return (samples < q1 - fence) | (samples > q3 + fence)
+
+
+def summarise(df: pd.DataFrame) -> pd.DataFrame:
+    kept = df[~df["outlier"]]
+    summary = kept.groupby(["op", "size"], sort=False).agg(
+        median_ns=("ns_per_call", "median"),
+        mean_ns=("ns_per_call", "mean"),
+        std_ns=("ns_per_call", "std"),
+        min_ns=("ns_per_call", "min"),
+        samples=("ns_per_call", "size"),
+        payload_bytes=("payload_bytes", "first"),
+    )
+    summary["outliers"] = df.groupby(["op", "size"], sort=False)["outlier"].sum()
+    summary["ns_per_record"] = summary["median_ns"] / summary.index.get_level_values("size")
+    summary["protobuf_backend"] = df["protobuf_backend"].iloc[0]
+    return summary.reset_index()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="In-process serialisation microbenchmarks")
+    ap.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                    help="Record counts (default: the single-request benchmark sizes)")
+    ap.add_argument("--ops", nargs="+", choices=OPS, default=list(OPS),
+                    help="Cases to time (default: all)")
+    ap.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                    help="Timed samples per case (default: %(default)s)")
+    ap.add_argument("--warmup", type=int, default=DEFAULT_WARMUP,
+                    help="Untimed calls before sampling (default: %(default)s)")
+    ap.add_argument("--min-sample-ms", type=float, default=DEFAULT_MIN_SAMPLE_MS,
+                    help="Minimum duration of one sample (default: %(default)s)")
+    ap.add_argument("--keep-gc", action="store_true",
+                    help="Leave the garbage collector enabled while timing")
+    ap.add_argument("--out", type=Path, default=OUTPUT_FILE,
+                    help="Per-sample CSV (default: %(default)s)")
+    args = ap.parse_args()
+
+    summary_csv = args.out.with_name(f"{args.out.stem}_summary.csv")
+    for path in (args.out, summary_csv):
+        if path.exists():
+            ap.error(f"{path} already exists. Remove it or choose a different --out.")
+
+    backend = active_backend()
+    min_sample_ns = int(args.min_sample_ms * 1_000_000)
+    print(f"protobuf backend: {backend} · gc {'on' if args.keep_gc else 'off'} while timing")
+
+    rows = []
+    for size in args.sizes:
+        print(f"\n=== {size:_} items ===")
+        cases = build_cases(size)
+        for op in args.ops:
+            fn, payload_bytes = cases[op]
+            samples, loops = run_case(fn, args.warmup, args.repeats, min_sample_ns,
+                                      args.keep_gc)
+            outliers = tukey_outliers(np.array(samples))
+            for i, (ns, outlier) in enumerate(zip(samples, outliers)):
+                rows.append({
+                    "op": op, "size": size, "sample": i, "loops": loops,
+                    "ns_per_call": ns, "outlier": bool(outlier),
+                    "payload_bytes": payload_bytes, "protobuf_backend": backend,
+                })
+            kept = [ns for ns, outlier in zip(samples, outliers) if not outlier]
+            print(f"  {op:<13} {np.median(kept) / 1e3:14.2f} µs   "
+                  f"{np.median(kept) / size:9.1f} ns/record   "
+                  f"({len(samples) - len(kept)} outliers, {loops} loops/sample)")
+        del cases
+
+    df = pd.DataFrame(rows)
+    df["payload_bytes"] = df["payload_bytes"].astype("Int64")      # None for pool / construct
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(args.out, index=False)
+    summarise(df).to_csv(summary_csv, index=False)
+    print(f"\n✅  Wrote {len(df)} samples to {args.out} and the summary to {summary_csv}")
+
+
+if __name__ == "__main__":
+    main()
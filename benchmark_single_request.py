@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-Unified benchmark runner for gRPC-Proto, REST-Proto and REST-JSON.
+Unified benchmark runner for gRPC-Proto, REST-Proto, REST-JSON and the
+framework-free raw TCP baseline.
 
 Usage examples
 --------------
@@ -8,12 +9,81 @@ Usage examples
 python benchmark_single_request.py grpc
 python benchmark_single_request.py rest_proto
 python benchmark_single_request.py rest_json
+python benchmark_single_request.py raw_tcp
 
 # override some knobs
 python bench.py rest_json --sizes 1 10 1000 --iterations 20
+
+# server-side aggregation instead of raw records (logged with op="aggregate")
+python benchmark_single_request.py grpc --aggregate avg
+
+# upload instead of download: client-streaming IngestRecords / POST /records/ingest
+# (logged with op="ingest" and the achieved records/s)
+python benchmark_single_request.py grpc --ingest --ingest-chunk-records 10000
+
+# parallel range fetch: sweep the shard count K per size
+python benchmark_single_request.py rest_proto --shards 1 2 4 8
+
+# one batch of 10 vs 10 sequential vs 10 concurrent single requests
+python benchmark_single_request.py grpc --batch 10
+
+# overload: 32 concurrent clients against max 4 in flight / 16 queued
+python benchmark_single_request.py rest_json --concurrency 32 --max-in-flight 4 --max-queue 16
+
+# client deadline of 200 ms; servers stop building abandoned responses
+python benchmark_single_request.py grpc --deadline-ms 200 --cancel-chunk-records 50000
+
+# REST only: plain GET vs GET revalidated against a warm client cache (304)
+python benchmark_single_request.py rest_json --conditional
+
+# REST only: decode after the last byte vs incrementally while receiving
+python benchmark_single_request.py rest_proto --stream
+
+# serialise responses of >= 100k records on a process pool; sample loop lag
+python benchmark_single_request.py grpc --offload-threshold 100000 --offload-pool process --loop-lag
+
+# GC pause / loop-lag overlap tags on every server line, with the pool frozen out of GC
+python benchmark_single_request.py rest_json --instrument --gc-freeze
+
+# tracemalloc 10% of the server requests and 10% of the client runs
+python benchmark_single_request.py rest_proto --trace-alloc 0.1
+
+# REST only: bare ASGI callable instead of the FastAPI app (server lines carry app="asgi")
+python benchmark_single_request.py rest_proto --bare-asgi --sizes 1 10 100
+
+# raw TCP lower bound with JSON payloads instead of protobuf
+python benchmark_single_request.py raw_tcp --encoding json
+
+# protobuf runtime backends as a dimension (lines carry protobuf_backend)
+python benchmark_single_request.py grpc --protobuf-backends upb python
+
+# WAN conditions on one machine: clients go through netem_proxy.py (40 ms RTT, 50 Mbit/s)
+python benchmark_single_request.py rest_json --netem-delay-ms 20 --netem-jitter-ms 2 --netem-rate-mbit 50
+
+# TCP loopback vs Unix domain socket, one server per transport (lines carry transport)
+python benchmark_single_request.py rest_proto --transports tcp uds
+
+# server on CPUs 0-1, clients on 2, pid monitors / proxy on 3, server and clients at nice -5
+python benchmark_single_request.py grpc --pin server=0-1 client=2 monitor=3 proxy=3 --nice -5
+
+# heavy-tailed mix of request sizes from 8 concurrent clients against one server;
+# small requests are split by whether a large one was in flight (convert_jsonl_to_csv_mix)
+python benchmark_single_request.py rest_json --mix zipf:a=1.5,scale=10 --mix-requests 200 --concurrency 8
+
+# hedge after the p95 of earlier latencies (50 ms until 20 requests are logged), under load
+python benchmark_single_request.py grpc --hedge-percentile 95 --hedge-delay-ms 50 --concurrency 8
+
+# build the record pool after binding (lazy / background) instead of before it;
+# start-up phases are logged for every server (convert_jsonl_to_csv_startup)
+python benchmark_single_request.py rest_json --pool-build background --sizes 1000000
+
+# collapsed-stack profiles of server and clients per size (compare with profile_diff.py)
+python benchmark_single_request.py grpc --profile --sizes 100000
 """
 
 import argparse
+import json
+import shutil
 import signal
 import subprocess
 import sys
@@ -21,7 +91,18 @@ import time
 from contextlib import suppress
 from pathlib import Path
 import socket
+import tempfile
 from utils.timeline_anchor import write_timeline_anchor
+from utils.aggregation import AGG_FUNCS, GROUP_BY_KEYS, DEFAULT_BUCKET_SECONDS, DEFAULT_GROUP_BY
+from utils.constants import BATCH_STRATEGIES
+from utils.offload import OFFLOAD_POOLS
+from utils.framing import ENCODINGS
+from utils.protobuf_backend import PROTOBUF_BACKENDS, available_backends, backend_env
+from netem_proxy import LinkProfile
+from utils.uds import TRANSPORTS
+from utils.cpu_pinning import PIN_ROLES, CpuPlan, cpu_topology
+from utils.size_mix import DEFAULT_MIX_REQUESTS, parse_mix
+from utils.startup import POOL_BUILDS, append_phase
 # --------------------------------------------------------------------------- #
 # Per-variant static configuration                                            #
 # --------------------------------------------------------------------------- #
@@ -32,6 +113,8 @@ HOST = "127.0.0.1"
 DEFAULT_ITERATION = 100
 DEFAULT_SIZES = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
 DEFAULT_PAUSE_SECONDS = 30
+# with --netem-*, clients connect to the proxy on the server port + this
+NETEM_PORT_OFFSET = 1000
 
 CFG = {
     "grpc": {
@@ -52,27 +135,46 @@ CFG = {
         "port": 8001,
         "logger_prefix": "rest_json",
     },
+    "raw_tcp": {
+        "server_file":  "raw_tcp_server/server.py",
+        "client_file":  "raw_tcp_server/single_request_client.py",
+        "port": 8002,
+        "logger_prefix": "raw_tcp",
+    },
 }
 
 
-def wait_for_port(mode: str, timeout: float = 30.0, interval: float = 0.1):
+def wait_for_port(mode: str, timeout: float = 30.0, interval: float = 0.1,
+                  port: int = None, uds: Path = None):
     """
-    Block until a TCP socket at (host, port) accepts connections, or
-    raise TimeoutError after timeout seconds.
+    Block until a TCP socket at (host, port), or the Unix socket `uds`,
+    accepts connections, or raise TimeoutError after timeout seconds.
     """
-    port = CFG[mode]["port"]
+    port = port or CFG[mode]["port"]
     deadline = time.time() + timeout
     while True:
         try:
-            with socket.create_connection((HOST, port), timeout=interval):
-                return
+            if uds is not None:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.settimeout(interval)
+                    sock.connect(str(uds))
+            else:
+                with socket.create_connection((HOST, port), timeout=interval):
+                    pass
+            return
         except OSError:
             if time.time() > deadline:
-                raise TimeoutError(f"Timed out waiting for {HOST}:{port}")
+                raise TimeoutError(f"Timed out waiting for {uds or f'{HOST}:{port}'}")
             time.sleep(interval)
 
 
-def start_server(mode: str, count: int) -> subprocess.Popen:
+def uds_path(mode: str) -> Path:
+    """Socket file of the mode's server under --transports uds."""
+    return Path(tempfile.gettempdir()) / f"benchmark-{mode}.sock"
+
+
+def start_server(mode: str, count: int, extra_args: list = (),
+                 env: dict = None, *, cpu_plan: CpuPlan) -> subprocess.Popen:
     cfg = CFG[mode]
     server_log = f"{LOG_DIR}/{mode}/server-{count}-items.jsonl"
 
@@ -83,37 +185,72 @@ def start_server(mode: str, count: int) -> subprocess.Popen:
         "--pool-size", str(count),
         "--logger-name", f"{cfg['logger_prefix']}-server-{count}",
         "--log-file", str(server_log),
+        *extra_args,
+        "--spawn-ns", str(time.perf_counter_ns()),
     ]
     # silence server stdout / stderr
     return subprocess.Popen(cmd, stdout=subprocess.DEVNULL,
-                            stderr=subprocess.STDOUT)
+                            stderr=subprocess.STDOUT, env=env,
+                            preexec_fn=cpu_plan.preexec("server"))
+
+
+def start_proxy(mode: str, link: LinkProfile, cpu_plan: CpuPlan) -> subprocess.Popen:
+    """netem_proxy.py in front of the mode's server, on its port + NETEM_PORT_OFFSET."""
+    port = CFG[mode]["port"]
+    cmd = [
+        sys.executable, "netem_proxy.py",
+        "--listen-host", HOST,
+        "--listen-port", str(port + NETEM_PORT_OFFSET),
+        "--target-host", HOST,
+        "--target-port", str(port),
+        "--delay-ms", str(link.delay_ms),
+        "--jitter-ms", str(link.jitter_ms),
+        "--rate-mbit", str(link.rate_mbit),
+        "--burst-kb", str(link.burst_kb),
+    ]
+    return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT,
+                            preexec_fn=cpu_plan.preexec("proxy"))
+
+
+def start_monitor(pid: int, log_file: str, cpu_plan: CpuPlan) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "pid_monitor.py", str(pid), str(log_file), "--append"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT,
+        preexec_fn=cpu_plan.preexec("monitor"),
+    )
 
 
-def run_client(mode: str, count: int) -> int:
+def run_client(mode: str, count: int, extra_args: list = (), log_suffix: str = "",
+               concurrency: int = 1, env: dict = None, usage_suffix: str = "",
+               port: int = None, *, cpu_plan: CpuPlan) -> int:
+    """
+    Run `concurrency` client processes at once and wait for all of them.
+    Only the first one is sampled by pid_monitor (they share one usage log).
+    Returns the first non-zero exit code, or 0.
+    """
     cfg = CFG[mode]
-    client_log = f"{LOG_DIR}/{mode}/client-{count}-items.jsonl"
-    client_monitoring_log = f"{LOG_DIR}/{mode}/usage-client-{count}-items.jsonl"
+    client_log = f"{LOG_DIR}/{mode}/client-{count}-items{log_suffix}.jsonl"
+    client_monitoring_log = f"{LOG_DIR}/{mode}/usage-client-{count}-items{usage_suffix}.jsonl"
 
     cmd = [
         sys.executable, cfg["client_file"],
         "--host", HOST,
-        "--port", str(cfg["port"]),
+        "--port", str(port or cfg["port"]),
         "--count", str(count),
         "--logger-name", f"{cfg['logger_prefix']}-client-{count}",
         "--log-file", str(client_log),
+        *extra_args,
     ]
 
-    # spawn client + monitor
-    proc = subprocess.Popen(cmd)
-    monitoring_proc = subprocess.Popen(
-        [sys.executable, "pid_monitor.py", str(proc.pid), client_monitoring_log],
-        stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT,
-    )
+    # spawn clients + monitor
+    procs = [subprocess.Popen(cmd, env=env, preexec_fn=cpu_plan.preexec("client"))
+             for _ in range(concurrency)]
+    monitoring_proc = start_monitor(procs[0].pid, client_monitoring_log, cpu_plan)
 
-    rc = proc.wait()
+    rcs = [proc.wait() for proc in procs]
     monitoring_proc.terminate()
     monitoring_proc.wait()
-    return rc
+    return next((rc for rc in rcs if rc), 0)
 
 
 def stop_server(proc: subprocess.Popen) -> None:
@@ -133,46 +270,331 @@ def main() -> None:
                     help="Record counts to request")
     ap.add_argument("--pause", type=int, default=DEFAULT_PAUSE_SECONDS,
                     help="Seconds to wait for server start / final cool-off")
+    fan_out = ap.add_mutually_exclusive_group()
+    fan_out.add_argument("--shards", type=int, nargs="+",
+                         help="Shard counts K to sweep with the parallel range-fetch client "
+                              "(logged to client-<size>-items-sharded.jsonl)")
+    fan_out.add_argument("--batch", type=int,
+                         help="Compare one batch of N slices against N sequential and N "
+                              "concurrent single requests (logged to client-<size>-items-batch.jsonl)")
+    fan_out.add_argument("--mix", type=parse_mix, metavar="SPEC",
+                         help="Mixed-size workload instead of --sizes: each client draws its request "
+                              "counts from SPEC, e.g. zipf:a=1.5,scale=10 / lognormal:median=10,sigma=2.5 "
+                              "/ histogram:10=99,1000000=1 (logged to client-<max>-items-mix.jsonl)")
+    ap.add_argument("--mix-requests", type=int, default=DEFAULT_MIX_REQUESTS,
+                    help="With --mix: requests per client process and run (default: %(default)s)")
+    ap.add_argument("--concurrency", type=int, default=1,
+                    help="Client processes launched at once per run (default: %(default)s)")
+    ap.add_argument("--max-in-flight", type=int,
+                    help="Server admission control: max concurrently executing requests")
+    ap.add_argument("--max-queue", type=int,
+                    help="Server admission control: max requests waiting for a slot")
+    ap.add_argument("--queue-timeout-ms", type=float,
+                    help="Server admission control: max wait for a slot before rejection")
+    ap.add_argument("--deadline-ms", type=float,
+                    help="Client-side deadline per request")
+    ap.add_argument("--hedge-percentile", type=float, metavar="P",
+                    help="gRPC / REST: send a duplicate request on a second connection once this "
+                         "percentile of the client's earlier latencies has passed")
+    ap.add_argument("--hedge-delay-ms", type=float,
+                    help="gRPC / REST: fixed hedge delay (with --hedge-percentile: until there "
+                         "is enough history)")
+    ap.add_argument("--cancel-chunk-records", type=int,
+                    help="Servers build responses this many records at a time and stop "
+                         "when the caller has gone away")
+    ap.add_argument("--conditional", action="store_true",
+                    help="REST only: compare plain GET /records with If-None-Match "
+                         "revalidation (logged to client-<size>-items-conditional.jsonl)")
+    ap.add_argument("--offload-threshold", type=int,
+                    help="Servers serialise responses of at least this many records on a worker pool")
+    ap.add_argument("--offload-pool", choices=OFFLOAD_POOLS,
+                    help="Worker pool for offloaded serialisation (thread / process)")
+    ap.add_argument("--offload-workers", type=int,
+                    help="Worker threads / processes for offloaded serialisation")
+    ap.add_argument("--loop-lag", action="store_true",
+                    help="Sample the server's event-loop lag "
+                         "(logged to loop-lag-server-<size>-items.jsonl)")
+    ap.add_argument("--instrument", action="store_true",
+                    help="Servers time GC pauses and tag each line with overlapping GC / loop lag "
+                         "(collections logged to gc-server-<size>-items.jsonl)")
+    ap.add_argument("--gc-freeze", action="store_true",
+                    help="Servers gc.freeze() after building the record pool")
+    ap.add_argument("--pool-build", choices=POOL_BUILDS,
+                    help="When servers build the record pool: before binding (eager, the "
+                         "default), on the first request (lazy) or on a background thread")
+    ap.add_argument("--trace-alloc", type=float, metavar="RATE",
+                    help="Trace allocations of this fraction of requests (servers and clients)")
+    ap.add_argument("--profile", action="store_true",
+                    help="Sample server and client stacks into "
+                         "profile-{server,client}-<size>-items.collapsed (see profile_diff.py)")
+    ap.add_argument("--stream", action="store_true",
+                    help="REST only: compare buffered with incremental decoding "
+                         "(logged to client-<size>-items-stream.jsonl)")
+    ap.add_argument("--bare-asgi", action="store_true",
+                    help="REST only: servers answer POST /records from a bare ASGI callable "
+                         "instead of FastAPI")
+    ap.add_argument("--encoding", choices=ENCODINGS,
+                    help="raw_tcp only: payload encoding (default: proto)")
+    ap.add_argument("--protobuf-backends", nargs="*", choices=PROTOBUF_BACKENDS,
+                    help="Protobuf stacks: run each size once per protobuf runtime backend "
+                         "(no value = every backend that loads here)")
+    ap.add_argument("--transports", nargs="+", choices=TRANSPORTS,
+                    help="Run each size once per transport: TCP loopback and / or a Unix "
+                         "domain socket (default: tcp)")
+    ap.add_argument("--pin", nargs="+", default=[], metavar="ROLE=CPUS",
+                    help="CPU affinity per role, e.g. server=0-1 client=2 monitor=3 "
+                         f"(roles: {', '.join(PIN_ROLES)})")
+    ap.add_argument("--nice", type=int,
+                    help="Niceness of server and clients; negative raises priority (needs root)")
+    ap.add_argument("--netem-delay-ms", type=float,
+                    help="Route clients through netem_proxy.py with this one-way delay")
+    ap.add_argument("--netem-jitter-ms", type=float,
+                    help="netem proxy: uniform ± jitter around the delay")
+    ap.add_argument("--netem-rate-mbit", type=float,
+                    help="netem proxy: bandwidth cap per direction")
+    ap.add_argument("--netem-burst-kb", type=float,
+                    help="netem proxy: largest burst released at once under the rate cap")
+    ap.add_argument("--aggregate", choices=AGG_FUNCS,
+                    help="Request a server-side aggregate instead of the raw records")
+    ap.add_argument("--group-by", choices=GROUP_BY_KEYS, default=DEFAULT_GROUP_BY)
+    ap.add_argument("--bucket-seconds", type=int, default=DEFAULT_BUCKET_SECONDS)
+    ap.add_argument("--ingest", action="store_true",
+                    help="Upload each size to the server's ingest endpoint instead of fetching it")
+    ap.add_argument("--ingest-chunk-records", type=int,
+                    help="grpc only: records per IngestRequest stream message "
+                         "(default: the client's)")
 
     args = ap.parse_args()
+    if args.conditional and args.mode not in ("rest_proto", "rest_json"):
+        ap.error("--conditional needs an HTTP stack (rest_proto or rest_json)")
+    if args.stream and args.mode not in ("rest_proto", "rest_json"):
+        ap.error("--stream needs an HTTP stack (rest_proto or rest_json)")
+    if args.bare_asgi:
+        if args.mode not in ("rest_proto", "rest_json"):
+            ap.error("--bare-asgi needs an HTTP stack (rest_proto or rest_json)")
+        # the bare app only serves POST /records
+        for flag in ("batch", "aggregate", "cancel_chunk_records"):
+            if getattr(args, flag) is not None:
+                ap.error(f"--{flag.replace('_', '-')} needs the FastAPI app")
+        for flag in ("conditional", "ingest"):
+            if getattr(args, flag):
+                ap.error(f"--{flag} needs the FastAPI app")
+    if args.ingest:
+        if args.mode == "raw_tcp":
+            ap.error("--ingest is not supported by raw_tcp")
+        for flag in ("shards", "batch", "aggregate"):
+            if getattr(args, flag) is not None:
+                ap.error(f"--ingest cannot be combined with --{flag}")
+        for flag in ("conditional", "stream"):
+            if getattr(args, flag):
+                ap.error(f"--ingest cannot be combined with --{flag}")
+    if args.ingest_chunk_records is not None and not (args.ingest and args.mode == "grpc"):
+        ap.error("--ingest-chunk-records needs grpc --ingest")
+    if args.mix:
+        for flag in ("aggregate", "deadline_ms"):
+            if getattr(args, flag) is not None:
+                ap.error(f"--mix cannot be combined with --{flag.replace('_', '-')}")
+        for flag in ("conditional", "stream", "ingest"):
+            if getattr(args, flag):
+                ap.error(f"--mix cannot be combined with --{flag}")
+    if args.deadline_ms is not None:
+        # the clients only give the plain fetch a deadline
+        for flag in ("shards", "batch", "aggregate"):
+            if getattr(args, flag) is not None:
+                ap.error(f"--deadline-ms cannot be combined with --{flag}")
+        for flag in ("conditional", "stream", "ingest"):
+            if getattr(args, flag):
+                ap.error(f"--deadline-ms cannot be combined with --{flag}")
+    if args.hedge_percentile is not None or args.hedge_delay_ms is not None:
+        if args.mode == "raw_tcp":
+            ap.error("hedging is not supported by raw_tcp")
+        for flag in ("shards", "batch", "aggregate", "deadline_ms"):
+            if getattr(args, flag) is not None:
+                ap.error(f"hedging cannot be combined with --{flag.replace('_', '-')}")
+        for flag in ("conditional", "stream", "ingest"):
+            if getattr(args, flag):
+                ap.error(f"hedging cannot be combined with --{flag}")
+    if args.gc_freeze and args.pool_build not in (None, "eager"):
+        ap.error("--gc-freeze needs --pool-build eager")
+    if args.encoding and args.mode != "raw_tcp":
+        ap.error("--encoding only applies to raw_tcp")
+    if args.mode == "raw_tcp":
+        # the baseline only implements the plain record-list request
+        for flag in ("shards", "batch", "aggregate", "deadline_ms", "cancel_chunk_records"):
+            if getattr(args, flag) is not None:
+                ap.error(f"--{flag.replace('_', '-')} is not supported by raw_tcp")
+
+    backends = [None]               # None: whatever the environment selects
+    if args.protobuf_backends is not None:
+        if args.mode == "rest_json":
+            ap.error("--protobuf-backends needs a protobuf stack")
+        available = available_backends()
+        backends = args.protobuf_backends or available
+        missing = [b for b in backends if b not in available]
+        if missing:
+            ap.error(f"protobuf backend(s) {', '.join(missing)} do not load here "
+                     f"(available: {', '.join(available)})")
+
+    link = None
+    netem = {name: getattr(args, f"netem_{name}") for name in LinkProfile._fields}
+    if any(value is not None for value in netem.values()):
+        link = LinkProfile(**{name: value for name, value in netem.items() if value is not None})
+    client_port = CFG[args.mode]["port"] + NETEM_PORT_OFFSET if link else None
+
+    try:
+        cpu_plan = CpuPlan.from_specs(args.pin, args.nice)
+        cpu_plan.check_nice()
+    except (ValueError, PermissionError) as exc:
+        ap.error(str(exc))
+
+    transports = args.transports or ["tcp"]
+    if link and "uds" in transports:
+        ap.error("the netem proxy is TCP only; drop uds from --transports")
+
+    client_args = []
+    if args.deadline_ms is not None:
+        client_args += ["--deadline-ms", str(args.deadline_ms)]
+    if args.trace_alloc:
+        client_args += ["--trace-alloc", str(args.trace_alloc)]
+    if args.encoding:
+        client_args += ["--encoding", args.encoding]
+    if args.ingest:
+        client_args += ["--ingest"]
+    for flag in ("hedge_percentile", "hedge_delay_ms"):
+        value = getattr(args, flag)
+        if value is not None:
+            client_args += [f"--{flag.replace('_', '-')}", str(value)]
+    if args.ingest_chunk_records is not None:
+        client_args += ["--ingest-chunk-records", str(args.ingest_chunk_records)]
+    if args.aggregate:
+        client_args += ["--aggregate", args.aggregate,
+                        "--group-by", args.group_by,
+                        "--bucket-seconds", str(args.bucket_seconds)]
+
+    server_args = []
+    for flag in ("max_in_flight", "max_queue", "queue_timeout_ms", "cancel_chunk_records",
+                 "offload_threshold", "offload_pool", "offload_workers", "trace_alloc",
+                 "pool_build"):
+        value = getattr(args, flag)
+        if value is not None:
+            server_args += [f"--{flag.replace('_', '-')}", str(value)]
+    if args.gc_freeze:
+        server_args += ["--gc-freeze"]
+    if args.bare_asgi:
+        server_args += ["--bare-asgi"]
 
     log_dir = Path(f"{LOG_DIR}/{args.mode}")
     log_dir.mkdir(parents=True, exist_ok=True)
-
-    for size in args.sizes:
+    topology = cpu_topology()
+    # one line per run: an anchor's topology is the last line written before it
+    with open(log_dir / "cpu_topology.jsonl", "a") as fh:
+        fh.write(json.dumps({"epoch_ns": time.time_ns(), **topology}) + "\n")
+
+    # a mix runs one server whose pool covers the largest count it can draw
+    sizes = [args.mix.max_count] if args.mix else args.sizes
+    for size in sizes:
         print(f"\n=== {size:_} items · {args.iterations} runs "
               f"({args.mode}) ===")
 
-        print(f"🔧  Starting {args.mode} server …")
-
         # Add a timeanchor to convert perf_base_ns to normal timestamp
-        write_timeline_anchor(f"{log_dir}/time_anchor.jsonl", mode=args.mode, size=size)
-
-        server_proc = start_server(args.mode, size)
-
-        monitoring_log = f"{log_dir}/usage-server-{size}-items.jsonl"
-        monitoring_proc = subprocess.Popen(
-            [sys.executable, "pid_monitor.py", str(server_proc.pid), str(monitoring_log)],
-            stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT,
-        )
-
-        wait_for_port(args.mode)
-
-        try:
-            for i in range(1, args.iterations + 1):
-                print(f"  📥  Run {i:3d}/{args.iterations} … ", end="", flush=True)
-                rc = run_client(args.mode, size)
-                if rc:
-                    print(f"⚠️  client exit={rc}")
-                    break
-                print("✅")
-        finally:
-            print("🛑  Shutting down server …")
-            stop_server(server_proc)
-            monitoring_proc.terminate()
-            monitoring_proc.wait()
-            print(f"\n🏁  Pausing {args.pause}s before starting the next server")
-            time.sleep(args.pause)
+        write_timeline_anchor(f"{log_dir}/time_anchor.jsonl", mode=args.mode, size=size,
+                              cpu_governor=topology["governor"],
+                              **cpu_plan.anchor_fields(),
+                              **(link.anchor_fields() if link else {}))
+
+        for backend, transport in [(b, t) for b in backends for t in transports]:
+            # a backend / transport sweep keeps each server's side files apart
+            variant = (f"-pb-{backend}" if backend else "") + ("-uds" if transport == "uds" else "")
+            env = backend_env(backend)
+            if backend:
+                print(f"🧬  protobuf backend: {backend}")
+            uds = uds_path(args.mode) if transport == "uds" else None
+            if uds:
+                print(f"🔌  transport: unix:{uds}")
+
+            print(f"🔧  Starting {args.mode} server …")
+
+            startup_log = f"{log_dir}/startup-server-{size}-items{variant}.jsonl"
+            size_server_args = list(server_args) + ["--startup-log", startup_log]
+            if uds:
+                size_server_args += ["--uds", str(uds)]
+            if args.loop_lag:
+                size_server_args += ["--loop-lag-log", f"{log_dir}/loop-lag-server-{size}-items{variant}.jsonl"]
+            if args.instrument:
+                size_server_args += ["--instrument", "--gc-log", f"{log_dir}/gc-server-{size}-items{variant}.jsonl"]
+            if args.profile:
+                size_server_args += ["--profile-out", f"{log_dir}/profile-server-{size}-items{variant}.collapsed"]
+
+            server_proc = start_server(args.mode, size, size_server_args, env, cpu_plan=cpu_plan)
+
+            monitoring_log = f"{log_dir}/usage-server-{size}-items{variant}.jsonl"
+            monitoring_proc = start_monitor(server_proc.pid, monitoring_log, cpu_plan)
+
+            wait_for_port(args.mode, uds=uds)
+            append_phase(startup_log, "port_open", time.perf_counter_ns(), server_proc.pid)
+            proxy_proc = None
+            if link:
+                print(f"🌐  netem proxy on :{client_port}")
+                proxy_proc = start_proxy(args.mode, link, cpu_plan)
+                wait_for_port(args.mode, port=client_port)
+
+            size_client_args = list(client_args)
+            if uds:
+                size_client_args += ["--uds", str(uds)]
+            if args.profile:
+                size_client_args += ["--profile-out", f"{log_dir}/profile-client-{size}-items{variant}.collapsed"]
+
+            # (label, client args, client-log suffix) for each pass over the iterations
+            passes = [(None, size_client_args, "")]
+            if args.shards:
+                passes = [(f"K={k} shards", size_client_args + ["--shards", str(k)], "-sharded")
+                          for k in args.shards]
+            elif args.batch:
+                passes = [(f"{args.batch} × {strategy}",
+                           size_client_args + ["--batch", str(args.batch), "--batch-strategy", strategy],
+                           "-batch")
+                          for strategy in BATCH_STRATEGIES]
+            elif args.mix:
+                passes = [(f"mix {args.mix.spec} × {args.mix_requests} requests",
+                           size_client_args + ["--mix", args.mix.spec,
+                                               "--mix-requests", str(args.mix_requests)],
+                           "-mix")]
+            elif args.conditional:
+                cache_dir = log_dir / "cache"
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                # the first conditional run misses and fills the cache, the rest revalidate
+                passes = [("GET full", size_client_args + ["--get"], "-conditional"),
+                          ("GET conditional",
+                           size_client_args + ["--get", "--cache-dir", str(cache_dir)],
+                           "-conditional")]
+            elif args.stream:
+                passes = [("buffered decode", size_client_args, "-stream"),
+                          ("streaming decode", size_client_args + ["--stream"], "-stream")]
+
+            try:
+                for label, run_args, log_suffix in passes:
+                    if label:
+                        print(f"  🔀  {label}")
+
+                    for i in range(1, args.iterations + 1):
+                        print(f"  📥  Run {i:3d}/{args.iterations} … ", end="", flush=True)
+                        rc = run_client(args.mode, size, run_args, log_suffix,
+                                        args.concurrency, env, variant, client_port,
+                                        cpu_plan=cpu_plan)
+                        if rc:
+                            print(f"⚠️  client exit={rc}")
+                            break
+                        print("✅")
+            finally:
+                if proxy_proc is not None:
+                    proxy_proc.terminate()
+                    proxy_proc.wait()
+                print("🛑  Shutting down server …")
+                stop_server(server_proc)
+                monitoring_proc.terminate()
+                monitoring_proc.wait()
+                print(f"\n🏁  Pausing {args.pause}s before starting the next server")
+                time.sleep(args.pause)
 
     print("\n🏁  All benchmarks finished.")
 
@@ -1,20 +1,61 @@
 #!/usr/bin/env python3
 import argparse
 from pathlib import Path
+import re
 import sys
 
 import numpy as np
 import pandas as pd
 
+from utils.startup import PHASES
+from utils.usage_attribution import attribute, prepare_samples
+
 INPUT_DATA_DIR = Path("data/single_request")
 OUTPUT_DATA_DIR = Path("data/single_request")
 ANCHOR_FILE_NAME = "time_anchor.jsonl"
+VARIANT_SUFFIX = re.compile(r"(?:-pb-(?P<backend>[a-z]+))?(?P<uds>-uds)?")
 
 
 def load_jsonl(path: Path) -> pd.DataFrame:
     return pd.read_json(path, lines=True)
 
 
+def load_anchors(anchor_path: Path) -> pd.DataFrame:
+    """
+    Anchors in run order. A size benchmarked again gets a new anchor, so each
+    one owns the lines from its perf_base_ns up to the next anchor of the
+    same size (`perf_end_ns`, NaN for the latest).
+    """
+    anchors = load_jsonl(anchor_path).sort_values("epoch_base_ns")
+    anchors["perf_end_ns"] = anchors.groupby("size")["perf_base_ns"].shift(-1)
+    return anchors
+
+
+def within_anchor(df: pd.DataFrame, ts_col: str, anchor) -> pd.DataFrame:
+    """The rows of `df` whose `ts_col` (perf_counter_ns) falls in the anchor's run."""
+    if df.empty:
+        return df
+    df = df[df[ts_col] >= anchor.perf_base_ns]
+    if pd.notna(anchor.perf_end_ns):
+        df = df[df[ts_col] < anchor.perf_end_ns]
+    return df
+
+
+def variant_files(protocol_dir: Path, stem: str) -> list:
+    """
+    "<stem>.jsonl" plus the "<stem>[-pb-<backend>][-uds].jsonl" files a
+    protobuf backend / transport sweep writes per server, as
+    (path, {"protobuf_backend": backend or None, "transport": "tcp" / "uds"}) pairs.
+    """
+    files = []
+    for path in sorted(protocol_dir.glob(f"{stem}*.jsonl")):
+        match = VARIANT_SUFFIX.fullmatch(path.name[len(stem):-len(".jsonl")])
+        if match:
+            files.append((path, {"protobuf_backend": match["backend"],
+                                 "transport": "uds" if match["uds"] else "tcp"}))
+    return files
+
+
 def convert_jsonl_to_csv_latency(
     output_file_name: str = "single_request_latency.csv"
 ):
@@ -38,7 +79,7 @@ def convert_jsonl_to_csv_latency(
             print(f"  ⚠️  No anchor file, skipping {protocol_dir.name}")
             continue
 
-        anchors = load_jsonl(anchor_path)
+        anchors = load_anchors(anchor_path)
         for anchor in anchors.itertuples(index=False):
             size       = int(anchor.size)
             perf_base  = anchor.perf_base_ns
@@ -52,12 +93,19 @@ def convert_jsonl_to_csv_latency(
 
             df_c = load_jsonl(client_f)  # t0, t_req, t_res, req_id
             df_s = load_jsonl(server_f)  # t_in, t_out, req_id
+            df_c = within_anchor(df_c, "t0", anchor)
 
-            df = df_c.merge(df_s, on="req_id", how="inner")
+            # fields both sides log (e.g. alloc_*) keep their origin
+            df = df_c.merge(df_s, on="req_id", how="inner",
+                            suffixes=("_client", "_server"))
             df["mode"]           = protocol_dir.name
             df["size"]           = size
             df["perf_base_ns"]   = perf_base
             df["epoch_base_ns"]  = epoch_base
+            # run-wide settings recorded with the anchor (e.g. netem_*)
+            for field in anchors.columns.difference(["mode", "size", "perf_base_ns", "epoch_base_ns",
+                                                     "perf_end_ns"]):
+                df[field] = getattr(anchor, field)
 
             frames.append(df)
 
@@ -73,6 +121,8 @@ def convert_jsonl_to_csv_latency(
         "perf_base_ns", "epoch_base_ns",
         "req_size_bytes", "res_size_bytes",
     ]
+    # keep any optional per-request fields (e.g. op / func) after the base ones
+    cols += [c for c in combined.columns if c not in cols]
     combined = combined[cols]
 
     # write it out
@@ -80,13 +130,482 @@ def convert_jsonl_to_csv_latency(
     print(f"✅  Wrote {len(combined)} rows to {output_csv}")
 
 
+def convert_jsonl_to_csv_fan_out(
+    client_suffix: str,
+    output_file_name: str,
+    dimension_cols: list,
+):
+    """
+    Merge client runs that issue several server calls per logged request
+    ("client-<size>-items-<client_suffix>.jsonl").
+
+    The server logs fanned-out calls as "<req_id>-<i>"; those are folded back
+    onto the client request as the earliest t_in and the latest t_out.
+    """
+    output_csv = OUTPUT_DATA_DIR / output_file_name
+    print(f"Generating CSV: {output_csv}…")
+
+    if output_csv.exists():
+        raise FileExistsError(
+            f"{output_csv} already exists. Remove it or choose a different name."
+        )
+
+    frames = []
+    for protocol_dir in sorted(INPUT_DATA_DIR.iterdir()):
+        if not protocol_dir.is_dir():
+            continue
+
+        anchor_path = protocol_dir / ANCHOR_FILE_NAME
+        if not anchor_path.exists():
+            continue
+
+        anchors = load_anchors(anchor_path)
+        for anchor in anchors.itertuples(index=False):
+            size = int(anchor.size)
+            client_f = protocol_dir / f"client-{size}-items-{client_suffix}.jsonl"
+            server_f = protocol_dir / f"server-{size}-items.jsonl"
+            if not (client_f.exists() and server_f.exists()):
+                continue
+
+            print(f"Processing {client_suffix} latency: {protocol_dir.name} size={size}")
+            df_c = within_anchor(load_jsonl(client_f), "t0", anchor)
+            df_s = load_jsonl(server_f)
+
+            df_s = df_s.assign(req_id=df_s["req_id"].str.replace(r"-\d+$", "", regex=True))
+            df_s = df_s.groupby("req_id", as_index=False).agg(
+                t_in=("t_in", "min"), t_out=("t_out", "max")
+            )
+
+            df = df_c.merge(df_s, on="req_id", how="inner")
+            df["mode"]           = protocol_dir.name
+            df["size"]           = size
+            df["perf_base_ns"]   = anchor.perf_base_ns
+            df["epoch_base_ns"]  = anchor.epoch_base_ns
+            frames.append(df)
+
+    if not frames:
+        print(f"No {client_suffix} runs found under {INPUT_DATA_DIR}. Skipping.")
+        return
+
+    combined = pd.concat(frames, ignore_index=True)
+    cols = [
+        "mode", "size", *dimension_cols, "req_id",
+        "t0", "t_req", "t_res",
+        "t_in", "t_out",
+        "perf_base_ns", "epoch_base_ns",
+        "req_size_bytes", "res_size_bytes",
+    ]
+    combined = combined[cols]
+
+    combined.to_csv(output_csv, index=False)
+    print(f"✅  Wrote {len(combined)} rows to {output_csv}")
+    return combined
+
+
+def convert_jsonl_to_csv_shards(
+    output_file_name: str = "single_request_shards_latency.csv"
+):
+    """Parallel range-fetch runs, one row per client request with its shard count."""
+    convert_jsonl_to_csv_fan_out("sharded", output_file_name, ["shards"])
+
+
+def convert_jsonl_to_csv_batch(
+    output_file_name: str = "single_request_batch_latency.csv"
+):
+    """Batch vs sequential vs concurrent runs, one row per client request."""
+    convert_jsonl_to_csv_fan_out("batch", output_file_name, ["batch", "strategy"])
+
+
+def convert_jsonl_to_csv_conditional(
+    output_file_name: str = "single_request_conditional_latency.csv"
+):
+    """
+    Plain GET vs If-None-Match revalidation runs. `cache` is "none" (no client
+    cache), "miss" (200, cache filled) or "hit" (304, body read from the cache);
+    a per-size summary of the hit path against the full path is printed.
+    """
+    combined = convert_jsonl_to_csv_fan_out(
+        "conditional", output_file_name, ["cache", "body_bytes"]
+    )
+    if combined is None:
+        return
+
+    summary = (
+        combined.assign(rtt_ms=(combined["t_res"] - combined["t_req"]) / 1e6)
+        .groupby(["mode", "size", "cache"])
+        .agg(runs=("req_id", "count"),
+             median_rtt_ms=("rtt_ms", "median"),
+             median_wire_bytes=("res_size_bytes", "median"))
+    )
+    print(summary.to_string())
+
+
+def convert_jsonl_to_csv_stream(
+    output_file_name: str = "single_request_stream_latency.csv"
+):
+    """
+    Buffered vs incremental decoding runs. Prints, per size, the median
+    time-to-first-record, time-to-last-record and peak client RSS.
+    """
+    combined = convert_jsonl_to_csv_fan_out(
+        "stream", output_file_name,
+        ["decode", "t_first_record", "records", "peak_rss_bytes"],
+    )
+    if combined is None:
+        return
+
+    summary = (
+        combined.assign(
+            first_record_ms=(combined["t_first_record"] - combined["t_req"]) / 1e6,
+            last_record_ms=(combined["t_res"] - combined["t_req"]) / 1e6,
+            peak_rss_mb=combined["peak_rss_bytes"] / 2**20,
+        )
+        .groupby(["mode", "size", "decode"])
+        .agg(runs=("req_id", "count"),
+             median_first_record_ms=("first_record_ms", "median"),
+             median_last_record_ms=("last_record_ms", "median"),
+             median_peak_rss_mb=("peak_rss_mb", "median"))
+    )
+    print(summary.to_string())
+
+
+def convert_jsonl_to_csv_ingest(
+    latency_file_name: str = "single_request_latency.csv",
+    output_file_name: str = "single_request_ingest_summary.csv"
+):
+    """
+    Upload runs (--ingest) from the latency CSV: median end-to-end time,
+    records/s and request MB/s per mode and size.
+    """
+    latency_csv = OUTPUT_DATA_DIR / latency_file_name
+    output_csv = OUTPUT_DATA_DIR / output_file_name
+    if not latency_csv.exists():
+        print(f"No {latency_csv}, skipping ingest summary")
+        return
+    if output_csv.exists():
+        raise FileExistsError(
+            f"{output_csv} already exists. Remove it or choose a different name."
+        )
+
+    df = pd.read_csv(latency_csv)
+    if "op" not in df.columns or not (df["op"] == "ingest").any():
+        print("No ingest runs, skipping ingest summary")
+        return
+
+    df = df[df["op"] == "ingest"]
+    rtt_s = (df["t_res"] - df["t_req"]) / 1e9
+    summary = (
+        df.assign(rtt_ms=rtt_s * 1e3,
+                  records_per_s=df["records"] / rtt_s,
+                  upload_mb_per_s=df["req_size_bytes"] / 2**20 / rtt_s)
+        .groupby(["mode", "size"])
+        .agg(runs=("req_id", "count"),
+             median_rtt_ms=("rtt_ms", "median"),
+             median_records_per_s=("records_per_s", "median"),
+             median_upload_mb_per_s=("upload_mb_per_s", "median"),
+             req_size_bytes=("req_size_bytes", "median"))
+        .reset_index()
+    )
+    summary.to_csv(output_csv, index=False)
+    print(summary.to_string(index=False))
+    print(f"✅  Wrote {len(summary)} rows to {output_csv}")
+
+
+def convert_jsonl_to_csv_hedge(
+    latency_file_name: str = "single_request_latency.csv",
+    output_file_name: str = "single_request_hedge_summary.csv"
+):
+    """
+    Hedged runs (--hedge-*) from the latency CSV next to unhedged ones, per
+    mode and size: p50 / p99, the share of requests that sent a hedge (each
+    one extra request on the server) and how often the hedge won.
+    """
+    latency_csv = OUTPUT_DATA_DIR / latency_file_name
+    output_csv = OUTPUT_DATA_DIR / output_file_name
+    if not latency_csv.exists():
+        print(f"No {latency_csv}, skipping hedge summary")
+        return
+    if output_csv.exists():
+        raise FileExistsError(
+            f"{output_csv} already exists. Remove it or choose a different name."
+        )
+
+    df = pd.read_csv(latency_csv)
+    if "hedged" not in df.columns:
+        print("No hedged runs, skipping hedge summary")
+        return
+    if "status" in df.columns:
+        df = df[df["status"].isna()]
+    df["hedging"] = df["hedged"].notna()
+    df["hedged"] = df["hedged"].astype("boolean")
+    df["hedge_won"] = (df["winner"] == "hedge").astype(float).where(df["hedging"])
+    df["rtt_ms"] = (df["t_res"] - df["t_req"]) / 1e6
+
+    grouped = df.groupby(["mode", "size", "hedging"])
+    summary = pd.DataFrame({
+        "requests": grouped["rtt_ms"].count(),
+        "p50_ms": grouped["rtt_ms"].median(),
+        "p99_ms": grouped["rtt_ms"].quantile(0.99),
+        "hedge_rate": grouped["hedged"].mean(),
+        "hedge_win_rate": grouped["hedge_won"].mean(),
+        "median_hedge_delay_ms": grouped["hedge_delay_ms"].median(),
+    }).reset_index()
+
+    summary.to_csv(output_csv, index=False)
+    print(summary.to_string(index=False))
+    print(f"✅  Wrote {len(summary)} rows to {output_csv}")
+
+
+def convert_jsonl_to_csv_variance(
+    latency_file_name: str = "single_request_latency.csv",
+    output_file_name: str = "single_request_latency_variance.csv"
+):
+    """
+    Spread of the end-to-end latency per mode and size, with and without CPU
+    pinning (a run is pinned when its anchor has any pin_* field): std,
+    coefficient of variation, IQR and the p99 / p50 tail ratio.
+    """
+    latency_csv = OUTPUT_DATA_DIR / latency_file_name
+    output_csv = OUTPUT_DATA_DIR / output_file_name
+    if not latency_csv.exists():
+        print(f"No {latency_csv}, skipping variance summary")
+        return
+    if output_csv.exists():
+        raise FileExistsError(
+            f"{output_csv} already exists. Remove it or choose a different name."
+        )
+
+    df = pd.read_csv(latency_csv)
+    pin_cols = [c for c in df.columns if c.startswith("pin_")]
+    df["pinned"] = df[pin_cols].notna().any(axis=1) if pin_cols else False
+    df["rtt_ms"] = (df["t_res"] - df["t_req"]) / 1e6
+
+    rtt = df.groupby(["mode", "size", "pinned"])["rtt_ms"]
+    summary = pd.DataFrame({
+        "runs": rtt.count(),
+        "median_ms": rtt.median(),
+        "std_ms": rtt.std(),
+        "cv": rtt.std() / rtt.mean(),
+        "iqr_ms": rtt.quantile(0.75) - rtt.quantile(0.25),
+        "p99_ms": rtt.quantile(0.99),
+    })
+    summary["p99_over_p50"] = summary["p99_ms"] / summary["median_ms"]
+    summary = summary.reset_index()
+
+    summary.to_csv(output_csv, index=False)
+    print(summary.to_string(index=False))
+    print(f"✅  Wrote {len(summary)} rows to {output_csv}")
+
+
+def convert_jsonl_to_csv_mix(
+    small_max_count: int = 100,
+    large_min_count: int = 100_000,
+    output_file_name: str = "single_request_mix_hol.csv"
+):
+    """
+    Head-of-line blocking under a mixed-size workload (--mix): latency of the
+    small requests (count <= small_max_count) split by whether a large one
+    (count >= large_min_count) was being served by the same server during the
+    small request's [t_req, t_res], per mode and mix. A large request counts
+    as in flight over its server window [t_in, t_out].
+    """
+    output_csv = OUTPUT_DATA_DIR / output_file_name
+    print(f"Generating CSV: {output_csv}…")
+    if output_csv.exists():
+        raise FileExistsError(
+            f"{output_csv} already exists. Remove it or choose a different name."
+        )
+
+    frames = []
+    for protocol_dir in sorted(INPUT_DATA_DIR.iterdir()):
+        anchor_path = protocol_dir / ANCHOR_FILE_NAME
+        if not (protocol_dir.is_dir() and anchor_path.exists()):
+            continue
+
+        for anchor in load_anchors(anchor_path).itertuples(index=False):
+            size = int(anchor.size)
+            client_f = protocol_dir / f"client-{size}-items-mix.jsonl"
+            server_f = protocol_dir / f"server-{size}-items.jsonl"
+            if not (client_f.exists() and server_f.exists()):
+                continue
+
+            print(f"Processing mix for protocol: {protocol_dir.name}, max count {size}")
+            df_c = within_anchor(load_jsonl(client_f), "t0", anchor)
+            if "status" in df_c.columns:
+                df_c = df_c[df_c["status"].isna()]
+            df = df_c.merge(load_jsonl(server_f), on="req_id", how="inner",
+                            suffixes=("_client", "_server"))
+            if df.empty:
+                continue
+
+            # large requests in flight during [t_req, t_res]: those that began
+            # before t_res, minus those that had already finished by t_req
+            large = df[df["count"] >= large_min_count]
+            small = df[df["count"] <= small_max_count].copy()
+            started = np.searchsorted(np.sort(large["t_in"].to_numpy()),
+                                      small["t_res"].to_numpy(), side="left")
+            finished = np.searchsorted(np.sort(large["t_out"].to_numpy()),
+                                       small["t_req"].to_numpy(), side="right")
+            small["large_in_flight"] = (started - finished) > 0
+            small["rtt_ms"] = (small["t_res"] - small["t_req"]) / 1e6
+            small["mode"] = protocol_dir.name
+            frames.append(small)
+
+    if not frames:
+        print(f"No mixed-workload runs under {INPUT_DATA_DIR}, skipping")
+        return
+
+    combined = pd.concat(frames, ignore_index=True)
+    rtt = combined.groupby(["mode", "mix", "large_in_flight"])["rtt_ms"]
+    summary = pd.DataFrame({
+        "requests": rtt.count(),
+        "p50_ms": rtt.median(),
+        "p90_ms": rtt.quantile(0.9),
+        "p99_ms": rtt.quantile(0.99),
+        "max_ms": rtt.max(),
+    }).reset_index()
+
+    summary.to_csv(output_csv, index=False)
+    print(summary.to_string(index=False))
+    print(f"✅  Wrote {len(summary)} rows to {output_csv}")
+
+
+def convert_jsonl_to_csv_attribution(
+    latency_file_name: str = "single_request_latency.csv",
+    output_file_name: str = "single_request_usage_attribution.csv"
+):
+    """
+    CPU-seconds and peak RSS growth per request, on each side: the server's
+    usage samples over [t_in, t_out], the client's over [t0, t_res]. All
+    usage files of a mode are joined into one series (runs do not overlap
+    in time; `pid` separates processes). See utils/usage_attribution.
+    """
+    latency_csv = OUTPUT_DATA_DIR / latency_file_name
+    output_csv = OUTPUT_DATA_DIR / output_file_name
+    if not latency_csv.exists():
+        print(f"No {latency_csv}, skipping usage attribution")
+        return
+    if output_csv.exists():
+        raise FileExistsError(
+            f"{output_csv} already exists. Remove it or choose a different name."
+        )
+
+    windows = {"server": ("t_in", "t_out"), "client": ("t0", "t_res")}
+    latency = pd.read_csv(latency_csv)
+    frames = []
+    for mode, requests in latency.groupby("mode", sort=True):
+        out = requests[["mode", "size", "req_id"]].reset_index(drop=True)
+        for side, (start_col, end_col) in windows.items():
+            samples = [load_jsonl(f) for f in sorted((INPUT_DATA_DIR / mode).glob(f"usage-{side}-*-items*.jsonl"))
+                       if f.stat().st_size]
+            if not samples:
+                print(f"  ⚠️  No {side}-usage samples for {mode}, skipping")
+                continue
+            usage = attribute(prepare_samples(pd.concat(samples, ignore_index=True)),
+                              requests[start_col].to_numpy(), requests[end_col].to_numpy())
+            out = out.join(usage.add_prefix(f"{side}_"))
+        frames.append(out)
+
+    combined = pd.concat(frames, ignore_index=True)
+    combined.to_csv(output_csv, index=False)
+
+    summary = combined.groupby(["mode", "size"]).median(numeric_only=True)
+    print(summary.to_string())
+    print(f"✅  Wrote {len(combined)} rows to {output_csv}")
+
+
+def convert_jsonl_to_csv_startup(
+    output_file_name: str = "single_request_startup.csv"
+):
+    """
+    One row per server start (startup-server-<size>-items.jsonl): each phase
+    in ms after spawn, how long the pool build took, the first request's
+    server time and the median of the requests that server served after it,
+    so readiness can be set against first-request latency per --pool-build.
+    """
+    output_csv = OUTPUT_DATA_DIR / output_file_name
+    print(f"Generating CSV: {output_csv}…")
+
+    if output_csv.exists():
+        raise FileExistsError(
+            f"{output_csv} already exists. Remove it or choose a different name."
+        )
+
+    rows = []
+    for protocol_dir in sorted(INPUT_DATA_DIR.iterdir()):
+        if not protocol_dir.is_dir():
+            continue
+
+        anchor_path = protocol_dir / ANCHOR_FILE_NAME
+        if not anchor_path.exists():
+            continue
+
+        anchors = load_anchors(anchor_path)
+        for anchor in anchors.itertuples(index=False):
+            size = int(anchor.size)
+            starts = [(within_anchor(load_jsonl(path), "ts", anchor), variant)
+                      for path, variant in variant_files(protocol_dir, f"startup-server-{size}-items")]
+            starts = [(df, variant) for df, variant in starts if not df.empty]
+            if not starts:
+                continue
+
+            # every variant's server appends to the same server log: a server
+            # owns its lines up to the next spawn
+            spawns = np.sort(np.concatenate([df.loc[df["phase"] == "spawn", "ts"].to_numpy()
+                                             for df, _ in starts]))
+            server_log = protocol_dir / f"server-{size}-items.jsonl"
+            served = within_anchor(load_jsonl(server_log), "t_in", anchor) \
+                if server_log.exists() else pd.DataFrame(columns=["t_in", "t_out"])
+            if "reject_reason" in served.columns:
+                served = served[served["reject_reason"].isna()]
+
+            for df, variant in starts:
+                for pid, lines in df.groupby("pid"):
+                    by_phase = lines.drop_duplicates("phase").set_index("phase")
+                    if "spawn" not in by_phase.index:
+                        continue
+                    spawn = by_phase.at["spawn", "ts"]
+                    row = {"protocol": protocol_dir.name, "size": size, **variant, "pid": pid,
+                           "pool_build": by_phase.at["imported", "pool_build"]
+                           if "imported" in by_phase.index else None}
+                    for phase in PHASES[1:]:
+                        row[f"{phase}_ms"] = ((by_phase.at[phase, "ts"] - spawn) / 1e6
+                                              if phase in by_phase.index else np.nan)
+                    row["build_ms"] = (by_phase.at["pool_built", "build_ns"] / 1e6
+                                       if "pool_built" in by_phase.index else np.nan)
+                    row["first_request_ms"] = row["after_first_p50_ms"] = np.nan
+                    if "first_request" in by_phase.index:
+                        first = by_phase.loc["first_request"]
+                        row["first_request_ms"] = (first["ts"] - first["t_in"]) / 1e6
+                        later = spawns[spawns > spawn]
+                        after = served[served["t_in"] > first["t_in"]]
+                        if len(later):
+                            after = after[after["t_in"] < later[0]]
+                        if not after.empty:
+                            row["after_first_p50_ms"] = ((after["t_out"] - after["t_in"]) / 1e6).median()
+                    rows.append(row)
+
+    if not rows:
+        print(f"No startup data found under {INPUT_DATA_DIR}. Skipping.")
+        return
+
+    combined = pd.DataFrame(rows)
+    combined.to_csv(output_csv, index=False)
+
+    summary = (combined.groupby(["protocol", "size", "pool_build"], dropna=False)
+               [["bound_ms", "pool_built_ms", "first_request_ms", "after_first_p50_ms"]]
+               .median())
+    print(summary.to_string())
+    print(f"✅  Wrote {len(combined)} rows to {output_csv}")
+
+
 def convert_jsonl_to_csv_usage(
     usage_side: str = "server",
     output_file_name: str = None
 ):
     """
-    Merge all "usage-<side>-<size>-items.jsonl" under each protocol
-    into one CSV.  `usage_side` must be either "server" or "client".
+    Merge all "usage-<side>-<size>-items.jsonl" (and per-backend / transport variants,
+    see `variant_files`) under each protocol into one CSV.  `usage_side` must be either "server" or "client".
 
     - usage_side:       "server" or "client"
     - output_file_name: if None, defaults to "single_request_<side>_usage.csv"
@@ -118,26 +637,29 @@ def convert_jsonl_to_csv_usage(
             print(f"  ⚠️  No anchor file, skipping {protocol_dir.name}")
             continue
 
-        anchors = load_jsonl(anchor_path)
+        anchors = load_anchors(anchor_path)
         for anchor in anchors.itertuples(index=False):
             size       = int(anchor.size)
             perf_base  = anchor.perf_base_ns
             epoch_base = anchor.epoch_base_ns
 
-            # pick the right usage file
-            usage_f = protocol_dir / f"usage-{usage_side}-{size}-items.jsonl"
-            if not usage_f.exists():
+            # pick the right usage file(s)
+            usage_files = variant_files(protocol_dir, f"usage-{usage_side}-{size}-items")
+            if not usage_files:
                 print(f"  ⚠️  Missing {usage_side}-usage log for size={size}, skipping")
                 continue
 
-            df = load_jsonl(usage_f)  # ts, rss, cpu
-            df["protocol"]       = protocol_dir.name
-            df["size"]           = size
-            df["usage_side"]     = usage_side
-            df["perf_base_ns"]   = perf_base
-            df["epoch_base_ns"]  = epoch_base
+            for usage_f, variant in usage_files:
+                df = within_anchor(load_jsonl(usage_f), "ts", anchor)  # ts, rss, cpu
+                df["protocol"]         = protocol_dir.name
+                df["size"]             = size
+                df["usage_side"]       = usage_side
+                df["protobuf_backend"] = variant["protobuf_backend"]
+                df["transport"]        = variant["transport"]
+                df["perf_base_ns"]     = perf_base
+                df["epoch_base_ns"]    = epoch_base
 
-            frames.append(df)
+                frames.append(df)
 
     if not frames:
         print(f"No {usage_side}-usage data found under {INPUT_DATA_DIR!s}. Exiting.")
@@ -151,6 +673,8 @@ def convert_jsonl_to_csv_usage(
         "ts",
         "rss",
         "cpu",
+        "protobuf_backend",
+        "transport",
         "perf_base_ns",
         "epoch_base_ns",
     ]
@@ -161,7 +685,180 @@ def convert_jsonl_to_csv_usage(
     print(f"✅  Wrote {len(combined)} rows to {output_csv}")
 
 
+def convert_jsonl_to_csv_alloc(
+    output_file_name: str = "single_request_alloc_sites.csv"
+):
+    """
+    Requests traced with --trace-alloc, client and server side: one row per
+    (request, allocation site) with the request's current / peak bytes.
+    Prints the median peak per size and side.
+    """
+    output_csv = OUTPUT_DATA_DIR / output_file_name
+    print(f"Generating CSV: {output_csv}…")
+
+    if output_csv.exists():
+        raise FileExistsError(
+            f"{output_csv} already exists. Remove it or choose a different name."
+        )
+
+    rows = []
+    for protocol_dir in sorted(INPUT_DATA_DIR.iterdir()):
+        if not protocol_dir.is_dir():
+            continue
+
+        for log_f in sorted(protocol_dir.glob("*-items*.jsonl")):
+            side, size = log_f.name.split("-")[:2]
+            if side not in ("client", "server"):
+                continue
+            df = load_jsonl(log_f)
+            if "alloc_top" not in df.columns:
+                continue
+
+            for req in df.dropna(subset=["alloc_peak_bytes"]).itertuples(index=False):
+                for rank, site in enumerate(req.alloc_top, start=1):
+                    rows.append({
+                        "mode": protocol_dir.name,
+                        "size": int(size),
+                        "side": side,
+                        "req_id": req.req_id,
+                        "alloc_current_bytes": int(req.alloc_current_bytes),
+                        "alloc_peak_bytes": int(req.alloc_peak_bytes),
+                        "rank": rank,
+                        "site": site["site"],
+                        "site_bytes": site["bytes"],
+                        "site_count": site["count"],
+                    })
+
+    if not rows:
+        print(f"No --trace-alloc data found under {INPUT_DATA_DIR}. Skipping.")
+        return
+
+    combined = pd.DataFrame(rows)
+    combined.to_csv(output_csv, index=False)
+    print(f"✅  Wrote {len(combined)} rows to {output_csv}")
+
+    per_request = combined.drop_duplicates(["mode", "size", "side", "req_id"])
+    summary = (per_request.groupby(["mode", "size", "side"])
+               .agg(traced=("req_id", "count"),
+                    median_peak_bytes=("alloc_peak_bytes", "median"),
+                    median_current_bytes=("alloc_current_bytes", "median")))
+    print(summary.to_string())
+
+
+def convert_jsonl_to_csv_server_samples(
+    file_prefix: str,
+    value_cols: list,
+    output_file_name: str,
+):
+    """
+    Merge all "<file_prefix>-server-<size>-items.jsonl" sample logs (one JSON
+    line per sample, keyed by a perf_counter_ns "ts"; per-backend / transport variants
+    included) into one CSV.
+    Returns the combined frame, or None when there is nothing to merge.
+    """
+    output_csv = OUTPUT_DATA_DIR / output_file_name
+    print(f"Generating CSV: {output_csv}…")
+
+    if output_csv.exists():
+        raise FileExistsError(
+            f"{output_csv} already exists. Remove it or choose a different name."
+        )
+
+    frames = []
+    for protocol_dir in sorted(INPUT_DATA_DIR.iterdir()):
+        if not protocol_dir.is_dir():
+            continue
+
+        anchor_path = protocol_dir / ANCHOR_FILE_NAME
+        if not anchor_path.exists():
+            continue
+
+        anchors = load_anchors(anchor_path)
+        for anchor in anchors.itertuples(index=False):
+            size = int(anchor.size)
+            for samples_f, variant in variant_files(protocol_dir,
+                                                    f"{file_prefix}-server-{size}-items"):
+                df = within_anchor(load_jsonl(samples_f), "ts", anchor)
+                if df.empty:
+                    continue
+                df["protocol"]         = protocol_dir.name
+                df["size"]             = size
+                df["protobuf_backend"] = variant["protobuf_backend"]
+                df["transport"]        = variant["transport"]
+                df["perf_base_ns"]     = anchor.perf_base_ns
+                df["epoch_base_ns"]    = anchor.epoch_base_ns
+                frames.append(df)
+
+    if not frames:
+        print(f"No {file_prefix} data found under {INPUT_DATA_DIR}. Skipping.")
+        return None
+
+    combined = pd.concat(frames, ignore_index=True)
+    cols = ["protocol", "size", "protobuf_backend", "transport", "ts", *value_cols,
+            "perf_base_ns", "epoch_base_ns"]
+    combined = combined[cols]
+
+    combined.to_csv(output_csv, index=False)
+    print(f"✅  Wrote {len(combined)} rows to {output_csv}")
+    return combined
+
+
+def convert_jsonl_to_csv_loop_lag(
+    output_file_name: str = "single_request_loop_lag.csv"
+):
+    """Loop-lag samples (--loop-lag); prints lag percentiles per size."""
+    combined = convert_jsonl_to_csv_server_samples("loop-lag", ["lag_ns"], output_file_name)
+    if combined is None:
+        return
+
+    lag_ms = (combined.assign(lag_ms=combined["lag_ns"] / 1e6)
+              .groupby(["protocol", "size", "protobuf_backend", "transport"],
+                       dropna=False)["lag_ms"])
+    summary = pd.DataFrame({
+        "samples": lag_ms.count(),
+        "p50_ms": lag_ms.median(),
+        "p99_ms": lag_ms.quantile(0.99),
+        "max_ms": lag_ms.max(),
+    })
+    print(summary.to_string())
+
+
+def convert_jsonl_to_csv_gc(
+    output_file_name: str = "single_request_gc_pauses.csv"
+):
+    """One row per server collection (--instrument); prints pauses per generation."""
+    combined = convert_jsonl_to_csv_server_samples(
+        "gc", ["generation", "pause_ns", "collected", "uncollectable"], output_file_name
+    )
+    if combined is None:
+        return
+
+    pause_ms = (combined.assign(pause_ms=combined["pause_ns"] / 1e6)
+                .groupby(["protocol", "size", "protobuf_backend", "transport", "generation"],
+                         dropna=False)["pause_ms"])
+    summary = pd.DataFrame({
+        "collections": pause_ms.count(),
+        "total_ms": pause_ms.sum(),
+        "p99_ms": pause_ms.quantile(0.99),
+        "max_ms": pause_ms.max(),
+    })
+    print(summary.to_string())
+
+
 if __name__ == "__main__":
     convert_jsonl_to_csv_latency()
+    convert_jsonl_to_csv_ingest()
+    convert_jsonl_to_csv_variance()
+    convert_jsonl_to_csv_hedge()
+    convert_jsonl_to_csv_attribution()
+    convert_jsonl_to_csv_mix()
+    convert_jsonl_to_csv_startup()
+    convert_jsonl_to_csv_shards()
+    convert_jsonl_to_csv_batch()
+    convert_jsonl_to_csv_conditional()
+    convert_jsonl_to_csv_stream()
+    convert_jsonl_to_csv_loop_lag()
+    convert_jsonl_to_csv_gc()
+    convert_jsonl_to_csv_alloc()
     convert_jsonl_to_csv_usage(usage_side='server')
     convert_jsonl_to_csv_usage(usage_side='client')
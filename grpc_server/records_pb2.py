@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rrecords.proto\x12\ntimestream\"\xa5\x01\n\x06Record\x12\x0e\n\x06region\x18\x01 \x01(\t\x12\x19\n\x11\x61vailability_zone\x18\x02 \x01(\t\x12\x10\n\x08hostname\x18\x03 \x01(\t\x12\x11\n\ttimestamp\x18\x04 \x01(\t\x12\x16\n\x0etimestamp_unit\x18\x05 \x01(\t\x12\x17\n\x0f\x63pu_utilization\x18\x06 \x01(\x01\x12\x1a\n\x12memory_utilization\x18\x07 \x01(\x01\"\"\n\x11RecordListRequest\x12\r\n\x05\x63ount\x18\x01 \x01(\r\"9\n\x12RecordListResponse\x12#\n\x07records\x18\x01 \x03(\x0b\x32\x12.timestream.Record2d\n\nTimestream\x12V\n\x15getRecordListResponse\x12\x1d.timestream.RecordListRequest\x1a\x1e.timestream.RecordListResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rrecords.proto\x12\ntimestream\"\xa5\x01\n\x06Record\x12\x0e\n\x06region\x18\x01 \x01(\t\x12\x19\n\x11\x61vailability_zone\x18\x02 \x01(\t\x12\x10\n\x08hostname\x18\x03 \x01(\t\x12\x11\n\ttimestamp\x18\x04 \x01(\t\x12\x16\n\x0etimestamp_unit\x18\x05 \x01(\t\x12\x17\n\x0f\x63pu_utilization\x18\x06 \x01(\x01\x12\x1a\n\x12memory_utilization\x18\x07 \x01(\x01\"2\n\x11RecordListRequest\x12\r\n\x05\x63ount\x18\x01 \x01(\r\x12\x0e\n\x06offset\x18\x02 \x01(\r\"9\n\x12RecordListResponse\x12#\n\x07records\x18\x01 \x03(\x0b\x32\x12.timestream.Record\"I\n\x16\x42\x61tchRecordListRequest\x12/\n\x08requests\x18\x01 \x03(\x0b\x32\x1d.timestream.RecordListRequest\"L\n\x17\x42\x61tchRecordListResponse\x12\x31\n\tresponses\x18\x01 \x03(\x0b\x32\x1e.timestream.RecordListResponse\"h\n\x10\x41ggregateRequest\x12\r\n\x05\x63ount\x18\x01 \x01(\r\x12\x10\n\x08group_by\x18\x02 \x01(\t\x12\x16\n\x0e\x62ucket_seconds\x18\x03 \x01(\r\x12\x0c\n\x04\x66unc\x18\x04 \x01(\t\x12\r\n\x05\x66ield\x18\x05 \x01(\t\"Y\n\x0f\x41ggregateBucket\x12\r\n\x05group\x18\x01 \x01(\t\x12\x17\n\x0f\x62ucket_start_ns\x18\x02 \x01(\x03\x12\r\n\x05value\x18\x03 \x01(\x01\x12\x0f\n\x07samples\x18\x04 \x01(\r\"A\n\x11\x41ggregateResponse\x12,\n\x07\x62uckets\x18\x01 \x03(\x0b\x32\x1b.timestream.AggregateBucket\"4\n\rIngestRequest\x12#\n\x07records\x18\x01 \x03(\x0b\x32\x12.timestream.Record\"2\n\x0eIngestResponse\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x04\x12\x0e\n\x06stored\x18\x02 \x01(\x04\"B\n\x0eTelemetryBatch\x12\x0b\n\x03seq\x18\x01 \x01(\x04\x12#\n\x07records\x18\x02 \x03(\x0b\x32\x12.timestream.Record\"T\n\x0cTelemetryAck\x12\x0b\n\x03seq\x18\x01 \x01(\x04\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x02 \x01(\x04\x12\x0e\n\x06window\x18\x03 \x01(\r\x12\x15\n\rsession_bytes\x18\x04 \x01(\x04\x32\xad\x03\n\nTimestream\x12V\n\x15getRecordListResponse\x12\x1d.timestream.RecordListRequest\x1a\x1e.timestream.RecordListResponse\x12O\n\x10\x41ggregateRecords\x12\x1c.timestream.AggregateRequest\x1a\x1d.timestream.AggregateResponse\x12^\n\x13\x42\x61tchGetRecordLists\x12\".timestream.BatchRecordListRequest\x1a#.timestream.BatchRecordListResponse\x12H\n\rIngestRecords\x12\x19.timestream.IngestRequest\x1a\x1a.timestream.IngestResponse(\x01\x12L\n\x10TelemetrySession\x12\x1a.timestream.TelemetryBatch\x1a\x18.timestream.TelemetryAck(\x01\x30\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,9 +34,27 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_RECORD']._serialized_start=30
   _globals['_RECORD']._serialized_end=195
   _globals['_RECORDLISTREQUEST']._serialized_start=197
-  _globals['_RECORDLISTREQUEST']._serialized_end=231
-  _globals['_RECORDLISTRESPONSE']._serialized_start=233
-  _globals['_RECORDLISTRESPONSE']._serialized_end=290
-  _globals['_TIMESTREAM']._serialized_start=292
-  _globals['_TIMESTREAM']._serialized_end=392
+  _globals['_RECORDLISTREQUEST']._serialized_end=247
+  _globals['_RECORDLISTRESPONSE']._serialized_start=249
+  _globals['_RECORDLISTRESPONSE']._serialized_end=306
+  _globals['_BATCHRECORDLISTREQUEST']._serialized_start=308
+  _globals['_BATCHRECORDLISTREQUEST']._serialized_end=381
+  _globals['_BATCHRECORDLISTRESPONSE']._serialized_start=383
+  _globals['_BATCHRECORDLISTRESPONSE']._serialized_end=459
+  _globals['_AGGREGATEREQUEST']._serialized_start=461
+  _globals['_AGGREGATEREQUEST']._serialized_end=565
+  _globals['_AGGREGATEBUCKET']._serialized_start=567
+  _globals['_AGGREGATEBUCKET']._serialized_end=656
+  _globals['_AGGREGATERESPONSE']._serialized_start=658
+  _globals['_AGGREGATERESPONSE']._serialized_end=723
+  _globals['_INGESTREQUEST']._serialized_start=725
+  _globals['_INGESTREQUEST']._serialized_end=777
+  _globals['_INGESTRESPONSE']._serialized_start=779
+  _globals['_INGESTRESPONSE']._serialized_end=829
+  _globals['_TELEMETRYBATCH']._serialized_start=831
+  _globals['_TELEMETRYBATCH']._serialized_end=897
+  _globals['_TELEMETRYACK']._serialized_start=899
+  _globals['_TELEMETRYACK']._serialized_end=983
+  _globals['_TIMESTREAM']._serialized_start=986
+  _globals['_TIMESTREAM']._serialized_end=1415
 # @@protoc_insertion_point(module_scope)
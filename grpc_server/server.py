@@ -21,14 +21,105 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from utils.logger import setup_logger, log_rpc
-from utils.constants import PROTOTYPE_RECORD
+from utils.aggregation import ColumnarPool
+from utils.admission import (
+    AdmissionController, AdmissionRejected, add_admission_args, controller_from_args,
+)
+from utils.cancellation import (
+    CancellationStats, RequestCancelled, add_cancellation_args, iter_slices,
+)
+from utils.offload import (
+    OFFLOAD_CHUNK_RECORDS, Offloader, add_offload_args, offloader_from_args,
+)
+from utils.loop_lag import LoopLagMonitor
+from utils.instrumentation import (
+    add_instrumentation_args, freeze_gc, instrumentation_from_args,
+)
+from utils.alloc_tracking import AllocTracker, add_alloc_tracking_args, alloc_tracker_from_args
+from utils.stack_sampler import add_profile_args, sampler_from_args
+from utils.ingest import DEFAULT_SESSION_MAX_ROWS, DEFAULT_SESSION_WINDOW, IngestStore
+from utils.protobuf_backend import tag_protobuf_backend
+from utils.uds import add_uds_args, grpc_target, remove_stale_socket, tag_transport
+from utils.startup import StartupLog, add_startup_args, record_pool, startup_from_args
+
+
+def encode_records(records: list, offset: int, count: int) -> bytes:
+    """
+    RecordListResponse(records=records[offset:offset + count]) serialised
+    OFFLOAD_CHUNK_RECORDS at a time, so an offload thread releases the GIL
+    between chunks. Module level so the process pool can import it; the bytes
+    go out through the passthrough `_serialize_response`.
+    """
+    return b"".join(
+        pb2.RecordListResponse(records=records[lo:hi]).SerializeToString()
+        for lo, hi in iter_slices(offset, offset + count, OFFLOAD_CHUNK_RECORDS)
+    )
 
 
 class GrpcServer(pb2_grpc.TimestreamServicer):
-    def __init__(self, pool_size: int, logger: logging.Logger):
-        self.records = [PROTOTYPE_RECORD.copy() for _ in range(pool_size)]
+    def __init__(self, pool_size: int, logger: logging.Logger,
+                 admission: AdmissionController = None,
+                 cancel_chunk_records: int = 0,
+                 offloader: Offloader = None,
+                 session_window: int = DEFAULT_SESSION_WINDOW,
+                 pool_build: str = "eager",
+                 startup_log: StartupLog = None):
+        self.pool = record_pool(pool_size, pool_build, startup_log, columnar=True)
+        self.ingest_store = IngestStore()
         self._logger = logger
         self._pool_size = pool_size
+        self._admission = admission
+        self._cancel_chunk = cancel_chunk_records
+        self._cancel_stats = CancellationStats()
+        self._offloader = offloader
+        self._session_window = session_window
+
+    @property
+    def records(self) -> list:
+        return self.pool.records
+
+    @property
+    def columns(self) -> ColumnarPool:
+        return self.pool.columns
+
+    async def _admit(self, context: grpc.aio.ServicerContext, t_in: int, req_id: str) -> dict:
+        """
+        Wait for an admission slot (no-op without admission control) and
+        return the extra fields for the request's log line. The slot is
+        released once the RPC is done, i.e. after the response is serialised.
+        Sheds the request with RESOURCE_EXHAUSTED when the queue is full or
+        the wait outlives the queue timeout / the call's deadline.
+        """
+        if self._admission is None:
+            return {}
+        try:
+            t_admit = await self._admission.acquire(context.time_remaining())
+        except AdmissionRejected as exc:
+            log_rpc(self._logger, t_in=t_in, req_id=req_id,
+                    reject_reason=exc.reason)
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                                f"server overloaded ({exc.reason})")
+        context.add_done_callback(lambda _: self._admission.release())
+        return {"t_admit": t_admit}
+
+    async def _serialize_chunked(self, start: int, count: int,
+                                 context: grpc.aio.ServicerContext) -> bytes:
+        """
+        Build and serialise records[start:start+count] one chunk at a time.
+        Concatenated encodings of a repeated field are a valid encoding of the
+        whole message, so the result equals RecordListResponse.SerializeToString().
+        Raises RequestCancelled once the caller's deadline has passed.
+        """
+        parts = []
+        for lo, hi in iter_slices(start, start + count, self._cancel_chunk):
+            parts.append(pb2.RecordListResponse(records=self.records[lo:hi]).SerializeToString())
+            await asyncio.sleep(0)          # lets the loop deliver a cancellation
+            remaining = context.time_remaining()
+            if remaining is not None and remaining <= 0:
+                raise RequestCancelled("deadline")
+            if context.cancelled():
+                raise RequestCancelled("cancelled")
+        return b"".join(parts)
 
     async def getRecordListResponse(
         self,
@@ -37,21 +128,228 @@ class GrpcServer(pb2_grpc.TimestreamServicer):
     ) -> pb2.RecordListResponse:
         t_in = perf_counter_ns()
 
-        if request.count > self._pool_size:
+        if request.offset + request.count > self._pool_size:
             # In the aio API you abort through the context:
             await context.abort(grpc.StatusCode.INVALID_ARGUMENT,
-                                "count exceeds pool size")
+                                "offset + count exceeds pool size")
 
         # Metadata keys are bytes → decode to str, put into dict
         md = {k: v for k, v in context.invocation_metadata()}
         req_id = md.get("req-id")
 
-        context.add_done_callback(lambda _: log_rpc(self._logger, t_in=t_in, req_id=req_id))
+        admitted = await self._admit(context, t_in, req_id)
+        cancelled = {}
+        offloaded = {}
+        context.add_done_callback(
+            lambda _: log_rpc(self._logger, t_in=t_in, req_id=req_id,
+                              **admitted, **cancelled, **offloaded))
+
+        start = request.offset
+        if self._offloader is not None and self._offloader.wanted(request.count):
+            offloaded["offload"] = self._offloader.pool
+            return await self._offloader.encode(encode_records, self.records,
+                                                start, request.count)
+        if not self._cancel_chunk:
+            return pb2.RecordListResponse(records=self.records[start:start + request.count])
+
+        try:
+            return await self._serialize_chunked(start, request.count, context)
+        except RequestCancelled as exc:
+            cancelled.update(self._cancel_stats.record(t_in, exc.reason))
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED,
+                                "deadline exceeded while building the response")
+        except asyncio.CancelledError:
+            # grpc.aio cancels the handler task when the RPC is terminated
+            cancelled.update(self._cancel_stats.record(t_in, "cancelled"))
+            raise
+
+    async def BatchGetRecordLists(
+        self,
+        request: pb2.BatchRecordListRequest,
+        context: grpc.aio.ServicerContext
+    ) -> pb2.BatchRecordListResponse:
+        t_in = perf_counter_ns()
+
+        if any(r.offset + r.count > self._pool_size for r in request.requests):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                                "offset + count exceeds pool size")
+
+        md = {k: v for k, v in context.invocation_metadata()}
+        req_id = md.get("req-id")
+
+        admitted = await self._admit(context, t_in, req_id)
+        context.add_done_callback(
+            lambda _: log_rpc(self._logger, t_in=t_in, req_id=req_id, **admitted))
+
+        return pb2.BatchRecordListResponse(responses=[
+            pb2.RecordListResponse(records=self.records[r.offset:r.offset + r.count])
+            for r in request.requests
+        ])
+
+    async def AggregateRecords(
+        self,
+        request: pb2.AggregateRequest,
+        context: grpc.aio.ServicerContext
+    ) -> pb2.AggregateResponse:
+        t_in = perf_counter_ns()
+
+        md = {k: v for k, v in context.invocation_metadata()}
+        req_id = md.get("req-id")
+
+        admitted = await self._admit(context, t_in, req_id)
+        context.add_done_callback(
+            lambda _: log_rpc(self._logger, t_in=t_in, req_id=req_id, **admitted))
+
+        try:
+            result = self.columns.aggregate(
+                request.count, request.group_by, request.bucket_seconds,
+                request.func, request.field,
+            )
+        except ValueError as exc:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(exc))
+
+        return pb2.AggregateResponse(buckets=[
+            pb2.AggregateBucket(**bucket) for bucket in result.to_dicts()
+        ])
+
+    async def IngestRecords(
+        self,
+        request_iterator,
+        context: grpc.aio.ServicerContext
+    ) -> pb2.IngestResponse:
+        """Client-streaming upload: append every IngestRequest chunk to the store."""
+        t_in = perf_counter_ns()
+
+        md = {k: v for k, v in context.invocation_metadata()}
+        req_id = md.get("req-id")
+
+        admitted = await self._admit(context, t_in, req_id)
+        accepted = chunks = 0
+        async for chunk in request_iterator:
+            accepted += self.ingest_store.append_messages(chunk.records)
+            chunks += 1
+
+        context.add_done_callback(
+            lambda _: log_rpc(self._logger, t_in=t_in, req_id=req_id, **admitted,
+                              ingested=accepted, chunks=chunks))
+
+        return pb2.IngestResponse(accepted=accepted, stored=self.ingest_store.retained_rows)
+
+    async def TelemetrySession(
+        self,
+        request_iterator,
+        context: grpc.aio.ServicerContext
+    ):
+        """
+        Bidirectional session: ack every TelemetryBatch once it is stored in
+        the session's own IngestStore. The first ack (seq 0) grants the
+        window. Not subject to admission control – a session would hold its
+        slot for its whole lifetime.
+        """
+        t_in = perf_counter_ns()
+
+        md = {k: v for k, v in context.invocation_metadata()}
+        req_id = md.get("req-id")
+
+        store = IngestStore(DEFAULT_SESSION_MAX_ROWS)
+        batches = 0
+        context.add_done_callback(
+            lambda _: log_rpc(self._logger, t_in=t_in, req_id=req_id, op="session",
+                              batches=batches, ingested=store.rows,
+                              session_bytes=store.nbytes))
+
+        yield pb2.TelemetryAck(seq=0, window=self._session_window)
+        async for batch in request_iterator:
+            accepted = store.append_messages(batch.records)
+            batches += 1
+            yield pb2.TelemetryAck(seq=batch.seq, accepted=accepted,
+                                   window=self._session_window,
+                                   session_bytes=store.nbytes)
+
+
+class AllocTrackingInterceptor(grpc.aio.ServerInterceptor):
+    """
+    Start tracing sampled unary RPCs (keyed by the `req-id` metadata); the
+    RPC's log line finishes the trace. Other handler kinds pass through.
+    """
+
+    def __init__(self, tracker: AllocTracker):
+        self._tracker = tracker
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None or handler.unary_unary is None:
+            return handler
 
-        return pb2.RecordListResponse(records=self.records[:request.count])
+        req_id = dict(handler_call_details.invocation_metadata or ()).get("req-id")
+        behavior = handler.unary_unary
+        tracker = self._tracker
 
+        async def traced(request, context):
+            tracker.begin(req_id)
+            try:
+                return await behavior(request, context)
+            finally:
+                # registered after the handler's own log callback → runs after it
+                context.add_done_callback(lambda _: tracker.discard(req_id))
 
-async def serve(host: str, port: int, pool_size: int, logger_name: str, log_file_path: Path):
+        return grpc.unary_unary_rpc_method_handler(
+            traced,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+
+
+def _serialize_response(message) -> bytes:
+    """Response serialiser that passes already-serialised bodies through."""
+    return message if isinstance(message, bytes) else message.SerializeToString()
+
+
+def add_servicer_to_server(servicer: GrpcServer, server: grpc.aio.Server) -> None:
+    """
+    Same as `pb2_grpc.add_TimestreamServicer_to_server`, except that
+    getRecordListResponse may return the response as pre-serialised bytes
+    (built chunk by chunk or on an offload pool) instead of a message.
+    """
+    rpc_method_handlers = {
+        "getRecordListResponse": grpc.unary_unary_rpc_method_handler(
+            servicer.getRecordListResponse,
+            request_deserializer=pb2.RecordListRequest.FromString,
+            response_serializer=_serialize_response,
+        ),
+        "AggregateRecords": grpc.unary_unary_rpc_method_handler(
+            servicer.AggregateRecords,
+            request_deserializer=pb2.AggregateRequest.FromString,
+            response_serializer=pb2.AggregateResponse.SerializeToString,
+        ),
+        "BatchGetRecordLists": grpc.unary_unary_rpc_method_handler(
+            servicer.BatchGetRecordLists,
+            request_deserializer=pb2.BatchRecordListRequest.FromString,
+            response_serializer=pb2.BatchRecordListResponse.SerializeToString,
+        ),
+        "IngestRecords": grpc.stream_unary_rpc_method_handler(
+            servicer.IngestRecords,
+            request_deserializer=pb2.IngestRequest.FromString,
+            response_serializer=pb2.IngestResponse.SerializeToString,
+        ),
+        "TelemetrySession": grpc.stream_stream_rpc_method_handler(
+            servicer.TelemetrySession,
+            request_deserializer=pb2.TelemetryBatch.FromString,
+            response_serializer=pb2.TelemetryAck.SerializeToString,
+        ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        "timestream.Timestream", rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers("timestream.Timestream", rpc_method_handlers)
+
+
+async def serve(host: str, port: int, pool_size: int, logger_name: str, log_file_path: Path,
+                admission: AdmissionController = None, cancel_chunk_records: int = 0,
+                offloader: Offloader = None, loop_lag: LoopLagMonitor = None,
+                gc_freeze: bool = False, alloc_tracker: AllocTracker = None,
+                session_window: int = DEFAULT_SESSION_WINDOW, uds: Path = None,
+                pool_build: str = "eager", startup_log: StartupLog = None):
     logger = setup_logger(logger_name, log_file_path)
 
     # gRPC message size limits
@@ -59,23 +357,41 @@ async def serve(host: str, port: int, pool_size: int, logger_name: str, log_file
 
     server = grpc.aio.server(
         futures.ThreadPoolExecutor(max_workers=10),
+        interceptors=[AllocTrackingInterceptor(alloc_tracker)] if alloc_tracker else None,
         options=[
             ("grpc.max_send_message_length", max_msg),
             ("grpc.max_receive_message_length", max_msg),
         ],
     )
 
-    pb2_grpc.add_TimestreamServicer_to_server(
-        GrpcServer(pool_size, logger), server
+    add_servicer_to_server(
+        GrpcServer(pool_size, logger, admission, cancel_chunk_records, offloader,
+                   session_window, pool_build, startup_log), server
     )
+    if gc_freeze:
+        freeze_gc()
 
-    port = server.add_insecure_port(f"{host}:{port}")
+    if uds is not None:
+        remove_stale_socket(uds)
+    target = grpc_target(host, port, uds)
+    server.add_insecure_port(target)
     await server.start()
-    print(f"gRPC server on {host}:{port}")
-    await server.wait_for_termination()
+    if startup_log is not None:
+        startup_log.mark("bound")
+    if loop_lag is not None:
+        loop_lag.start()
+    print(f"gRPC server on {target}")
+    try:
+        await server.wait_for_termination()
+    finally:
+        if loop_lag is not None:
+            loop_lag.stop()
+        if offloader is not None:
+            offloader.shutdown()
 
 
 if __name__ == "__main__":
+    t_imported = perf_counter_ns()
     ap = argparse.ArgumentParser(description="Launch the gRPC Timestream server")
     ap.add_argument("--host", default="127.0.0.1", help="Bind address (default: %(default)s)")
     ap.add_argument("--port", type=int, help="Port to listen on")
@@ -89,8 +405,24 @@ if __name__ == "__main__":
         type=Path,
         help="Path for the JSON-lines log file",
     )
+    ap.add_argument("--session-window", type=int, default=DEFAULT_SESSION_WINDOW,
+                    help="Unacked batches a telemetry session may have in flight "
+                         "(default: %(default)s)")
+    add_admission_args(ap)
+    add_cancellation_args(ap)
+    add_offload_args(ap)
+    add_instrumentation_args(ap)
+    add_alloc_tracking_args(ap)
+    add_profile_args(ap)
+    add_uds_args(ap)
+    add_startup_args(ap)
 
     args = ap.parse_args()
+    if args.gc_freeze and args.pool_build != "eager":
+        ap.error("--gc-freeze needs --pool-build eager (it freezes the pool built before it)")
+    sampler_from_args(args)
+    tag_protobuf_backend("server")
+    tag_transport("server", args.uds)
 
     try:
         asyncio.run(serve(
@@ -98,7 +430,17 @@ if __name__ == "__main__":
             port=args.port,
             pool_size=args.pool_size,
             logger_name=args.logger_name,
-            log_file_path=args.log_file
+            log_file_path=args.log_file,
+            admission=controller_from_args(args),
+            cancel_chunk_records=args.cancel_chunk_records,
+            offloader=offloader_from_args(args),
+            loop_lag=instrumentation_from_args(args),
+            gc_freeze=args.gc_freeze,
+            alloc_tracker=alloc_tracker_from_args(args, "server"),
+            session_window=args.session_window,
+            uds=args.uds,
+            pool_build=args.pool_build,
+            startup_log=startup_from_args(args, t_imported),
             ))
     except (KeyboardInterrupt, SystemExit):
         print("Shutting down gRPC server")
\ No newline at end of file
@@ -24,9 +24,30 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from utils.logger import setup_logger, log_client
+from utils.sharding import shard_bounds
+from utils.constants import BATCH_STRATEGIES, PROTOTYPE_RECORD
+from utils.alloc_tracking import add_alloc_tracking_args, alloc_tracker_from_args
+from utils.stack_sampler import add_profile_args, sampler_from_args
+from utils.protobuf_backend import tag_protobuf_backend
+from utils.cancellation import iter_slices
+from utils.ingest import DEFAULT_INGEST_CHUNK_RECORDS
+from utils.uds import add_uds_args, grpc_target, tag_transport
+from utils.size_mix import add_mix_args, run_mix
+from utils.hedging import WINNERS, HedgePolicy, add_hedge_args, hedge_policy_from_args, race
+from utils.aggregation import (
+    AGG_FUNCS, GROUP_BY_KEYS, VALUE_FIELDS,
+    DEFAULT_BUCKET_SECONDS, DEFAULT_FIELD, DEFAULT_GROUP_BY,
+)
 
+# Call outcomes that are logged (not raised) so goodput can be computed
+FAILED_STATUS = {
+    grpc.StatusCode.RESOURCE_EXHAUSTED: "rejected",
+    grpc.StatusCode.DEADLINE_EXCEEDED: "deadline_exceeded",
+}
 
-def fetch_records(host: str, port: int, count: int, logger) -> None:
+
+def fetch_records(host: str, port: int, count: int, logger, deadline_ms: float = None,
+                  uds: Path = None) -> None:
     req_id = f"{secrets.randbits(64):016x}"
     # 1. Timestamp of total-run lifecycle 
     t0 = perf_counter_ns()
@@ -36,7 +57,7 @@ def fetch_records(host: str, port: int, count: int, logger) -> None:
         ("grpc.max_send_message_length", -1),
         ("grpc.max_receive_message_length", -1)
     ]
-    channel = grpc.insecure_channel(f"{host}:{port}", options=opts)
+    channel = grpc.insecure_channel(grpc_target(host, port, uds), options=opts)
     stub = pb2_grpc.TimestreamStub(channel)
 
     # Build protobuf request object
@@ -48,7 +69,28 @@ def fetch_records(host: str, port: int, count: int, logger) -> None:
     t_req = perf_counter_ns()
 
     # serialisation, posting, receiving response, and decoding response into an object
-    response = stub.getRecordListResponse(request_pb, metadata=meta)
+    timeout = deadline_ms / 1000 if deadline_ms is not None else None
+    try:
+        response = stub.getRecordListResponse(request_pb, metadata=meta, timeout=timeout)
+    except grpc.RpcError as exc:
+        status = FAILED_STATUS.get(exc.code())
+        if status is None:
+            raise
+        # Shed by admission control or past the deadline – log it so goodput
+        # can be computed
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=perf_counter_ns(),
+            req_id=req_id,
+            req_size_bytes=len(request_pb.SerializeToString()),
+            res_size_bytes=0,
+            status=status,
+            count=count,
+            )
+        print(status)
+        return
     
     # Uncomment the line below to print the first record
     # print(_response.records[0])
@@ -69,7 +111,358 @@ def fetch_records(host: str, port: int, count: int, logger) -> None:
         t_res=t_res,
         req_id=req_id,
         req_size_bytes=req_size_bytes,
-        res_size_bytes=res_size_bytes
+        res_size_bytes=res_size_bytes,
+        count=count,
+        )
+    print('Finished')
+
+
+def fetch_records_hedged(host: str, port: int, count: int, policy: HedgePolicy, logger,
+                         uds: Path = None) -> None:
+    """
+    `fetch_records` with a hedge: if no response has arrived after the
+    policy's delay, the same call goes out again on a second channel with its
+    own connection (logged server-side as `<req_id>-h`). The first response
+    wins; the other call is cancelled.
+    """
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    opts = [
+        ("grpc.max_send_message_length", -1),
+        ("grpc.max_receive_message_length", -1)
+    ]
+    # a local subchannel pool keeps the hedge channel off the primary's connection
+    channels = [grpc.insecure_channel(grpc_target(host, port, uds), options=opts),
+                grpc.insecure_channel(grpc_target(host, port, uds),
+                                      options=opts + [("grpc.use_local_subchannel_pool", 1)])]
+    stubs = [pb2_grpc.TimestreamStub(channel) for channel in channels]
+
+    request_pb = pb2.RecordListRequest(count=count)
+    delay_ms = policy.delay_for(count)
+    calls = {}
+    cancelled = set()
+
+    def attempt(i: int):
+        meta = (("req-id", req_id if i == 0 else f"{req_id}-h"),)
+        calls[i] = stubs[i].getRecordListResponse.future(request_pb, metadata=meta)
+        if i in cancelled:
+            calls[i].cancel()
+        return calls[i].result()
+
+    def cancel(i: int) -> None:
+        cancelled.add(i)
+        if i in calls:
+            calls[i].cancel()
+
+    t_req = perf_counter_ns()
+
+    try:
+        try:
+            response, winner, hedged = race(attempt, cancel, delay_ms)
+        except grpc.RpcError as exc:
+            status = FAILED_STATUS.get(exc.code())
+            if status is None:
+                raise
+            log_client(
+                logger,
+                t0=t0,
+                t_req=t_req,
+                t_res=perf_counter_ns(),
+                req_id=req_id,
+                req_size_bytes=len(request_pb.SerializeToString()),
+                res_size_bytes=0,
+                status=status,
+                count=count,
+                hedge_delay_ms=delay_ms,
+                )
+            print(status)
+            return
+
+        t_res = perf_counter_ns()
+
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=t_res,
+            req_id=req_id,
+            req_size_bytes=len(request_pb.SerializeToString()),
+            res_size_bytes=len(response.SerializeToString()),
+            count=count,
+            hedge_delay_ms=delay_ms,
+            hedged=hedged,
+            winner=WINNERS[winner],
+            )
+        print('Finished')
+    finally:
+        # both channels, the cancelled loser's included
+        for channel in channels:
+            channel.close()
+
+
+def fetch_records_sharded(host: str, port: int, count: int, shards: int, logger,
+                          uds: Path = None) -> None:
+    """
+    Fetch `count` records as `shards` concurrent range requests on one
+    channel and reassemble them, in order, into a single response.
+
+    Server-side lines are logged as `<req_id>-<shard>`.
+    """
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    opts = [
+        ("grpc.max_send_message_length", -1),
+        ("grpc.max_receive_message_length", -1)
+    ]
+    channel = grpc.insecure_channel(grpc_target(host, port, uds), options=opts)
+    stub = pb2_grpc.TimestreamStub(channel)
+
+    requests_pb = [pb2.RecordListRequest(offset=offset, count=n)
+                   for offset, n in shard_bounds(count, shards)]
+
+    t_req = perf_counter_ns()
+
+    # All shards are in flight at once, multiplexed over the one HTTP/2 channel
+    calls = [
+        stub.getRecordListResponse.future(req, metadata=(("req-id", f"{req_id}-{i}"),))
+        for i, req in enumerate(requests_pb)
+    ]
+    response = pb2.RecordListResponse()
+    req_size_bytes = sum(len(req.SerializeToString()) for req in requests_pb)
+    try:
+        for call in calls:
+            response.MergeFrom(call.result())   # repeated field → appended in order
+    except grpc.RpcError as exc:
+        status = FAILED_STATUS.get(exc.code())
+        if status is None:
+            raise
+        # one failed shard fails the whole fetch; the rest are not waited for
+        for call in calls:
+            call.cancel()
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=perf_counter_ns(),
+            req_id=req_id,
+            req_size_bytes=req_size_bytes,
+            res_size_bytes=0,
+            status=status,
+            count=count,
+            shards=len(requests_pb),
+            )
+        print(status)
+        return
+
+    t_res = perf_counter_ns()
+
+    res_size_bytes = len(response.SerializeToString())
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=req_size_bytes,
+        res_size_bytes=res_size_bytes,
+        shards=len(requests_pb),
+        )
+    print('Finished')
+
+
+def fetch_records_batch(host: str, port: int, count: int, batch: int,
+                        strategy: str, logger, uds: Path = None) -> None:
+    """
+    Fetch `batch` slices of `count` records either as one
+    `BatchGetRecordLists` call, or as `batch` single calls issued one after
+    another / all at once on the same channel.
+    """
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    opts = [
+        ("grpc.max_send_message_length", -1),
+        ("grpc.max_receive_message_length", -1)
+    ]
+    channel = grpc.insecure_channel(grpc_target(host, port, uds), options=opts)
+    stub = pb2_grpc.TimestreamStub(channel)
+
+    requests_pb = [pb2.RecordListRequest(count=count) for _ in range(batch)]
+    batch_pb = pb2.BatchRecordListRequest(requests=requests_pb)
+
+    if strategy == "batch":
+        req_size_bytes = len(batch_pb.SerializeToString())
+    else:
+        req_size_bytes = sum(len(req.SerializeToString()) for req in requests_pb)
+
+    t_req = perf_counter_ns()
+
+    calls = []
+    try:
+        if strategy == "batch":
+            response = stub.BatchGetRecordLists(batch_pb, metadata=(("req-id", req_id),))
+            responses = list(response.responses)
+        elif strategy == "sequential":
+            responses = [
+                stub.getRecordListResponse(req, metadata=(("req-id", f"{req_id}-{i}"),))
+                for i, req in enumerate(requests_pb)
+            ]
+        else:
+            calls = [
+                stub.getRecordListResponse.future(req, metadata=(("req-id", f"{req_id}-{i}"),))
+                for i, req in enumerate(requests_pb)
+            ]
+            responses = [call.result() for call in calls]
+    except grpc.RpcError as exc:
+        status = FAILED_STATUS.get(exc.code())
+        if status is None:
+            raise
+        # one failed call fails the whole batch; the rest are not waited for
+        for call in calls:
+            call.cancel()
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=perf_counter_ns(),
+            req_id=req_id,
+            req_size_bytes=req_size_bytes,
+            res_size_bytes=0,
+            status=status,
+            op="batch",
+            batch=batch,
+            strategy=strategy,
+            )
+        print(status)
+        return
+
+    t_res = perf_counter_ns()
+
+    if strategy == "batch":
+        res_size_bytes = len(response.SerializeToString())
+    else:
+        res_size_bytes = sum(len(res.SerializeToString()) for res in responses)
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=req_size_bytes,
+        res_size_bytes=res_size_bytes,
+        op="batch",
+        batch=batch,
+        strategy=strategy,
+        )
+    print('Finished')
+
+
+def aggregate_records(host: str, port: int, count: int, func: str, group_by: str,
+                      bucket_seconds: int, field: str, logger, uds: Path = None) -> None:
+    """Same measurement points as `fetch_records`, but for `AggregateRecords`."""
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    opts = [
+        ("grpc.max_send_message_length", -1),
+        ("grpc.max_receive_message_length", -1)
+    ]
+    channel = grpc.insecure_channel(grpc_target(host, port, uds), options=opts)
+    stub = pb2_grpc.TimestreamStub(channel)
+
+    request_pb = pb2.AggregateRequest(count=count, group_by=group_by,
+                                      bucket_seconds=bucket_seconds,
+                                      func=func, field=field)
+    meta = (("req-id", req_id),)
+
+    t_req = perf_counter_ns()
+    try:
+        response = stub.AggregateRecords(request_pb, metadata=meta)
+    except grpc.RpcError as exc:
+        status = FAILED_STATUS.get(exc.code())
+        if status is None:
+            raise
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=perf_counter_ns(),
+            req_id=req_id,
+            req_size_bytes=len(request_pb.SerializeToString()),
+            res_size_bytes=0,
+            status=status,
+            op="aggregate",
+            func=func,
+            )
+        print(status)
+        return
+    t_res = perf_counter_ns()
+
+    req_size_bytes = len(request_pb.SerializeToString())
+    res_size_bytes = len(response.SerializeToString())
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=req_size_bytes,
+        res_size_bytes=res_size_bytes,
+        op="aggregate",
+        func=func,
+        buckets=len(response.buckets),
+        )
+    print('Finished')
+
+
+def ingest_records(host: str, port: int, count: int, chunk_records: int, logger,
+                   uds: Path = None) -> None:
+    """
+    Upload `count` records through the client-streaming `IngestRecords`,
+    `chunk_records` per stream message, and log the ingest throughput.
+    """
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    opts = [
+        ("grpc.max_send_message_length", -1),
+        ("grpc.max_receive_message_length", -1)
+    ]
+    channel = grpc.insecure_channel(grpc_target(host, port, uds), options=opts)
+    stub = pb2_grpc.TimestreamStub(channel)
+
+    # The telemetry to upload; building the messages is part of the call
+    records = [PROTOTYPE_RECORD.copy() for _ in range(count)]
+    meta = (("req-id", req_id),)
+
+    def chunks():
+        for lo, hi in iter_slices(0, count, chunk_records):
+            yield pb2.IngestRequest(records=records[lo:hi])
+
+    t_req = perf_counter_ns()
+    response = stub.IngestRecords(chunks(), metadata=meta)
+    t_res = perf_counter_ns()
+
+    req_size_bytes = sum(pb2.IngestRequest(records=records[lo:hi]).ByteSize()
+                         for lo, hi in iter_slices(0, count, chunk_records))
+    res_size_bytes = len(response.SerializeToString())
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=req_size_bytes,
+        res_size_bytes=res_size_bytes,
+        op="ingest",
+        records=response.accepted,
+        ingest_rps=response.accepted / ((t_res - t_req) / 1e9),
         )
     print('Finished')
 
@@ -87,7 +480,63 @@ if __name__ == "__main__":
         "--log-file", type=Path, required=True,
         help="Path for the JSON-lines log file",
     )
+    ap.add_argument("--deadline-ms", type=float,
+                    help="Give up (DEADLINE_EXCEEDED) if the call takes longer than this")
+    ap.add_argument("--shards", type=int,
+                    help="Split the request into this many concurrent range fetches")
+    ap.add_argument("--batch", type=int,
+                    help="Fetch this many slices of --count records (see --batch-strategy)")
+    ap.add_argument("--batch-strategy", choices=BATCH_STRATEGIES, default="batch",
+                    help="One BatchGetRecordLists call, or N sequential / concurrent single calls")
+    ap.add_argument("--aggregate", choices=AGG_FUNCS,
+                    help="Call AggregateRecords with this function instead of fetching raw records")
+    ap.add_argument("--group-by", choices=GROUP_BY_KEYS, default=DEFAULT_GROUP_BY)
+    ap.add_argument("--bucket-seconds", type=int, default=DEFAULT_BUCKET_SECONDS)
+    ap.add_argument("--field", choices=VALUE_FIELDS, default=DEFAULT_FIELD)
+    ap.add_argument("--ingest", action="store_true",
+                    help="Upload --count records via IngestRecords instead of fetching")
+    ap.add_argument("--ingest-chunk-records", type=int, default=DEFAULT_INGEST_CHUNK_RECORDS,
+                    help="Records per IngestRecords stream message (default: %(default)s)")
+    add_alloc_tracking_args(ap)
+    add_profile_args(ap)
+    add_uds_args(ap)
+    add_mix_args(ap)
+    add_hedge_args(ap)
     args = ap.parse_args()
+    if args.deadline_ms is not None:
+        # only the plain fetch (also under --mix) takes a deadline
+        for flag in ("shards", "batch", "aggregate", "hedge_percentile", "hedge_delay_ms"):
+            if getattr(args, flag) is not None:
+                ap.error(f"--deadline-ms cannot be combined with --{flag.replace('_', '-')}")
+        if args.ingest:
+            ap.error("--deadline-ms cannot be combined with --ingest")
 
     logger = setup_logger(args.logger_name, args.log_file)
-    fetch_records(args.host, args.port, args.count, logger)
\ No newline at end of file
+    alloc_tracker_from_args(args, "client")
+    sampler_from_args(args)
+    tag_protobuf_backend("client")
+    tag_transport("client", args.uds)
+    hedge_policy = hedge_policy_from_args(args)
+    if args.ingest:
+        ingest_records(args.host, args.port, args.count, args.ingest_chunk_records, logger,
+                       args.uds)
+    elif args.aggregate:
+        aggregate_records(args.host, args.port, args.count, args.aggregate,
+                          args.group_by, args.bucket_seconds, args.field, logger, args.uds)
+    elif args.batch:
+        fetch_records_batch(args.host, args.port, args.count, args.batch,
+                            args.batch_strategy, logger, args.uds)
+    elif args.shards:
+        fetch_records_sharded(args.host, args.port, args.count, args.shards, logger, args.uds)
+    elif args.mix and hedge_policy:
+        run_mix(lambda count: fetch_records_hedged(args.host, args.port, count, hedge_policy,
+                                                   logger, args.uds),
+                args.mix, args.mix_requests, args.mix_seed)
+    elif args.mix:
+        run_mix(lambda count: fetch_records(args.host, args.port, count, logger, args.deadline_ms,
+                                            args.uds),
+                args.mix, args.mix_requests, args.mix_seed)
+    elif hedge_policy:
+        fetch_records_hedged(args.host, args.port, args.count, hedge_policy, logger, args.uds)
+    else:
+        fetch_records(args.host, args.port, args.count, logger, args.deadline_ms, args.uds)
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+Telemetry-session load generator for the Timestream gRPC service.
+
+Opens `--sessions` long-lived `TelemetrySession` streams (one channel each,
+like independent agents) on one asyncio loop. Every session pushes batches of
+`--count` records for `--duration-s` seconds, keeping at most `window`
+batches unacknowledged, where `window` is what the server's last ack granted
+(capped by `--window`, if given).
+
+One log_client line per session (op="session"): records / batches sent,
+records_per_s, ack-latency percentiles and the server memory the session held
+(`session_bytes` of its last ack). A summary over all sessions is printed at
+the end.
+"""
+
+import os
+import logging
+os.environ.setdefault("GRPC_VERBOSITY", "none")   # or "none"
+os.environ.pop("GRPC_TRACE", None)                 # disable tracing
+logging.getLogger("grpc").setLevel(logging.ERROR)  # hide Python-level INFO
+
+import argparse
+import asyncio
+import grpc
+
+import numpy as np
+
+import records_pb2 as pb2
+import records_pb2_grpc as pb2_grpc
+
+from time import perf_counter_ns
+import sys
+from pathlib import Path
+import secrets
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.logger import setup_logger, log_client
+from utils.constants import PROTOTYPE_RECORD
+from utils.stack_sampler import add_profile_args, sampler_from_args
+from utils.protobuf_backend import tag_protobuf_backend
+
+DEFAULT_SESSIONS = 16
+DEFAULT_BATCH_RECORDS = 1_000
+DEFAULT_DURATION_S = 10.0
+ACK_PERCENTILES = (50, 90, 99)
+
+
+async def run_session(host: str, port: int, batch_records: int, window_cap: int,
+                      duration_s: float, logger) -> dict:
+    """Push batches until the duration is over, then drain the acks; returns the session's stats."""
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    channel = grpc.aio.insecure_channel(f"{host}:{port}")
+    stub = pb2_grpc.TimestreamStub(channel)
+
+    # One message reused for every batch; only `seq` changes
+    batch = pb2.TelemetryBatch(records=[PROTOTYPE_RECORD.copy() for _ in range(batch_records)])
+    batch_bytes = batch.ByteSize()
+
+    sent = {}                       # seq → send time of unacked batches
+    ack_ns = []
+    window = 0                      # granted by the server's first ack
+    session_bytes = 0
+    credit = asyncio.Condition()
+
+    t_req = perf_counter_ns()
+    call = stub.TelemetrySession(metadata=(("req-id", req_id),))
+    t_stop = t_req + int(duration_s * 1e9)
+
+    async def send_batches() -> int:
+        seq = 0
+        while perf_counter_ns() < t_stop:
+            async with credit:
+                await credit.wait_for(lambda: len(sent) < window)
+            seq += 1
+            batch.seq = seq
+            sent[seq] = perf_counter_ns()
+            await call.write(batch)
+        await call.done_writing()
+        return seq
+
+    sender = None
+    acked = 0
+    while True:
+        ack = await call.read()
+        if ack is grpc.aio.EOF:
+            break
+        t_ack = perf_counter_ns()
+        if ack.seq:
+            ack_ns.append(t_ack - sent.pop(ack.seq))
+            acked += ack.accepted
+            session_bytes = ack.session_bytes
+        async with credit:
+            window = min(ack.window, window_cap) if window_cap else ack.window
+            credit.notify()
+        if sender is None:
+            sender = asyncio.create_task(send_batches())
+    batches = await sender
+    t_res = perf_counter_ns()
+    await channel.close()
+
+    elapsed_s = (t_res - t_req) / 1e9
+    ack_ms = np.array(ack_ns) / 1e6
+    percentiles = dict(zip(
+        (f"ack_p{p}_ms" for p in ACK_PERCENTILES),
+        np.percentile(ack_ms, ACK_PERCENTILES) if len(ack_ms) else [None] * len(ACK_PERCENTILES),
+    ))
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=batches * batch_bytes,
+        res_size_bytes=0,
+        op="session",
+        batches=batches,
+        records=acked,
+        records_per_s=acked / elapsed_s,
+        window=window,
+        session_bytes=session_bytes,
+        **percentiles,
+    )
+    return {"records": acked, "ack_ms": ack_ms, "session_bytes": session_bytes}
+
+
+async def run_sessions(host: str, port: int, sessions: int, batch_records: int,
+                       window_cap: int, duration_s: float, logger) -> None:
+    t_start = perf_counter_ns()
+    results = await asyncio.gather(*(
+        run_session(host, port, batch_records, window_cap, duration_s, logger)
+        for _ in range(sessions)
+    ))
+    elapsed_s = (perf_counter_ns() - t_start) / 1e9
+
+    records = sum(r["records"] for r in results)
+    ack_ms = np.concatenate([r["ack_ms"] for r in results])
+    session_mb = np.array([r["session_bytes"] for r in results]) / 2**20
+    print(f"{sessions} sessions · {records:_} records in {elapsed_s:.1f}s "
+          f"→ {records / elapsed_s:_.0f} records/s")
+    if len(ack_ms):
+        print("ack latency  " + "  ".join(
+            f"p{p} {v:.2f} ms" for p, v in zip(ACK_PERCENTILES, np.percentile(ack_ms, ACK_PERCENTILES))))
+    print(f"server memory per session  mean {session_mb.mean():.1f} MiB · "
+          f"max {session_mb.max():.1f} MiB")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Hold telemetry sessions open against a Timestream gRPC server")
+    ap.add_argument("--host", default="127.0.0.1", help="Server hostname or IP (default: %(default)s)")
+    ap.add_argument("--port", type=int, default=50051, help="Server port (default: %(default)s)")
+    ap.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS,
+                    help="Concurrent sessions (default: %(default)s)")
+    ap.add_argument("--count", type=int, default=DEFAULT_BATCH_RECORDS,
+                    help="Records per TelemetryBatch (default: %(default)s)")
+    ap.add_argument("--window", type=int,
+                    help="Cap on unacked batches per session (default: whatever the server grants)")
+    ap.add_argument("--duration-s", type=float, default=DEFAULT_DURATION_S,
+                    help="How long each session keeps sending (default: %(default)s)")
+    ap.add_argument(
+        "--logger-name", required=True,
+        help="Name to give the logger instance (must match server if you want unified logs)",
+    )
+    ap.add_argument(
+        "--log-file", type=Path, required=True,
+        help="Path for the JSON-lines log file",
+    )
+    add_profile_args(ap)
+    args = ap.parse_args()
+
+    logger = setup_logger(args.logger_name, args.log_file)
+    sampler_from_args(args)
+    tag_protobuf_backend("client")
+    asyncio.run(run_sessions(args.host, args.port, args.sessions, args.count,
+                             args.window, args.duration_s, logger))
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+netem_proxy.py  –  userspace WAN emulator between a client and a server
+
+Usage
+-----
+python netem_proxy.py --listen-port 51051 --target-port 50051 --delay-ms 40 --jitter-ms 5 --rate-mbit 100
+
+A TCP proxy on asyncio streams; needs neither root nor `tc`. Every accepted
+connection is relayed to the target, and each direction is shaped like one
+side of a link under a netem qdisc:
+
+* delay / jitter : each chunk read is held for delay ± jitter (uniform).
+                   Chunks never overtake each other, as on one TCP stream.
+* rate           : the direction carries at most `--rate-mbit`.
+* burst          : data leaves in bursts of up to `--burst-kb` KiB, each once
+                   the link has had time to transmit it. Small bursts pace the
+                   stream smoothly, large ones make it bursty.
+
+Delay is one-way, so a round trip grows by 2 × delay; the upstream connect is
+held back by one round trip as well, standing in for the TCP handshake.
+At most QUEUE_CHUNKS chunks are buffered per direction; beyond that the proxy
+stops reading, and TCP flow control pushes back on the sender the way a full
+bottleneck buffer would.
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+from typing import NamedTuple, Optional
+
+READ_BYTES = 64 * 1024
+QUEUE_CHUNKS = 64
+DEFAULT_BURST_KB = 64
+
+
+class LinkProfile(NamedTuple):
+    delay_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_mbit: float = 0.0          # 0: unlimited
+    burst_kb: float = DEFAULT_BURST_KB
+
+    def anchor_fields(self) -> dict:
+        """The profile as `netem_*` fields for the time anchor."""
+        return {f"netem_{name}": value for name, value in self._asdict().items()}
+
+
+async def shape(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                link: LinkProfile, rng: random.Random) -> None:
+    """Relay one direction until EOF, then half-close the far side."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(QUEUE_CHUNKS)
+    burst_bytes = max(1, int(link.burst_kb * 1024))
+    bytes_per_s = link.rate_mbit * 1e6 / 8
+
+    async def receive() -> None:
+        t_ready = 0.0
+        while chunk := await reader.read(READ_BYTES):
+            jitter_ms = rng.uniform(-link.jitter_ms, link.jitter_ms) if link.jitter_ms else 0.0
+            # never earlier than the chunk before it
+            t_ready = max(t_ready, loop.time() + max(0.0, link.delay_ms + jitter_ms) / 1e3)
+            await queue.put((t_ready, chunk))
+        await queue.put(None)
+
+    async def transmit() -> None:
+        link_free = 0.0             # when the link has sent everything handed to it
+        while (item := await queue.get()) is not None:
+            t_ready, chunk = item
+            bursts = ([chunk[lo:lo + burst_bytes] for lo in range(0, len(chunk), burst_bytes)]
+                      if bytes_per_s else [chunk])
+            for burst in bursts:
+                t_send = t_ready
+                if bytes_per_s:
+                    link_free = max(link_free, t_ready) + len(burst) / bytes_per_s
+                    t_send = link_free
+                wait = t_send - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                writer.write(burst)
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+
+    await asyncio.gather(receive(), transmit())
+
+
+def set_nodelay(writer: asyncio.StreamWriter) -> None:
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+async def relay(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter,
+                target: tuple, link: LinkProfile, rng: random.Random) -> None:
+    server_writer = None
+    try:
+        # the handshake round trip the local connect did not pay
+        await asyncio.sleep(2 * link.delay_ms / 1e3)
+        server_reader, server_writer = await asyncio.open_connection(*target)
+        set_nodelay(client_writer)
+        set_nodelay(server_writer)
+
+        directions = [
+            asyncio.create_task(shape(client_reader, server_writer, link, rng)),
+            asyncio.create_task(shape(server_reader, client_writer, link, rng)),
+        ]
+        # a reset on one side ends the other as well
+        done, pending = await asyncio.wait(directions, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    except OSError:
+        pass
+    finally:
+        for writer in (client_writer, server_writer):
+            if writer is not None:
+                writer.close()
+
+
+async def serve(listen: tuple, target: tuple, link: LinkProfile,
+                seed: Optional[int] = None) -> None:
+    rng = random.Random(seed)
+    server = await asyncio.start_server(
+        lambda r, w: relay(r, w, target, link, rng), *listen)
+    print(f"netem proxy {listen[0]}:{listen[1]} → {target[0]}:{target[1]} · "
+          f"delay {link.delay_ms} ± {link.jitter_ms} ms · "
+          f"rate {link.rate_mbit or '∞'} Mbit/s · burst {link.burst_kb} KiB")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Userspace WAN emulator (TCP proxy)")
+    ap.add_argument("--listen-host", default="127.0.0.1")
+    ap.add_argument("--listen-port", type=int, required=True)
+    ap.add_argument("--target-host", default="127.0.0.1")
+    ap.add_argument("--target-port", type=int, required=True)
+    ap.add_argument("--delay-ms", type=float, default=0.0,
+                    help="One-way delay added in each direction (default: %(default)s)")
+    ap.add_argument("--jitter-ms", type=float, default=0.0,
+                    help="Uniform ± jitter around the delay (default: %(default)s)")
+    ap.add_argument("--rate-mbit", type=float, default=0.0,
+                    help="Bandwidth cap per direction, 0 = unlimited (default: %(default)s)")
+    ap.add_argument("--burst-kb", type=float, default=DEFAULT_BURST_KB,
+                    help="Largest burst released at once under --rate-mbit (default: %(default)s)")
+    ap.add_argument("--seed", type=int, help="Seed of the jitter generator")
+    args = ap.parse_args()
+
+    link = LinkProfile(args.delay_ms, args.jitter_ms, args.rate_mbit, args.burst_kb)
+    try:
+        asyncio.run(serve((args.listen_host, args.listen_port),
+                          (args.target_host, args.target_port), link, args.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,15 @@ pid_monitor.py  –  sample CPU and memory of a running process
 
 Usage
 -----
-python pid_monitor.py <PID> <out_file.jsonl> [--interval 0.2]
+python pid_monitor.py <PID> <out_file.jsonl> [--interval 0.2] [--append]
 
 Records one JSON line per sample:
-{"ts": 1715965234.115274, "rss": 73424896, "cpu": 37.5}
+{"ts": 3611024519834, "rss": 73424896, "cpu": 37.5, "pid": 4242}
 
-* ts   : seconds since epoch (time.time()).
+* ts   : perf_counter_ns() – the clock the request logs use.
 * rss  : resident set size in bytes.
 * cpu  : percent CPU since last sample (same meaning as psutil.cpu_percent()).
+* pid  : the monitored process, so appended runs can be told apart.
 """
 
 import argparse
@@ -28,10 +29,12 @@ def main() -> None:
     ap.add_argument("outfile")
     ap.add_argument("--interval", type=float, default=DEFAULT_SAMPLING_INTERVAL,
                     help=f"sampling interval in seconds (default: {DEFAULT_SAMPLING_INTERVAL})")
+    ap.add_argument("--append", action="store_true",
+                    help="append to outfile instead of truncating it")
     args = ap.parse_args()
 
     proc = psutil.Process(args.pid)
-    with open(args.outfile, "w") as fh:
+    with open(args.outfile, "a" if args.append else "w") as fh:
         # prime the cpu_percent() logic
         proc.cpu_percent(None)
 
@@ -40,7 +43,7 @@ def main() -> None:
                 ts   = perf_counter_ns()
                 rss  = proc.memory_info().rss
                 cpu  = proc.cpu_percent(None)   # % since last call
-                fh.write(json.dumps({"ts": ts, "rss": rss, "cpu": cpu}) + "\n")
+                fh.write(json.dumps({"ts": ts, "rss": rss, "cpu": cpu, "pid": args.pid}) + "\n")
                 fh.flush()
                 time.sleep(args.interval)
             except (psutil.NoSuchProcess, psutil.AccessDenied):
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+profile_diff.py  –  compare two collapsed-stack profiles
+
+Usage
+-----
+python profile_diff.py <base.collapsed> <new.collapsed> [--by self|total] [--top 25]
+                       [--folded-out diff.folded]
+
+Both profiles are normalised to shares of their own total, so runs of
+different length (or different protocols) can be compared. Prints the frames
+whose share changed most:
+
+    self  – samples where the frame is the leaf (where the CPU actually went)
+    total – samples where the frame is anywhere on the stack (inclusive)
+
+`--folded-out` writes "<stack> <base> <new>" lines, the input format of
+flamegraph's difffolded.pl / speedscope, for a differential flame graph.
+
+Example
+-------
+python profile_diff.py data/single_request/grpc/profile-server-100000-items.collapsed \
+                       data/single_request/rest_proto/profile-server-100000-items.collapsed
+"""
+
+import argparse
+from collections import Counter
+from pathlib import Path
+
+from utils.stack_sampler import read_collapsed
+
+
+def frame_shares(counts: Counter, by: str) -> Counter:
+    """Share (0…1) of all samples per frame, self or inclusive."""
+    total = sum(counts.values()) or 1
+    shares = Counter()
+    for stack, count in counts.items():
+        frames = stack.split(";")
+        if by == "self":
+            shares[frames[-1]] += count / total
+        else:
+            for frame in set(frames):          # recursion counts once
+                shares[frame] += count / total
+    return shares
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Diff two collapsed-stack profiles")
+    ap.add_argument("base", type=Path)
+    ap.add_argument("new", type=Path)
+    ap.add_argument("--by", choices=("self", "total"), default="self",
+                    help="Compare leaf (self) or inclusive (total) shares (default: %(default)s)")
+    ap.add_argument("--top", type=int, default=25, help="Rows to print (default: %(default)s)")
+    ap.add_argument("--folded-out", type=Path,
+                    help="Also write a two-column folded file for a differential flame graph")
+    args = ap.parse_args()
+
+    base = read_collapsed(args.base)
+    new = read_collapsed(args.new)
+    print(f"base: {args.base}  ({sum(base.values())} samples)")
+    print(f"new : {args.new}  ({sum(new.values())} samples)\n")
+
+    base_shares = frame_shares(base, args.by)
+    new_shares = frame_shares(new, args.by)
+    frames = set(base_shares) | set(new_shares)
+    rows = sorted(frames, key=lambda f: abs(new_shares[f] - base_shares[f]), reverse=True)
+
+    print(f"{'base %':>8} {'new %':>8} {'delta':>8}  frame ({args.by})")
+    for frame in rows[:args.top]:
+        b, n = base_shares[frame] * 100, new_shares[frame] * 100
+        print(f"{b:8.2f} {n:8.2f} {n - b:+8.2f}  {frame}")
+
+    if args.folded_out:
+        with open(args.folded_out, "w") as fh:
+            for stack in sorted(set(base) | set(new)):
+                fh.write(f"{stack} {base[stack]} {new[stack]}\n")
+        print(f"\n✅  Wrote differential folded stacks to {args.folded_out}")
+
+
+if __name__ == "__main__":
+    main()
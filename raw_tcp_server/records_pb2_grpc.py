@@ -0,0 +1,269 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+import records_pb2 as records__pb2
+
+GRPC_GENERATED_VERSION = '1.71.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + f' but the generated code in records_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class TimestreamStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.getRecordListResponse = channel.unary_unary(
+                '/timestream.Timestream/getRecordListResponse',
+                request_serializer=records__pb2.RecordListRequest.SerializeToString,
+                response_deserializer=records__pb2.RecordListResponse.FromString,
+                _registered_method=True)
+        self.AggregateRecords = channel.unary_unary(
+                '/timestream.Timestream/AggregateRecords',
+                request_serializer=records__pb2.AggregateRequest.SerializeToString,
+                response_deserializer=records__pb2.AggregateResponse.FromString,
+                _registered_method=True)
+        self.BatchGetRecordLists = channel.unary_unary(
+                '/timestream.Timestream/BatchGetRecordLists',
+                request_serializer=records__pb2.BatchRecordListRequest.SerializeToString,
+                response_deserializer=records__pb2.BatchRecordListResponse.FromString,
+                _registered_method=True)
+        self.IngestRecords = channel.stream_unary(
+                '/timestream.Timestream/IngestRecords',
+                request_serializer=records__pb2.IngestRequest.SerializeToString,
+                response_deserializer=records__pb2.IngestResponse.FromString,
+                _registered_method=True)
+        self.TelemetrySession = channel.stream_stream(
+                '/timestream.Timestream/TelemetrySession',
+                request_serializer=records__pb2.TelemetryBatch.SerializeToString,
+                response_deserializer=records__pb2.TelemetryAck.FromString,
+                _registered_method=True)
+
+
+class TimestreamServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def getRecordListResponse(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AggregateRecords(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatchGetRecordLists(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def IngestRecords(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TelemetrySession(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_TimestreamServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'getRecordListResponse': grpc.unary_unary_rpc_method_handler(
+                    servicer.getRecordListResponse,
+                    request_deserializer=records__pb2.RecordListRequest.FromString,
+                    response_serializer=records__pb2.RecordListResponse.SerializeToString,
+            ),
+            'AggregateRecords': grpc.unary_unary_rpc_method_handler(
+                    servicer.AggregateRecords,
+                    request_deserializer=records__pb2.AggregateRequest.FromString,
+                    response_serializer=records__pb2.AggregateResponse.SerializeToString,
+            ),
+            'BatchGetRecordLists': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchGetRecordLists,
+                    request_deserializer=records__pb2.BatchRecordListRequest.FromString,
+                    response_serializer=records__pb2.BatchRecordListResponse.SerializeToString,
+            ),
+            'IngestRecords': grpc.stream_unary_rpc_method_handler(
+                    servicer.IngestRecords,
+                    request_deserializer=records__pb2.IngestRequest.FromString,
+                    response_serializer=records__pb2.IngestResponse.SerializeToString,
+            ),
+            'TelemetrySession': grpc.stream_stream_rpc_method_handler(
+                    servicer.TelemetrySession,
+                    request_deserializer=records__pb2.TelemetryBatch.FromString,
+                    response_serializer=records__pb2.TelemetryAck.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'timestream.Timestream', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('timestream.Timestream', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Timestream(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def getRecordListResponse(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/timestream.Timestream/getRecordListResponse',
+            records__pb2.RecordListRequest.SerializeToString,
+            records__pb2.RecordListResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def AggregateRecords(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/timestream.Timestream/AggregateRecords',
+            records__pb2.AggregateRequest.SerializeToString,
+            records__pb2.AggregateResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatchGetRecordLists(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/timestream.Timestream/BatchGetRecordLists',
+            records__pb2.BatchRecordListRequest.SerializeToString,
+            records__pb2.BatchRecordListResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def IngestRecords(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/timestream.Timestream/IngestRecords',
+            records__pb2.IngestRequest.SerializeToString,
+            records__pb2.IngestResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def TelemetrySession(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/timestream.Timestream/TelemetrySession',
+            records__pb2.TelemetryBatch.SerializeToString,
+            records__pb2.TelemetryAck.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Framework-free baseline: a plain asyncio stream server answering
+RecordListRequests over length-prefixed frames (see utils/framing.py).
+
+There is no HTTP, routing or middleware. Each request frame is decoded, and
+the records go back on the same persistent connection in the encoding the
+request used: protobuf (RecordListRequest / RecordListResponse bytes) or
+JSON ({"count", "offset"} / {"records": [...]}).
+
+The record pool, log_rpc lines and timestamps are the same as in the other
+three servers, so this server's latency is a lower bound for theirs.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from time import perf_counter_ns
+
+import records_pb2 as pb2            # generated by `protoc`
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.logger import setup_logger, log_rpc        # noqa: E402
+from utils.admission import (                         # noqa: E402
+    AdmissionController, AdmissionRejected, add_admission_args, controller_from_args,
+)
+from utils.cancellation import iter_slices            # noqa: E402
+from utils.offload import (                           # noqa: E402
+    OFFLOAD_CHUNK_RECORDS, Offloader, add_offload_args, offloader_from_args,
+)
+from utils.loop_lag import LoopLagMonitor             # noqa: E402
+from utils.instrumentation import (                   # noqa: E402
+    add_instrumentation_args, freeze_gc, instrumentation_from_args,
+)
+from utils.alloc_tracking import (                    # noqa: E402
+    AllocTracker, add_alloc_tracking_args, alloc_tracker_from_args,
+)
+from utils.stack_sampler import add_profile_args, sampler_from_args  # noqa: E402
+from utils.protobuf_backend import tag_protobuf_backend  # noqa: E402
+from utils.uds import add_uds_args, remove_stale_socket, tag_transport  # noqa: E402
+from utils.startup import (                           # noqa: E402
+    StartupLog, add_startup_args, record_pool, startup_from_args,
+)
+from utils.framing import (                           # noqa: E402
+    KIND_JSON, KIND_PROTO, STATUS_ERROR, STATUS_OK, STATUS_REJECTED,
+    FrameError, read_frame, req_id_to_str, write_frame,
+)
+
+
+def encode_records(records: list, offset: int, count: int) -> bytes:
+    """
+    RecordListResponse(records=records[offset:offset + count]) serialised
+    OFFLOAD_CHUNK_RECORDS at a time (concatenated encodings of a repeated
+    field decode as one message), so an offload thread releases the GIL
+    between chunks. Module level so the process pool can import it.
+    """
+    return b"".join(
+        pb2.RecordListResponse(records=records[lo:hi]).SerializeToString()
+        for lo, hi in iter_slices(offset, offset + count, OFFLOAD_CHUNK_RECORDS)
+    )
+
+
+def encode_records_json(records: list, offset: int, count: int) -> bytes:
+    """JSON counterpart of `encode_records`, byte-identical to rest_json's body."""
+    parts = [json.dumps(records[lo:hi])[1:-1]
+             for lo, hi in iter_slices(offset, offset + count, OFFLOAD_CHUNK_RECORDS)]
+    return ('{"records": [' + ", ".join(parts) + "]}").encode()
+
+
+ENCODERS = {KIND_PROTO: encode_records, KIND_JSON: encode_records_json}
+
+
+def decode_request(kind: int, payload: bytes) -> tuple:
+    """(offset, count) of a request frame; ValueError if it is malformed."""
+    if kind == KIND_PROTO:
+        try:
+            req_pb = pb2.RecordListRequest.FromString(payload)
+        except Exception:
+            raise ValueError("Invalid protobuf payload")
+        return req_pb.offset, req_pb.count
+    if kind == KIND_JSON:
+        try:
+            req = json.loads(payload)
+            offset, count = int(req.get("offset", 0)), int(req["count"])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise ValueError("Invalid JSON payload")
+        if offset < 0 or count < 0:
+            raise ValueError("offset and count must not be negative")
+        return offset, count
+    raise ValueError(f"Unknown request kind {kind}")
+
+
+class RawTcpServer:
+    def __init__(self, pool_size: int, logger: logging.Logger,
+                 admission: AdmissionController = None,
+                 offloader: Offloader = None,
+                 alloc_tracker: AllocTracker = None,
+                 pool_build: str = "eager",
+                 startup_log: StartupLog = None):
+        self.pool = record_pool(pool_size, pool_build, startup_log)
+        self._logger = logger
+        self._pool_size = pool_size
+        self._admission = admission
+        self._offloader = offloader
+        self._alloc_tracker = alloc_tracker
+
+    @property
+    def records(self) -> list:
+        return self.pool.records
+
+    async def _build(self, kind: int, payload: bytes) -> tuple:
+        """(status, body, extra log fields) for one request frame."""
+        try:
+            offset, count = decode_request(kind, payload)
+        except ValueError as exc:
+            return STATUS_ERROR, str(exc).encode(), {}
+        if offset + count > self._pool_size:
+            return STATUS_ERROR, b"Requested offset + count exceeds pool size", {}
+
+        admitted = {}
+        if self._admission is not None:
+            try:
+                admitted["t_admit"] = await self._admission.acquire()
+            except AdmissionRejected as exc:
+                return STATUS_REJECTED, exc.reason.encode(), {"reject_reason": exc.reason}
+        try:
+            encode = ENCODERS[kind]
+            if self._offloader is not None and self._offloader.wanted(count):
+                body = await self._offloader.encode(encode, self.records, offset, count)
+                return STATUS_OK, body, {**admitted, "offload": self._offloader.pool}
+            if kind == KIND_PROTO:
+                body = pb2.RecordListResponse(
+                    records=self.records[offset:offset + count]).SerializeToString()
+            else:
+                body = json.dumps({"records": self.records[offset:offset + count]}).encode()
+            return STATUS_OK, body, admitted
+        finally:
+            if admitted:
+                self._admission.release()
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Serve request frames one after another until the client hangs up."""
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    return
+                t_in = perf_counter_ns()
+                req_id_int, kind, payload = frame
+                req_id = req_id_to_str(req_id_int)
+
+                if self._alloc_tracker is not None:
+                    self._alloc_tracker.begin(req_id)
+                try:
+                    status, body, extra = await self._build(kind, payload)
+                    write_frame(writer, req_id_int, status, body)
+                    await writer.drain()
+
+                    # Log AFTER the response has been handed to the kernel
+                    if status != STATUS_ERROR:
+                        log_rpc(self._logger, t_in=t_in, req_id=req_id, **extra)
+                finally:
+                    if self._alloc_tracker is not None:
+                        self._alloc_tracker.discard(req_id)
+        except (FrameError, asyncio.IncompleteReadError, ConnectionError) as exc:
+            print(f"Dropping connection: {exc!r}")
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int, pool_size: int, logger_name: str, log_file_path: Path,
+                admission: AdmissionController = None, offloader: Offloader = None,
+                loop_lag: LoopLagMonitor = None, gc_freeze: bool = False,
+                alloc_tracker: AllocTracker = None, uds: Path = None,
+                pool_build: str = "eager", startup_log: StartupLog = None):
+    logger = setup_logger(logger_name, log_file_path)
+    handler = RawTcpServer(pool_size, logger, admission, offloader, alloc_tracker,
+                           pool_build, startup_log)
+    if gc_freeze:
+        freeze_gc()
+
+    if uds is not None:
+        remove_stale_socket(uds)
+        server = await asyncio.start_unix_server(handler.handle_connection, str(uds))
+        print(f"Raw TCP server on unix:{uds}")
+    else:
+        # asyncio enables TCP_NODELAY on accepted sockets itself
+        server = await asyncio.start_server(handler.handle_connection, host, port)
+        print(f"Raw TCP server on {host}:{port}")
+    if startup_log is not None:
+        startup_log.mark("bound")
+    if loop_lag is not None:
+        loop_lag.start()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if loop_lag is not None:
+            loop_lag.stop()
+        if offloader is not None:
+            offloader.shutdown()
+
+
+if __name__ == "__main__":
+    t_imported = perf_counter_ns()
+    ap = argparse.ArgumentParser(description="Launch the raw TCP baseline server")
+    ap.add_argument("--host", default="127.0.0.1", help="Bind address (default: %(default)s)")
+    ap.add_argument("--port", type=int, required=True, help="Port to listen on")
+    ap.add_argument("--pool-size", type=int, required=True, help="Number of records to pre-allocate")
+    ap.add_argument("--logger-name", required=True)
+    ap.add_argument("--log-file", type=Path, required=True)
+    add_admission_args(ap)
+    add_offload_args(ap)
+    add_instrumentation_args(ap)
+    add_alloc_tracking_args(ap)
+    add_profile_args(ap)
+    add_uds_args(ap)
+    add_startup_args(ap)
+    args = ap.parse_args()
+    if args.gc_freeze and args.pool_build != "eager":
+        ap.error("--gc-freeze needs --pool-build eager (it freezes the pool built before it)")
+    sampler_from_args(args)
+    tag_protobuf_backend("server")
+    tag_transport("server", args.uds)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.pool_size,
+                          args.logger_name, args.log_file,
+                          controller_from_args(args),
+                          offloader_from_args(args),
+                          instrumentation_from_args(args),
+                          args.gc_freeze,
+                          alloc_tracker_from_args(args, "server"),
+                          args.uds,
+                          args.pool_build,
+                          startup_from_args(args, t_imported)))
+    except (KeyboardInterrupt, SystemExit):            # graceful exit
+        print("Shutting down raw TCP server")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Simple client for the raw TCP baseline server.
+
+Sends RecordListRequests as length-prefixed frames (utils/framing.py) over
+one persistent connection, as protobuf or JSON, and logs one log_client
+line per request.
+"""
+
+import argparse
+import json
+import secrets
+import socket
+import sys
+from pathlib import Path
+from time import perf_counter_ns
+
+import records_pb2 as pb2
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.logger import setup_logger, log_client            # noqa: E402
+from utils.alloc_tracking import (                           # noqa: E402
+    add_alloc_tracking_args, alloc_tracker_from_args,
+)
+from utils.stack_sampler import add_profile_args, sampler_from_args  # noqa: E402
+from utils.protobuf_backend import tag_protobuf_backend      # noqa: E402
+from utils.uds import add_uds_args, tag_transport             # noqa: E402
+from utils.size_mix import add_mix_args, run_mix             # noqa: E402
+from utils.framing import (                                  # noqa: E402
+    ENCODING_KINDS, ENCODINGS, STATUS_OK, STATUS_REJECTED,
+    recv_frame, req_id_to_int, send_frame,
+)
+
+
+# --------------------------------------------------------------------------- #
+# Main client logic                                                           #
+# --------------------------------------------------------------------------- #
+
+def encode_request(encoding: str, count: int) -> bytes:
+    if encoding == "proto":
+        return pb2.RecordListRequest(count=count).SerializeToString()
+    return json.dumps({"count": count}).encode()
+
+
+def decode_response(encoding: str, body: bytes):
+    if encoding == "proto":
+        return pb2.RecordListResponse.FromString(body)
+    return json.loads(body)
+
+
+def connect(host: str, port: int, uds: Path = None) -> socket.socket:
+    if uds is not None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(uds))
+        return sock
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def fetch_records(host: str, port: int, count: int, encoding: str,
+                  requests: int, logger, uds: Path = None) -> None:
+    """
+    Issue `requests` requests one after another on a single connection.
+    The connection is opened inside the first request's latency window, as
+    the HTTP and gRPC clients do.
+    """
+    kind = ENCODING_KINDS[encoding]
+    sock = None
+    try:
+        for _ in range(requests):
+            req_id = f"{secrets.randbits(64):016x}"
+
+            # Overall lifecycle start
+            t0 = perf_counter_ns()
+
+            # 1. latency window – serialise right in the call -------------------
+            t_req = perf_counter_ns()
+
+            payload = encode_request(encoding, count)
+            if sock is None:
+                sock = connect(host, port, uds)
+            send_frame(sock, req_id_to_int(req_id), kind, payload)
+            _, status, body = recv_frame(sock)
+
+            if status == STATUS_REJECTED:
+                # Shed by the server's admission control – log it so goodput can be computed
+                log_client(
+                    logger,
+                    t0=t0,
+                    t_req=t_req,
+                    t_res=perf_counter_ns(),
+                    req_id=req_id,
+                    req_size_bytes=len(payload),
+                    res_size_bytes=len(body),
+                    encoding=encoding,
+                    status="rejected",
+                )
+                print("Rejected")
+                continue
+
+            if status != STATUS_OK:
+                print(f"Server error: {body.decode(errors='replace')}")
+                return
+
+            # Decode response (bytes) to a python object
+            decode_response(encoding, body)
+
+            # 2. Measure response time
+            # I.e., the time the received object is usable as an object with the client
+            t_res = perf_counter_ns()
+
+            log_client(
+                logger,
+                t0=t0,
+                t_req=t_req,
+                t_res=t_res,
+                req_id=req_id,
+                req_size_bytes=len(payload),
+                res_size_bytes=len(body),
+                encoding=encoding,
+            )
+    finally:
+        if sock is not None:
+            sock.close()
+
+    print("Finished")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Fetch records from the raw TCP baseline server")
+    ap.add_argument("--host", default="127.0.0.1", help="Server hostname or IP (default: %(default)s)")
+    ap.add_argument("--port", type=int, default=8002, help="Server port (default: %(default)s)")
+    ap.add_argument("--count", type=int, default=100, help="Number of records to request (default: %(default)s)")
+    ap.add_argument(
+        "--logger-name", required=True,
+        help="Name to give the logger instance (must match server if you want unified logs)",
+    )
+    ap.add_argument(
+        "--log-file", type=Path, required=True,
+        help="Path for the JSON-lines log file",
+    )
+    ap.add_argument("--encoding", choices=ENCODINGS, default="proto",
+                    help="Payload encoding of requests and responses (default: %(default)s)")
+    ap.add_argument("--requests", type=int, default=1,
+                    help="Requests to send one after another on the connection (default: %(default)s)")
+    add_alloc_tracking_args(ap)
+    add_profile_args(ap)
+    add_uds_args(ap)
+    add_mix_args(ap)
+    args = ap.parse_args()
+
+    logger = setup_logger(args.logger_name, args.log_file)
+    alloc_tracker_from_args(args, "client")
+    sampler_from_args(args)
+    tag_protobuf_backend("client")
+    tag_transport("client", args.uds)
+    if args.mix:
+        run_mix(lambda count: fetch_records(args.host, args.port, count, args.encoding, 1,
+                                            logger, args.uds),
+                args.mix, args.mix_requests, args.mix_seed)
+    else:
+        fetch_records(args.host, args.port, args.count, args.encoding, args.requests, logger,
+                      args.uds)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+replay_trace.py  –  replay recorded client logs against a running server
+
+Usage
+-----
+python replay_trace.py rest_json data/single_request/rest_json/client-10-items.jsonl --log-file data/replay/rest_json.jsonl
+python replay_trace.py grpc data/single_request/grpc/client-1000000-items-mix.jsonl --speed 4 --where mix=zipf:a=1.5,scale=10 --log-file data/replay/grpc.jsonl
+
+A trace is any client JSON-lines log: one request per line, with `t0`
+(perf_counter_ns) as arrival time and `count` as size. Logs without a
+`count` field take it from their file name (`client-<size>-items…`). The
+requests are issued at the recorded inter-arrival times, divided by
+`--speed`, against the server of the given mode, which must already be
+running.
+
+Arrivals are open loop: a scheduler thread hands each request to a pool of
+`--workers` threads at its due time and never waits for earlier ones. Each
+worker runs the mode's own client code (`fetch_records` of its
+single_request_client.py), so a replayed line is measured exactly like the
+recorded one and carries `replay_of` (the recorded req_id) and `t_sched`.
+`t0 - t_sched` is how late the request started. It stays near zero unless
+every worker was busy.
+
+At the end, recorded and replayed latency (t_res - t_req) are compared per
+count and written next to the log as `<log>_summary.csv`.
+"""
+
+import argparse
+import importlib.util
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmark_single_request import CFG, HOST
+from utils.logger import register_client_tagger, setup_logger
+from utils.uds import add_uds_args, tag_transport
+
+SIZE_IN_NAME = re.compile(r"-(\d+)-items")
+DEFAULT_WORKERS = 32
+PERCENTILES = (50, 90, 99)
+# p99 start lag beyond which the replayer, not the server, set the pace
+LAG_WARN_MS = 10.0
+
+
+def load_trace(paths: List[Path], where: Dict[str, str], limit: Optional[int] = None) -> pd.DataFrame:
+    """The requests of `paths` in arrival order, keeping lines whose fields match `where`."""
+    frames = []
+    for path in paths:
+        df = pd.read_json(path, lines=True)
+        if df.empty:
+            continue
+        if "count" not in df.columns or df["count"].isna().any():
+            match = SIZE_IN_NAME.search(path.name)
+            if match is None:
+                raise ValueError(f"{path}: no count field and no size in the file name")
+            # older lines of the same log may predate the count field
+            df["count"] = df.get("count", pd.Series(index=df.index, dtype=float)).fillna(int(match[1]))
+        frames.append(df)
+    if not frames:
+        raise ValueError("the trace is empty")
+
+    trace = pd.concat(frames, ignore_index=True)
+    for field, value in where.items():
+        if field not in trace.columns:
+            raise ValueError(f"no field {field!r} in the trace")
+        trace = trace[trace[field].astype(str) == value]
+    trace = trace.dropna(subset=["t0", "count"]).sort_values("t0", kind="stable")
+    if limit:
+        trace = trace.head(limit)
+    return trace.reset_index(drop=True)
+
+
+def load_client(mode: str):
+    """The mode's single_request_client.py as a module (its own records_pb2 first on sys.path)."""
+    client_file = Path(CFG[mode]["client_file"]).resolve()
+    sys.path.insert(0, str(client_file.parent))
+    spec = importlib.util.spec_from_file_location(f"{mode}_single_request_client", client_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def client_fetch(mode: str, host: str, port: int, logger,
+                 uds: Optional[Path] = None) -> Callable[[int], None]:
+    """fetch(count): one request the way the mode's client sends it."""
+    client = load_client(mode)
+    if mode == "raw_tcp":
+        return lambda count: client.fetch_records(host, port, count, "proto", 1, logger, uds)
+    return lambda count: client.fetch_records(host, port, count, logger, uds=uds)
+
+
+def replay(trace: pd.DataFrame, fetch: Callable[[int], None], speed: float,
+           workers: int) -> int:
+    """Issue the trace at its recorded pace / `speed`; returns the perf_counter_ns it started at."""
+    current = threading.local()
+    register_client_tagger(lambda t0, t_res, req_id: {"replay_of": current.replay_of,
+                                                      "t_sched": current.t_sched})
+    errors = []
+
+    def run(count: int, replay_of: str, t_sched: int) -> None:
+        current.replay_of, current.t_sched = replay_of, t_sched
+        try:
+            fetch(count)
+        except Exception as exc:            # a failed request must not stop the replay
+            errors.append(exc)
+
+    offsets = ((trace["t0"] - trace["t0"].iloc[0]) / speed).astype(np.int64).to_numpy()
+    t_start = perf_counter_ns()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for offset, count, replay_of in zip(offsets, trace["count"], trace["req_id"]):
+            t_sched = t_start + int(offset)
+            wait_ns = t_sched - perf_counter_ns()
+            if wait_ns > 0:
+                time.sleep(wait_ns / 1e9)
+            pool.submit(run, int(count), replay_of, t_sched)
+
+    if errors:
+        print(f"⚠️  {len(errors)} requests failed, e.g. {errors[0]!r}")
+    return t_start
+
+
+def compare(trace: pd.DataFrame, log_file: Path, t_start: int) -> pd.DataFrame:
+    """Recorded vs replayed latency per count, from the lines this replay appended to `log_file`."""
+    replayed = pd.read_json(log_file, lines=True)
+    replayed = replayed[replayed["t_sched"] >= t_start]
+    df = trace.merge(replayed, left_on="req_id", right_on="replay_of",
+                     suffixes=("_recorded", "_replay"))
+    for status in ("status_recorded", "status_replay"):
+        if status in df.columns:
+            df = df[df[status].isna()]
+    df["recorded_ms"] = (df["t_res_recorded"] - df["t_req_recorded"]) / 1e6
+    df["replay_ms"] = (df["t_res_replay"] - df["t_req_replay"]) / 1e6
+    df["start_lag_ms"] = (df["t0_replay"] - df["t_sched"]) / 1e6
+
+    rows = []
+    for count, group in df.groupby("count_recorded" if "count_recorded" in df.columns else "count"):
+        row = {"count": count, "requests": len(group)}
+        for side in ("recorded", "replay"):
+            for p, v in zip(PERCENTILES, np.percentile(group[f"{side}_ms"], PERCENTILES)):
+                row[f"{side}_p{p}_ms"] = v
+        row["p50_ratio"] = row["replay_p50_ms"] / row["recorded_p50_ms"]
+        row["start_lag_p99_ms"] = np.percentile(group["start_lag_ms"], 99)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Replay recorded client logs against a running server")
+    ap.add_argument("mode", choices=CFG.keys(), help="Which stack to send the requests to")
+    ap.add_argument("trace", type=Path, nargs="+", help="Client JSON-lines log(s) to replay")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, help="Server port (default: the mode's port in CFG)")
+    ap.add_argument("--speed", type=float, default=1.0,
+                    help="Replay this many times faster than recorded (default: %(default)s)")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                    help="Requests that can be in flight at once (default: %(default)s)")
+    ap.add_argument("--where", nargs="+", default=[], metavar="FIELD=VALUE",
+                    help="Only replay trace lines with these field values, e.g. mix=… transport=tcp")
+    ap.add_argument("--limit", type=int, help="Replay only the first N requests")
+    ap.add_argument("--log-file", type=Path, required=True,
+                    help="JSON-lines log for the replayed requests")
+    add_uds_args(ap)
+    args = ap.parse_args()
+
+    where = {}
+    for item in args.where:
+        field, sep, value = item.partition("=")
+        if not sep:
+            ap.error(f"--where expects FIELD=VALUE, got {item!r}")
+        where[field] = value
+    try:
+        trace = load_trace(args.trace, where, args.limit)
+    except ValueError as exc:
+        ap.error(str(exc))
+    if args.speed <= 0:
+        ap.error("--speed must be positive")
+
+    span_s = (trace["t0"].iloc[-1] - trace["t0"].iloc[0]) / 1e9 / args.speed
+    print(f"Replaying {len(trace):_} requests over {span_s:.1f}s against {args.mode} "
+          f"({args.speed}× speed, {args.workers} workers)")
+
+    args.log_file.parent.mkdir(parents=True, exist_ok=True)
+    logger = setup_logger(f"{CFG[args.mode]['logger_prefix']}-replay", args.log_file)
+    tag_transport("client", args.uds)
+    fetch = client_fetch(args.mode, args.host, args.port or CFG[args.mode]["port"], logger, args.uds)
+    t_start = replay(trace, fetch, args.speed, args.workers)
+
+    summary = compare(trace, args.log_file, t_start)
+    summary_csv = args.log_file.with_name(f"{args.log_file.stem}_summary.csv")
+    summary.to_csv(summary_csv, index=False)
+    print(summary.to_string(index=False))
+    if (summary["start_lag_p99_ms"] > LAG_WARN_MS).any():
+        print(f"⚠️  p99 start lag above {LAG_WARN_MS} ms: requests left late; "
+              "add --workers or run the replayer on its own cores")
+    print(f"✅  Wrote {len(summary)} rows to {summary_csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,10 @@ gRPC version so the two implementations can be compared one-for-one.
 """
 
 import argparse
+import asyncio
 import logging
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 from time import perf_counter_ns
 
@@ -26,18 +28,125 @@ sys.path.insert(0, str(PROJECT_ROOT))
 
 from utils.logger import setup_logger, log_rpc        # noqa: E402
 from utils.constants import PROTOTYPE_RECORD
+from utils.admission import (                         # noqa: E402
+    AdmissionController, AdmissionRejected, DEADLINE_HEADER,
+    add_admission_args, controller_from_args,
+)
+from utils.cancellation import (                         # noqa: E402
+    CancellationStats, RequestCancelled, add_cancellation_args,
+    deadline_from_header, iter_slices,
+)
+from utils.http_cache import etag_matches, pool_version, record_list_etag  # noqa: E402
+from utils.offload import (                           # noqa: E402
+    OFFLOAD_CHUNK_RECORDS, Offloader, add_offload_args, offloader_from_args,
+)
+from utils.loop_lag import LoopLagMonitor             # noqa: E402
+from utils.instrumentation import (                   # noqa: E402
+    add_instrumentation_args, freeze_gc, instrumentation_from_args,
+)
+from utils.alloc_tracking import (                    # noqa: E402
+    AllocTracker, AllocTrackingMiddleware, add_alloc_tracking_args, alloc_tracker_from_args,
+)
+from utils.stack_sampler import add_profile_args, sampler_from_args  # noqa: E402
+from utils.ingest import IngestStore                  # noqa: E402
+from utils.uds import add_uds_args, remove_stale_socket, tag_transport  # noqa: E402
+from utils.startup import (                           # noqa: E402
+    StartupLog, add_startup_args, record_pool, startup_from_args,
+)
+from utils.protobuf_backend import tag_protobuf_backend  # noqa: E402
+from utils.bare_asgi import (                         # noqa: E402
+    log_on_complete, read_body, run_lifespan, send_response,
+)
+
+
+def encode_records(records: list, offset: int, count: int) -> bytes:
+    """
+    RecordListResponse(records=records[offset:offset + count]) serialised
+    OFFLOAD_CHUNK_RECORDS at a time (concatenated encodings of a repeated
+    field decode as one message), so an offload thread releases the GIL
+    between chunks. Module level so the process pool can import it.
+    """
+    return b"".join(
+        pb2.RecordListResponse(records=records[lo:hi]).SerializeToString()
+        for lo, hi in iter_slices(offset, offset + count, OFFLOAD_CHUNK_RECORDS)
+    )
 
 
 # --------------------------------------------------------------------------- #
 # Application factory                                                         #
 # --------------------------------------------------------------------------- #
 
-def create_app(pool_size: int, logger: logging.Logger) -> FastAPI:
+def create_app(pool_size: int, logger: logging.Logger,
+               admission: AdmissionController = None,
+               cancel_chunk_records: int = 0,
+               offloader: Offloader = None,
+               loop_lag: LoopLagMonitor = None,
+               pool_build: str = "eager",
+               startup_log: StartupLog = None) -> FastAPI:
     """Return a FastAPI app whose state owns the pre-allocated records."""
-    records = [PROTOTYPE_RECORD.copy() for _ in range(pool_size)]
+    pool = record_pool(pool_size, pool_build, startup_log, columnar=True)
+    ingest_store = IngestStore()
+
+    @asynccontextmanager
+    async def admission_slot(request: Request, t_in: int, req_id: str):
+        """
+        Hold an admission slot while the response body is built; yields the
+        extra log fields. Without admission control this is a no-op. Sheds
+        the request with 503 when the queue is full or the wait outlives the
+        queue timeout / the client's `req-deadline-ms` budget.
+        """
+        if admission is None:
+            yield {}
+            return
+        deadline_ms = request.headers.get(DEADLINE_HEADER)
+        try:
+            t_admit = await admission.acquire(
+                float(deadline_ms) / 1000 if deadline_ms else None)
+        except AdmissionRejected as exc:
+            log_rpc(logger, t_in=t_in, req_id=req_id,
+                    reject_reason=exc.reason)
+            raise HTTPException(503, f"Server overloaded ({exc.reason})")
+        try:
+            yield {"t_admit": t_admit}
+        finally:
+            admission.release()
+
+    cancel_stats = CancellationStats()
+
+    # The pool never changes after this point → one version for its lifetime
+    version = pool_version(PROTOTYPE_RECORD, pool_size)
+
+    async def encode_chunked(request: Request, t_in: int, start: int, count: int,
+                             encode) -> list:
+        """
+        Encode records[start:start+count] `cancel_chunk_records` at a time and
+        return the encoded parts. Between chunks, raises RequestCancelled if
+        the client disconnected or its `req-deadline-ms` budget ran out.
+        """
+        deadline_ns = deadline_from_header(t_in, request.headers.get(DEADLINE_HEADER))
+        parts = []
+        for lo, hi in iter_slices(start, start + count, cancel_chunk_records):
+            parts.append(encode(pool.records[lo:hi]))
+            await asyncio.sleep(0)          # lets uvicorn notice a disconnect
+            if deadline_ns is not None and perf_counter_ns() >= deadline_ns:
+                raise RequestCancelled("deadline")
+            if await request.is_disconnected():
+                raise RequestCancelled("disconnected")
+        return parts
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if loop_lag is not None:
+            loop_lag.start()
+        yield
+        if loop_lag is not None:
+            loop_lag.stop()
+        if offloader is not None:
+            offloader.shutdown()
 
     app = FastAPI(
-        title="Timestream REST (protobuf)"
+        title="Timestream REST (protobuf)",
+        lifespan=lifespan,
     )
 
     # ---------------------------- endpoint -------------------------------- #
@@ -57,16 +166,173 @@ def create_app(pool_size: int, logger: logging.Logger) -> FastAPI:
         except Exception:                       # pragma: no cover
             raise HTTPException(400, "Invalid protobuf payload")
 
-        if req_pb.count > pool_size:
-            raise HTTPException(400, "Requested count exceeds pool size")
+        if req_pb.offset + req_pb.count > pool_size:
+            raise HTTPException(400, "Requested offset + count exceeds pool size")
+
+        req_id = request.headers.get("req-id")
 
         # Build response -----------------------------------------------------
-        resp_pb = pb2.RecordListResponse(records=records[:req_pb.count])
+        offloaded = {}
+        async with admission_slot(request, t_in, req_id) as admitted:
+            start = req_pb.offset
+            if offloader is not None and offloader.wanted(req_pb.count):
+                body = await offloader.encode(encode_records, pool.records, start, req_pb.count)
+                offloaded = {"offload": offloader.pool}
+            elif not cancel_chunk_records:
+                resp_pb = pb2.RecordListResponse(records=pool.records[start:start + req_pb.count])
+                body = resp_pb.SerializeToString()
+            else:
+                try:
+                    # Concatenated encodings of a repeated field decode as one message
+                    parts = await encode_chunked(
+                        request, t_in, start, req_pb.count,
+                        lambda chunk: pb2.RecordListResponse(records=chunk).SerializeToString())
+                except RequestCancelled as exc:
+                    log_rpc(logger, t_in=t_in, req_id=req_id, **admitted,
+                            **cancel_stats.record(t_in, exc.reason))
+                    return Response(status_code=504 if exc.reason == "deadline" else 499)
+                body = b"".join(parts)
 
         # Log AFTER the response has been sent ------------------------------
+        background_tasks.add_task(log_rpc, logger, t_in=t_in, req_id=req_id,
+                                  **admitted, **offloaded)
+
+        return Response(
+            content=body,
+            media_type="application/x-protobuf",
+        )
+
+    @app.get("/records", response_class=Response)
+    async def get_record_list_cacheable(request: Request,
+                                        background_tasks: BackgroundTasks,
+                                        count: int, offset: int = 0) -> Response:
+        """
+        Cacheable form of POST /records: GET /records?count=<int>&offset=<int>.
+        Carries a strong ETag; a matching If-None-Match is answered with 304
+        without building the body.
+        """
+        t_in = perf_counter_ns()
+
+        if offset < 0 or count < 0:
+            raise HTTPException(400, "offset and count must not be negative")
+        if offset + count > pool_size:
+            raise HTTPException(400, "Requested offset + count exceeds pool size")
+
         req_id = request.headers.get("req-id")
-        background_tasks.add_task(log_rpc, logger, t_in=t_in, req_id=req_id)
+        etag = record_list_etag(version, offset, count, "pb")
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            background_tasks.add_task(log_rpc, logger, t_in=t_in, req_id=req_id,
+                                      not_modified=True)
+            return Response(status_code=304, headers=headers)
+
+        async with admission_slot(request, t_in, req_id) as admitted:
+            resp_pb = pb2.RecordListResponse(records=pool.records[offset:offset + count])
+            body = resp_pb.SerializeToString()
+
+        background_tasks.add_task(log_rpc, logger, t_in=t_in, req_id=req_id,
+                                  not_modified=False, **admitted)
+
+        return Response(content=body, media_type="application/x-protobuf", headers=headers)
+
+    @app.post("/records/batch", response_class=Response)
+    async def batch_get_record_lists(request: Request,
+                                     background_tasks: BackgroundTasks) -> Response:
+        """
+        Body (bytes)  : timestream.BatchRecordListRequest
+        Response body : timestream.BatchRecordListResponse
+        """
+        t_in = perf_counter_ns()
+
+        raw = await request.body()
+        try:
+            req_pb = pb2.BatchRecordListRequest.FromString(raw)
+        except Exception:                       # pragma: no cover
+            raise HTTPException(400, "Invalid protobuf payload")
+
+        if any(r.offset + r.count > pool_size for r in req_pb.requests):
+            raise HTTPException(400, "Requested offset + count exceeds pool size")
+
+        req_id = request.headers.get("req-id")
+
+        async with admission_slot(request, t_in, req_id) as admitted:
+            resp_pb = pb2.BatchRecordListResponse(responses=[
+                pb2.RecordListResponse(records=pool.records[r.offset:r.offset + r.count])
+                for r in req_pb.requests
+            ])
+            body = resp_pb.SerializeToString()
+
+        background_tasks.add_task(log_rpc, logger, t_in=t_in, req_id=req_id, **admitted)
 
+        return Response(
+            content=body,
+            media_type="application/x-protobuf",
+        )
+
+    @app.post("/records/aggregate", response_class=Response)
+    async def aggregate_records(request: Request,
+                                background_tasks: BackgroundTasks) -> Response:
+        """
+        Body (bytes)  : timestream.AggregateRequest
+        Response body : timestream.AggregateResponse
+        """
+        t_in = perf_counter_ns()
+
+        raw = await request.body()
+        try:
+            req_pb = pb2.AggregateRequest.FromString(raw)
+        except Exception:                       # pragma: no cover
+            raise HTTPException(400, "Invalid protobuf payload")
+
+        req_id = request.headers.get("req-id")
+
+        async with admission_slot(request, t_in, req_id) as admitted:
+            try:
+                result = pool.columns.aggregate(req_pb.count, req_pb.group_by,
+                                                req_pb.bucket_seconds, req_pb.func,
+                                                req_pb.field)
+            except ValueError as exc:
+                raise HTTPException(400, str(exc))
+
+            resp_pb = pb2.AggregateResponse(buckets=[
+                pb2.AggregateBucket(**bucket) for bucket in result.to_dicts()
+            ])
+            body = resp_pb.SerializeToString()
+
+        background_tasks.add_task(log_rpc, logger, t_in=t_in, req_id=req_id, **admitted)
+
+        return Response(
+            content=body,
+            media_type="application/x-protobuf",
+        )
+
+    @app.post("/records/ingest", response_class=Response)
+    async def ingest_records(request: Request,
+                             background_tasks: BackgroundTasks) -> Response:
+        """
+        Bulk upload into the ingest store.
+
+        Body (bytes)  : timestream.IngestRequest
+        Response body : timestream.IngestResponse
+        """
+        t_in = perf_counter_ns()
+
+        raw = await request.body()
+        try:
+            req_pb = pb2.IngestRequest.FromString(raw)
+        except Exception:                       # pragma: no cover
+            raise HTTPException(400, "Invalid protobuf payload")
+
+        req_id = request.headers.get("req-id")
+
+        async with admission_slot(request, t_in, req_id) as admitted:
+            accepted = ingest_store.append_messages(req_pb.records)
+
+        background_tasks.add_task(log_rpc, logger, t_in=t_in, req_id=req_id, **admitted,
+                                  ingested=accepted)
+
+        resp_pb = pb2.IngestResponse(accepted=accepted, stored=ingest_store.retained_rows)
         return Response(
             content=resp_pb.SerializeToString(),
             media_type="application/x-protobuf",
@@ -75,29 +341,182 @@ def create_app(pool_size: int, logger: logging.Logger) -> FastAPI:
     return app
 
 
+def create_asgi_app(pool_size: int, logger: logging.Logger,
+                    admission: AdmissionController = None,
+                    offloader: Offloader = None,
+                    loop_lag: LoopLagMonitor = None,
+                    pool_build: str = "eager",
+                    startup_log: StartupLog = None):
+    """
+    Bare-ASGI counterpart of `create_app` (see utils/bare_asgi.py): serves
+    POST /records only, without routing, dependency injection or Response
+    objects. Log lines carry `app="asgi"`.
+    """
+    pool = record_pool(pool_size, pool_build, startup_log)
+    deadline_header = DEADLINE_HEADER.encode()
+
+    def startup() -> None:
+        if loop_lag is not None:
+            loop_lag.start()
+
+    def shutdown() -> None:
+        if loop_lag is not None:
+            loop_lag.stop()
+        if offloader is not None:
+            offloader.shutdown()
+
+    async def app(scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await run_lifespan(receive, send, startup, shutdown)
+            return
+        if scope["path"] != "/records" or scope["method"] != "POST":
+            await send_response(send, 404, b"Not Found")
+            return
+
+        t_in = perf_counter_ns()
+
+        # Deserialize request ------------------------------------------------
+        raw = await read_body(receive)
+        if raw is None:
+            return
+        try:
+            req_pb = pb2.RecordListRequest.FromString(raw)
+        except Exception:                       # pragma: no cover
+            await send_response(send, 400, b"Invalid protobuf payload")
+            return
+
+        if req_pb.offset + req_pb.count > pool_size:
+            await send_response(send, 400, b"Requested offset + count exceeds pool size")
+            return
+
+        headers = dict(scope["headers"])
+        req_id = headers.get(b"req-id")
+        req_id = req_id.decode() if req_id else None
+
+        # Build response -----------------------------------------------------
+        admitted = {}
+        offloaded = {}
+        if admission is not None:
+            deadline_ms = headers.get(deadline_header)
+            try:
+                admitted["t_admit"] = await admission.acquire(
+                    float(deadline_ms) / 1000 if deadline_ms else None)
+            except AdmissionRejected as exc:
+                log_rpc(logger, t_in=t_in, req_id=req_id, app="asgi",
+                        reject_reason=exc.reason)
+                await send_response(send, 503, f"Server overloaded ({exc.reason})".encode())
+                return
+        try:
+            start = req_pb.offset
+            if offloader is not None and offloader.wanted(req_pb.count):
+                body = await offloader.encode(encode_records, pool.records, start, req_pb.count)
+                offloaded = {"offload": offloader.pool}
+            else:
+                resp_pb = pb2.RecordListResponse(records=pool.records[start:start + req_pb.count])
+                body = resp_pb.SerializeToString()
+        finally:
+            if admitted:
+                admission.release()
+
+        # Log once the last body chunk is out --------------------------------
+        send = log_on_complete(send, lambda: log_rpc(logger, t_in=t_in, req_id=req_id,
+                                                     app="asgi", **admitted, **offloaded))
+        await send_response(send, 200, body, b"application/x-protobuf")
+
+    return app
+
+
+def run_uvicorn(app, startup_log: StartupLog = None, **config) -> None:
+    """`uvicorn.run(app, **config)` that marks `bound` in the startup log once it listens."""
+    if startup_log is None:
+        uvicorn.run(app, **config)
+        return
+
+    class Server(uvicorn.Server):
+        async def startup(self, sockets=None) -> None:
+            await super().startup(sockets)
+            if not self.should_exit:
+                startup_log.mark("bound")
+
+    Server(uvicorn.Config(app, **config)).run()
+
+
 def serve(host: str, port: int, pool_size: int,
-          logger_name: str, log_file_path: Path) -> None:
+          logger_name: str, log_file_path: Path,
+          admission: AdmissionController = None,
+          cancel_chunk_records: int = 0,
+          offloader: Offloader = None,
+          loop_lag: LoopLagMonitor = None,
+          gc_freeze: bool = False,
+          alloc_tracker: AllocTracker = None,
+          bare_asgi: bool = False,
+          uds: Path = None,
+          pool_build: str = "eager",
+          startup_log: StartupLog = None) -> None:
     logger = setup_logger(logger_name, log_file_path)
-    app = create_app(pool_size, logger)
-
-    print(f"REST-protobuf server running on http://{host}:{port}")
+    if bare_asgi:
+        app = create_asgi_app(pool_size, logger, admission, offloader, loop_lag,
+                              pool_build, startup_log)
+        if alloc_tracker is not None:
+            app = AllocTrackingMiddleware(app, alloc_tracker)
+    else:
+        app = create_app(pool_size, logger, admission, cancel_chunk_records,
+                         offloader, loop_lag, pool_build, startup_log)
+        if alloc_tracker is not None:
+            app.add_middleware(AllocTrackingMiddleware, tracker=alloc_tracker)
+    if gc_freeze:
+        freeze_gc()
 
     # Uvicorn is started **in-process** so that the test harness can spawn
     # this file exactly like the gRPC server.
-    uvicorn.run(app, host=host, port=port, log_level="error")
+    if uds is not None:
+        remove_stale_socket(uds)
+        print(f"REST-protobuf server running on http+unix://{uds}")
+        run_uvicorn(app, startup_log, uds=str(uds), log_level="error")
+    else:
+        print(f"REST-protobuf server running on http://{host}:{port}")
+        run_uvicorn(app, startup_log, host=host, port=port, log_level="error")
 
 
 if __name__ == "__main__":
+    t_imported = perf_counter_ns()
     ap = argparse.ArgumentParser(description="Launch the REST-protobuf server")
     ap.add_argument("--host", default="127.0.0.1")
     ap.add_argument("--port", type=int, required=True, help="Port to listen on")
     ap.add_argument("--pool-size", type=int, required=True, help="Number of records to pre-allocate")
     ap.add_argument("--logger-name", required=True)
     ap.add_argument("--log-file", type=Path, required=True)
+    add_admission_args(ap)
+    add_cancellation_args(ap)
+    add_offload_args(ap)
+    add_instrumentation_args(ap)
+    add_alloc_tracking_args(ap)
+    add_profile_args(ap)
+    ap.add_argument("--bare-asgi", action="store_true",
+                    help="Serve POST /records from a bare ASGI callable instead of FastAPI")
+    add_uds_args(ap)
+    add_startup_args(ap)
     args = ap.parse_args()
+    if args.bare_asgi and args.cancel_chunk_records:
+        ap.error("--cancel-chunk-records needs the FastAPI app")
+    if args.gc_freeze and args.pool_build != "eager":
+        ap.error("--gc-freeze needs --pool-build eager (it freezes the pool built before it)")
+    sampler_from_args(args)
+    tag_transport("server", args.uds)
+    tag_protobuf_backend("server")
 
     try:
         serve(args.host, args.port, args.pool_size,
-              args.logger_name, args.log_file)
+              args.logger_name, args.log_file,
+              controller_from_args(args),
+              args.cancel_chunk_records,
+              offloader_from_args(args),
+              instrumentation_from_args(args),
+              args.gc_freeze,
+              alloc_tracker_from_args(args, "server"),
+              args.bare_asgi,
+              args.uds,
+              args.pool_build,
+              startup_from_args(args, t_imported))
     except (KeyboardInterrupt, SystemExit):            # graceful exit
         print("Shutting down REST server")
@@ -10,6 +10,7 @@ from pathlib import Path
 from time import perf_counter_ns
 
 import requests
+from concurrent.futures import ThreadPoolExecutor
 
 import records_pb2 as pb2
 
@@ -17,13 +18,35 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from utils.logger import setup_logger, log_client        # noqa: E402
+from utils.sharding import shard_bounds                       # noqa: E402
+from utils.constants import BATCH_STRATEGIES, PROTOTYPE_RECORD  # noqa: E402
+from utils.alloc_tracking import (                           # noqa: E402
+    add_alloc_tracking_args, alloc_tracker_from_args,
+)
+from utils.stack_sampler import add_profile_args, sampler_from_args  # noqa: E402
+from utils.protobuf_backend import tag_protobuf_backend  # noqa: E402
+from utils.admission import DEADLINE_HEADER                  # noqa: E402
+from utils.cancellation import read_body_before              # noqa: E402
+from utils.http_cache import ResponseCache                   # noqa: E402
+from utils.streaming_decode import (                         # noqa: E402
+    DEFAULT_STREAM_CHUNK_BYTES, ProtoRecordStream, peak_rss_bytes,
+)
+from utils.aggregation import (                           # noqa: E402
+    AGG_FUNCS, GROUP_BY_KEYS, VALUE_FIELDS,
+    DEFAULT_BUCKET_SECONDS, DEFAULT_FIELD, DEFAULT_GROUP_BY,
+)
+from utils.uds import add_uds_args, http_adapter, http_client, tag_transport  # noqa: E402
+from utils.size_mix import add_mix_args, run_mix              # noqa: E402
+from utils.hedging import (                                  # noqa: E402
+    WINNERS, CancellableHTTPAdapter, HedgePolicy, add_hedge_args, hedge_policy_from_args, race,
+)
 
 
 # --------------------------------------------------------------------------- #
 # Main client logic                                                           #
 # --------------------------------------------------------------------------- #
 
-def fetch_records(host: str, port: int, count: int, logger) -> None:
+def fetch_records(host: str, port: int, count: int, logger, uds: Path = None) -> None:
     req_id = f"{secrets.randbits(64):016x}"
 
     # Overall lifecycle start
@@ -43,7 +66,23 @@ def fetch_records(host: str, port: int, count: int, logger) -> None:
     t_req = perf_counter_ns()
 
     # Request serialisation, posting, and receiving response
-    res = requests.post(url, data=req_pb.SerializeToString(), headers=headers)
+    res = http_client(uds).post(url, data=req_pb.SerializeToString(), headers=headers)
+
+    if res.status_code == 503:
+        # Shed by the server's admission control – log it so goodput can be computed
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=perf_counter_ns(),
+            req_id=req_id,
+            req_size_bytes=len(req_pb.SerializeToString()),
+            res_size_bytes=len(res.content),
+            status="rejected",
+            count=count,
+        )
+        print("Rejected")
+        return
 
     if res.status_code != 200:
         print(f"Server error: {res.status_code} {res.text}")
@@ -70,7 +109,579 @@ def fetch_records(host: str, port: int, count: int, logger) -> None:
         t_res=t_res,
         req_id=req_id,
         req_size_bytes=req_size_bytes,
-        res_size_bytes=res_size_bytes
+        res_size_bytes=res_size_bytes,
+        decode="buffered",
+        t_first_record=t_res,     # nothing is usable before the whole body is decoded
+        peak_rss_bytes=peak_rss_bytes(),
+        count=count,
+    )
+
+    print("Finished")
+
+
+def fetch_records_streaming(host: str, port: int, count: int,
+                            chunk_bytes: int, logger, uds: Path = None) -> None:
+    """
+    `fetch_records` decoding while the body is still arriving: records are
+    parsed chunk by chunk as they complete instead of after the last byte.
+    Logs `t_first_record` (first decoded record) and the client's peak RSS.
+    """
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    req_pb = pb2.RecordListRequest(count=count)
+    headers = {
+        "content-type": "application/x-protobuf",
+        "accept":       "application/x-protobuf",
+        "req-id":       req_id,
+    }
+    url = f"http://{host}:{port}/records"
+
+    t_req = perf_counter_ns()
+
+    res = http_client(uds).post(url, data=req_pb.SerializeToString(), headers=headers, stream=True)
+    if res.status_code == 503:
+        # Shed by the server's admission control – log it so goodput can be computed
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=perf_counter_ns(),
+            req_id=req_id,
+            req_size_bytes=len(req_pb.SerializeToString()),
+            res_size_bytes=len(res.content),
+            status="rejected",
+            count=count,
+        )
+        print("Rejected")
+        return
+
+    if res.status_code != 200:
+        print(f"Server error: {res.status_code} {res.text}")
+        return
+
+    decoder = ProtoRecordStream(pb2.RecordListResponse())
+    t_first_record = None
+    res_size_bytes = 0
+    for chunk in res.iter_content(chunk_bytes):
+        res_size_bytes += len(chunk)
+        if decoder.feed(chunk) and t_first_record is None:
+            t_first_record = perf_counter_ns()
+
+    if not decoder.done:
+        print("Truncated response body")
+        return
+
+    t_res = perf_counter_ns()
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=len(req_pb.SerializeToString()),
+        res_size_bytes=res_size_bytes,
+        decode="stream",
+        t_first_record=t_first_record,
+        records=len(decoder.records),
+        peak_rss_bytes=peak_rss_bytes(),
+    )
+
+    print("Finished")
+
+
+def fetch_records_with_deadline(host: str, port: int, count: int,
+                                deadline_ms: float, logger, uds: Path = None) -> None:
+    """
+    `fetch_records` with a total deadline. The budget is sent to the server as
+    `req-deadline-ms` and the body is streamed so the client can hang up
+    as soon as the deadline passes; the server sees the disconnect.
+    """
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    req_pb = pb2.RecordListRequest(count=count)
+    headers = {
+        "content-type": "application/x-protobuf",
+        "accept":       "application/x-protobuf",
+        "req-id":       req_id,
+        DEADLINE_HEADER: str(deadline_ms),
+    }
+    url = f"http://{host}:{port}/records"
+
+    t_req = perf_counter_ns()
+    deadline_ns = t_req + int(deadline_ms * 1_000_000)
+
+    body = None
+    status = "deadline_exceeded"
+    try:
+        res = http_client(uds).post(url, data=req_pb.SerializeToString(), headers=headers,
+                                    timeout=deadline_ms / 1000, stream=True)
+        if res.status_code == 200:
+            body = read_body_before(res, deadline_ns)
+        elif res.status_code == 503:
+            status = "rejected"
+        elif res.status_code != 504:
+            print(f"Server error: {res.status_code} {res.text}")
+            return
+    except (requests.Timeout, requests.ConnectionError):
+        # a read timeout surfaces as ConnectionError once the body is streaming
+        if perf_counter_ns() < deadline_ns:
+            raise
+
+    if body is None:
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=perf_counter_ns(),
+            req_id=req_id,
+            req_size_bytes=len(req_pb.SerializeToString()),
+            res_size_bytes=0,
+            status=status,
+        )
+        print(status)
+        return
+
+    resp_pb = pb2.RecordListResponse.FromString(body)
+    t_res = perf_counter_ns()
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=len(req_pb.SerializeToString()),
+        res_size_bytes=len(body),
+        deadline_ms=deadline_ms,
+    )
+
+    print("Finished")
+
+
+def fetch_records_hedged(host: str, port: int, count: int, policy: HedgePolicy, logger,
+                         uds: Path = None) -> None:
+    """
+    `fetch_records` with a hedge: if no response has arrived after the
+    policy's delay, the same request goes out again on a second connection
+    (logged server-side as `<req_id>-h`). The first response wins; the other
+    connection is shut down.
+    """
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    req_pb = pb2.RecordListRequest(count=count)
+    headers = {
+        "content-type": "application/x-protobuf",
+        "accept":       "application/x-protobuf",
+    }
+    url = f"http://{host}:{port}/records"
+    delay_ms = policy.delay_for(count)
+
+    # one session per attempt, each with its own connection
+    adapters = [CancellableHTTPAdapter(uds) for _ in WINNERS]
+    sessions = [requests.Session() for _ in WINNERS]
+    for session, adapter in zip(sessions, adapters):
+        session.mount("http://", adapter)
+
+    def attempt(i: int) -> requests.Response:
+        res = sessions[i].post(url, data=req_pb.SerializeToString(),
+                               headers={**headers, "req-id": req_id if i == 0 else f"{req_id}-h"})
+        res.raise_for_status()
+        return res
+
+    t_req = perf_counter_ns()
+
+    try:
+        try:
+            res, winner, hedged = race(attempt, lambda i: adapters[i].cancel(), delay_ms)
+        except requests.HTTPError as exc:
+            if exc.response.status_code != 503:
+                print(f"Server error: {exc}")
+                return
+            # Shed by the server's admission control – log it so goodput can be computed
+            log_client(
+                logger,
+                t0=t0,
+                t_req=t_req,
+                t_res=perf_counter_ns(),
+                req_id=req_id,
+                req_size_bytes=len(req_pb.SerializeToString()),
+                res_size_bytes=len(exc.response.content),
+                status="rejected",
+                count=count,
+                hedge_delay_ms=delay_ms,
+            )
+            print("Rejected")
+            return
+
+        resp_pb = pb2.RecordListResponse.FromString(res.content)
+        t_res = perf_counter_ns()
+
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=t_res,
+            req_id=req_id,
+            req_size_bytes=len(req_pb.SerializeToString()),
+            res_size_bytes=len(res.content),
+            count=count,
+            hedge_delay_ms=delay_ms,
+            hedged=hedged,
+            winner=WINNERS[winner],
+        )
+
+        print("Finished")
+    finally:
+        # both sessions and their adapters, the cancelled loser's included
+        for session in sessions:
+            session.close()
+
+
+def fetch_records_get(host: str, port: int, count: int, cache_dir: Path, logger,
+                      uds: Path = None) -> None:
+    """
+    Fetch through the cacheable `GET /records?count=…` form. With `cache_dir`
+    a cached body is revalidated with If-None-Match and reused on 304; the
+    logged `res_size_bytes` is what crossed the wire (0 on a hit).
+    """
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    cache_key = f"{host}_{port}-0-{count}"
+
+    headers = {
+        "accept": "application/x-protobuf",
+        "req-id": req_id,
+    }
+    cached_etag = cache.lookup(cache_key) if cache else None
+    if cached_etag:
+        headers["if-none-match"] = cached_etag
+
+    url = f"http://{host}:{port}/records"
+
+    t_req = perf_counter_ns()
+
+    res = http_client(uds).get(url, params={"count": count}, headers=headers)
+
+    if res.status_code == 503:
+        # Shed by the server's admission control – log it so goodput can be computed
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=perf_counter_ns(),
+            req_id=req_id,
+            req_size_bytes=0,
+            res_size_bytes=len(res.content),
+            status="rejected",
+            count=count,
+        )
+        print("Rejected")
+        return
+
+    if res.status_code == 304:
+        body = cache.body(cache_key)
+        cache_status = "hit"
+    elif res.status_code == 200:
+        body = res.content
+        cache_status = "miss" if cache else "none"
+    else:
+        print(f"Server error: {res.status_code} {res.text}")
+        return
+
+    resp_pb = pb2.RecordListResponse.FromString(body)
+
+    t_res = perf_counter_ns()
+
+    # populating the cache is bookkeeping, not part of the measured request
+    if cache_status == "miss" and res.headers.get("etag"):
+        cache.store(cache_key, res.headers["etag"], body)
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=0,
+        res_size_bytes=len(res.content),
+        cache=cache_status,
+        body_bytes=len(body),
+    )
+
+    print("Finished")
+
+
+def fetch_records_sharded(host: str, port: int, count: int, shards: int, logger,
+                          uds: Path = None) -> None:
+    """
+    Fetch `count` records as `shards` concurrent range requests and
+    reassemble them in order. Server-side lines are logged as `<req_id>-<shard>`.
+    """
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    requests_pb = [pb2.RecordListRequest(offset=offset, count=n)
+                   for offset, n in shard_bounds(count, shards)]
+    headers = {
+        "content-type": "application/x-protobuf",
+        "accept":       "application/x-protobuf",
+    }
+    url = f"http://{host}:{port}/records"
+
+    # One keep-alive connection per shard, shared through a pooled session
+    session = requests.Session()
+    session.mount("http://", http_adapter(uds, pool_connections=1,
+                                          pool_maxsize=len(requests_pb)))
+    res_sizes = [0] * len(requests_pb)
+
+    def fetch_shard(i: int) -> pb2.RecordListResponse:
+        res = session.post(url, data=requests_pb[i].SerializeToString(),
+                           headers={**headers, "req-id": f"{req_id}-{i}"})
+        res.raise_for_status()
+        res_sizes[i] = len(res.content)
+        return pb2.RecordListResponse.FromString(res.content)
+
+    t_req = perf_counter_ns()
+
+    with ThreadPoolExecutor(max_workers=len(requests_pb)) as pool:
+        try:
+            parts = list(pool.map(fetch_shard, range(len(requests_pb))))
+        except requests.HTTPError as exc:
+            if exc.response.status_code != 503:
+                print(f"Server error: {exc}")
+                return
+            # one shed shard sheds the whole fetch – log it so goodput can be computed
+            log_client(
+                logger,
+                t0=t0,
+                t_req=t_req,
+                t_res=perf_counter_ns(),
+                req_id=req_id,
+                req_size_bytes=sum(len(r.SerializeToString()) for r in requests_pb),
+                res_size_bytes=len(exc.response.content),
+                status="rejected",
+                count=count,
+                shards=len(requests_pb),
+            )
+            print("Rejected")
+            return
+
+    resp_pb = pb2.RecordListResponse()
+    for part in parts:                       # reassemble in shard order
+        resp_pb.MergeFrom(part)
+
+    t_res = perf_counter_ns()
+
+    req_size_bytes = sum(len(r.SerializeToString()) for r in requests_pb)
+    res_size_bytes = sum(res_sizes)
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=req_size_bytes,
+        res_size_bytes=res_size_bytes,
+        shards=len(res_sizes),
+    )
+
+    print("Finished")
+
+
+def fetch_records_batch(host: str, port: int, count: int, batch: int,
+                        strategy: str, logger, uds: Path = None) -> None:
+    """
+    Fetch `batch` slices of `count` records either as one POST to
+    /records/batch, or as `batch` single requests issued one after another /
+    all at once over a pooled keep-alive session.
+    """
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    requests_pb = [pb2.RecordListRequest(count=count) for _ in range(batch)]
+    batch_pb = pb2.BatchRecordListRequest(requests=requests_pb)
+    headers = {
+        "content-type": "application/x-protobuf",
+        "accept":       "application/x-protobuf",
+    }
+    base_url = f"http://{host}:{port}/records"
+
+    session = requests.Session()
+    session.mount("http://", http_adapter(uds, pool_connections=1, pool_maxsize=batch))
+    res_sizes = [0] * batch
+
+    def fetch_one(i: int) -> pb2.RecordListResponse:
+        res = session.post(base_url, data=requests_pb[i].SerializeToString(),
+                           headers={**headers, "req-id": f"{req_id}-{i}"})
+        res.raise_for_status()
+        res_sizes[i] = len(res.content)
+        return pb2.RecordListResponse.FromString(res.content)
+
+    if strategy == "batch":
+        req_size_bytes = len(batch_pb.SerializeToString())
+    else:
+        req_size_bytes = sum(len(r.SerializeToString()) for r in requests_pb)
+
+    t_req = perf_counter_ns()
+
+    try:
+        if strategy == "batch":
+            res = session.post(f"{base_url}/batch", data=batch_pb.SerializeToString(),
+                               headers={**headers, "req-id": req_id})
+            res.raise_for_status()
+            responses = list(pb2.BatchRecordListResponse.FromString(res.content).responses)
+            res_sizes = [len(res.content)]
+        elif strategy == "sequential":
+            responses = [fetch_one(i) for i in range(batch)]
+        else:
+            with ThreadPoolExecutor(max_workers=batch) as pool:
+                responses = list(pool.map(fetch_one, range(batch)))
+    except requests.HTTPError as exc:
+        if exc.response.status_code != 503:
+            print(f"Server error: {exc}")
+            return
+        # one shed request sheds the whole batch – log it so goodput can be computed
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=perf_counter_ns(),
+            req_id=req_id,
+            req_size_bytes=req_size_bytes,
+            res_size_bytes=len(exc.response.content),
+            status="rejected",
+            op="batch",
+            batch=batch,
+            strategy=strategy,
+        )
+        print("Rejected")
+        return
+
+    t_res = perf_counter_ns()
+
+    res_size_bytes = sum(res_sizes)
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=req_size_bytes,
+        res_size_bytes=res_size_bytes,
+        op="batch",
+        batch=len(responses),
+        strategy=strategy,
+    )
+
+    print("Finished")
+
+
+def aggregate_records(host: str, port: int, count: int, func: str, group_by: str,
+                      bucket_seconds: int, field: str, logger, uds: Path = None) -> None:
+    """Same measurement points as `fetch_records`, against /records/aggregate."""
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    req_pb = pb2.AggregateRequest(count=count, group_by=group_by,
+                                  bucket_seconds=bucket_seconds,
+                                  func=func, field=field)
+    headers = {
+        "content-type": "application/x-protobuf",
+        "accept":       "application/x-protobuf",
+        "req-id":       req_id,
+    }
+    url = f"http://{host}:{port}/records/aggregate"
+
+    t_req = perf_counter_ns()
+    res = http_client(uds).post(url, data=req_pb.SerializeToString(), headers=headers)
+
+    if res.status_code == 503:
+        # Shed by the server's admission control – log it so goodput can be computed
+        log_client(
+            logger,
+            t0=t0,
+            t_req=t_req,
+            t_res=perf_counter_ns(),
+            req_id=req_id,
+            req_size_bytes=len(req_pb.SerializeToString()),
+            res_size_bytes=len(res.content),
+            status="rejected",
+            op="aggregate",
+            func=func,
+        )
+        print("Rejected")
+        return
+
+    if res.status_code != 200:
+        print(f"Server error: {res.status_code} {res.text}")
+        return
+
+    resp_pb = pb2.AggregateResponse.FromString(res.content)
+    t_res = perf_counter_ns()
+
+    req_size_bytes = len(req_pb.SerializeToString())
+    res_size_bytes = len(res.content)
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=req_size_bytes,
+        res_size_bytes=res_size_bytes,
+        op="aggregate",
+        func=func,
+        buckets=len(resp_pb.buckets),
+    )
+
+    print("Finished")
+
+
+def ingest_records(host: str, port: int, count: int, logger, uds: Path = None) -> None:
+    """Upload `count` records in one POST to /records/ingest and log the ingest throughput."""
+    req_id = f"{secrets.randbits(64):016x}"
+    t0 = perf_counter_ns()
+
+    # The telemetry to upload; building the message is part of the call
+    records = [PROTOTYPE_RECORD.copy() for _ in range(count)]
+    headers = {
+        "content-type": "application/x-protobuf",
+        "accept":       "application/x-protobuf",
+        "req-id":       req_id,
+    }
+    url = f"http://{host}:{port}/records/ingest"
+
+    t_req = perf_counter_ns()
+    body = pb2.IngestRequest(records=records).SerializeToString()
+    res = http_client(uds).post(url, data=body, headers=headers)
+
+    if res.status_code != 200:
+        print(f"Server error: {res.status_code} {res.text}")
+        return
+
+    resp_pb = pb2.IngestResponse.FromString(res.content)
+    t_res = perf_counter_ns()
+
+    log_client(
+        logger,
+        t0=t0,
+        t_req=t_req,
+        t_res=t_res,
+        req_id=req_id,
+        req_size_bytes=len(body),
+        res_size_bytes=len(res.content),
+        op="ingest",
+        records=resp_pb.accepted,
+        ingest_rps=resp_pb.accepted / ((t_res - t_req) / 1e9),
     )
 
     print("Finished")
@@ -89,7 +700,76 @@ if __name__ == "__main__":
         "--log-file", type=Path, required=True,
         help="Path for the JSON-lines log file",
     )
+    ap.add_argument("--deadline-ms", type=float,
+                    help="Hang up if the response is not complete within this budget")
+    ap.add_argument("--stream", action="store_true",
+                    help="Decode records incrementally while the body is arriving")
+    ap.add_argument("--stream-chunk-bytes", type=int, default=DEFAULT_STREAM_CHUNK_BYTES,
+                    help="Read size for --stream (default: %(default)s)")
+    ap.add_argument("--get", action="store_true",
+                    help="Use the cacheable GET /records form instead of POST")
+    ap.add_argument("--cache-dir", type=Path,
+                    help="With --get: local response cache revalidated via If-None-Match")
+    ap.add_argument("--shards", type=int,
+                    help="Split the request into this many concurrent range fetches")
+    ap.add_argument("--batch", type=int,
+                    help="Fetch this many slices of --count records (see --batch-strategy)")
+    ap.add_argument("--batch-strategy", choices=BATCH_STRATEGIES, default="batch",
+                    help="One POST to /records/batch, or N sequential / concurrent single requests")
+    ap.add_argument("--aggregate", choices=AGG_FUNCS,
+                    help="POST /records/aggregate with this function instead of fetching raw records")
+    ap.add_argument("--group-by", choices=GROUP_BY_KEYS, default=DEFAULT_GROUP_BY)
+    ap.add_argument("--bucket-seconds", type=int, default=DEFAULT_BUCKET_SECONDS)
+    ap.add_argument("--field", choices=VALUE_FIELDS, default=DEFAULT_FIELD)
+    ap.add_argument("--ingest", action="store_true",
+                    help="Upload --count records to /records/ingest instead of fetching")
+    add_alloc_tracking_args(ap)
+    add_profile_args(ap)
+    add_uds_args(ap)
+    add_mix_args(ap)
+    add_hedge_args(ap)
     args = ap.parse_args()
+    if args.deadline_ms is not None:
+        # only the plain POST fetch takes a deadline
+        for flag in ("shards", "batch", "aggregate", "mix", "hedge_percentile", "hedge_delay_ms"):
+            if getattr(args, flag) is not None:
+                ap.error(f"--deadline-ms cannot be combined with --{flag.replace('_', '-')}")
+        for flag in ("stream", "get", "ingest"):
+            if getattr(args, flag):
+                ap.error(f"--deadline-ms cannot be combined with --{flag}")
 
     logger = setup_logger(args.logger_name, args.log_file)
-    fetch_records(args.host, args.port, args.count, logger)
+    alloc_tracker_from_args(args, "client")
+    sampler_from_args(args)
+    tag_transport("client", args.uds)
+    hedge_policy = hedge_policy_from_args(args)
+    tag_protobuf_backend("client")
+    if args.ingest:
+        ingest_records(args.host, args.port, args.count, logger, args.uds)
+    elif args.aggregate:
+        aggregate_records(args.host, args.port, args.count, args.aggregate,
+                          args.group_by, args.bucket_seconds, args.field, logger, args.uds)
+    elif args.batch:
+        fetch_records_batch(args.host, args.port, args.count, args.batch,
+                            args.batch_strategy, logger, args.uds)
+    elif args.stream:
+        fetch_records_streaming(args.host, args.port, args.count,
+                                args.stream_chunk_bytes, logger, args.uds)
+    elif args.get:
+        fetch_records_get(args.host, args.port, args.count, args.cache_dir, logger, args.uds)
+    elif args.deadline_ms is not None:
+        fetch_records_with_deadline(args.host, args.port, args.count,
+                                    args.deadline_ms, logger, args.uds)
+    elif args.shards:
+        fetch_records_sharded(args.host, args.port, args.count, args.shards, logger, args.uds)
+    elif args.mix and hedge_policy:
+        run_mix(lambda count: fetch_records_hedged(args.host, args.port, count, hedge_policy,
+                                                   logger, args.uds),
+                args.mix, args.mix_requests, args.mix_seed)
+    elif args.mix:
+        run_mix(lambda count: fetch_records(args.host, args.port, count, logger, args.uds),
+                args.mix, args.mix_requests, args.mix_seed)
+    elif hedge_policy:
+        fetch_records_hedged(args.host, args.port, args.count, hedge_policy, logger, args.uds)
+    else:
+        fetch_records(args.host, args.port, args.count, logger, args.uds)
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """
-Run `benchmark_single_request.py` three times in a row:
+Run `benchmark_single_request.py` once per stack, in a row:
 
     1. grpc
     2. rest_proto
     3. rest_json
+    4. raw_tcp      (framework-free lower bound)
 
 A pause separates the runs.
 Any extra CLI flags are forwarded to the benchmark script unchanged.
@@ -15,7 +16,7 @@ import sys
 import time
 
 BENCH = "benchmark_single_request.py"
-MODES = ["grpc", "rest_proto", "rest_json"]
+MODES = ["grpc", "rest_proto", "rest_json", "raw_tcp"]
 PAUSE = 15                                 # seconds
 
 
@@ -23,7 +24,7 @@ def main() -> None:
     passthrough = sys.argv[1:]             # forward everything
 
     for i, mode in enumerate(MODES, 1):
-        print(f"\n🚀  [{i}/3] Running {mode} benchmark …\n")
+        print(f"\n🚀  [{i}/{len(MODES)}] Running {mode} benchmark …\n")
         rc = subprocess.run(
             [sys.executable, BENCH, mode] + passthrough,
             check=False
@@ -35,7 +36,7 @@ def main() -> None:
             print(f"\n⏸️   Waiting {PAUSE} s before next mode …")
             time.sleep(PAUSE)
 
-    print("\n🏁  All three benchmarks finished successfully.")
+    print("\n🏁  All benchmarks finished successfully.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+"""
+Admission control / load shedding shared by the three servers.
+
+At most `max_in_flight` requests do work at once; up to `max_queue` more wait
+for a slot, each for at most `queue_timeout_s` (or the request's own deadline,
+whichever is sooner). Anything beyond that is rejected immediately so the
+server can answer RESOURCE_EXHAUSTED / HTTP 503 instead of queueing forever.
+
+Usage inside an asyncio handler:
+
+    t_admit = await controller.acquire(deadline_s)   # may raise AdmissionRejected
+    try:
+        ...                                          # build the response
+    finally:
+        controller.release()
+"""
+
+import asyncio
+from time import perf_counter_ns
+from typing import Optional
+
+# Request header (REST) carrying the client's remaining budget in milliseconds
+DEADLINE_HEADER = "req-deadline-ms"
+
+
+class AdmissionRejected(Exception):
+    """The request was shed; `reason` is "queue_full" or "queue_timeout"."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int, max_queue: int,
+                 queue_timeout_s: Optional[float] = None):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    async def acquire(self, deadline_s: Optional[float] = None) -> int:
+        """
+        Wait for an execution slot and return the admission timestamp
+        (perf_counter_ns). Raises AdmissionRejected when the wait queue is
+        full or the wait would outlive the queue timeout / request deadline.
+        """
+        if self._slots.locked() and self._waiting >= self.max_queue:
+            raise AdmissionRejected("queue_full")
+
+        budgets = [b for b in (self.queue_timeout_s, deadline_s) if b is not None]
+        timeout = min(budgets) if budgets else None
+        if timeout is not None and timeout <= 0:
+            raise AdmissionRejected("queue_timeout")
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise AdmissionRejected("queue_timeout")
+        finally:
+            self._waiting -= 1
+        return perf_counter_ns()
+
+    def release(self) -> None:
+        self._slots.release()
+
+
+def add_admission_args(ap) -> None:
+    """Register the admission-control CLI flags on a server's ArgumentParser."""
+    ap.add_argument("--max-in-flight", type=int, default=0,
+                    help="Max concurrently executing requests (0 = unlimited, no admission control)")
+    ap.add_argument("--max-queue", type=int, default=64,
+                    help="Max requests waiting for a slot before fast rejection (default: %(default)s)")
+    ap.add_argument("--queue-timeout-ms", type=float, default=None,
+                    help="Reject requests that wait longer than this for a slot")
+
+
+def controller_from_args(args) -> Optional[AdmissionController]:
+    if not args.max_in_flight:
+        return None
+    timeout_s = args.queue_timeout_ms / 1000 if args.queue_timeout_ms is not None else None
+    return AdmissionController(args.max_in_flight, args.max_queue, timeout_s)
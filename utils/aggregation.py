@@ -0,0 +1,136 @@
+"""
+Vectorised server-side aggregation over a columnar view of the record pool.
+
+The servers keep their pool as a list of dicts (that is what they serialise),
+so `ColumnarPool` converts it once, at start-up, into NumPy columns:
+
+* group-by keys  → integer codes + label table (np.unique)
+* timestamps     → int64 epoch nanoseconds
+* metric fields  → float64 arrays
+
+`ColumnarPool.aggregate()` then answers a request with a handful of
+sort / bincount passes over the first `count` rows – no per-record Python.
+"""
+
+from typing import Dict, List, NamedTuple, Sequence
+
+import numpy as np
+
+GROUP_BY_KEYS = ("region", "availability_zone", "hostname")
+VALUE_FIELDS = ("cpu_utilization", "memory_utilization")
+AGG_FUNCS = ("avg", "min", "max", "p95")
+
+DEFAULT_GROUP_BY = "hostname"
+DEFAULT_FIELD = "cpu_utilization"
+DEFAULT_BUCKET_SECONDS = 60
+
+
+class AggregateResult(NamedTuple):
+    groups: np.ndarray           # str labels, one per output bucket
+    bucket_start_ns: np.ndarray  # int64 epoch ns
+    values: np.ndarray           # float64
+    samples: np.ndarray          # int64 rows per bucket
+
+    def to_dicts(self) -> List[dict]:
+        return [
+            {"group": g, "bucket_start_ns": int(b), "value": float(v), "samples": int(n)}
+            for g, b, v, n in zip(self.groups.tolist(), self.bucket_start_ns,
+                                  self.values, self.samples)
+        ]
+
+
+class ColumnarPool:
+    def __init__(self, records: Sequence[dict]):
+        self.size = len(records)
+
+        self._codes: Dict[str, np.ndarray] = {}
+        self._labels: Dict[str, np.ndarray] = {}
+        for key in GROUP_BY_KEYS:
+            labels, codes = np.unique(np.array([r[key] for r in records]),
+                                      return_inverse=True)
+            self._labels[key] = labels
+            self._codes[key] = codes.astype(np.int64)
+
+        # Parse each distinct timestamp string once, then broadcast
+        ts_labels, ts_codes = np.unique(np.array([r["timestamp"] for r in records]),
+                                        return_inverse=True)
+        parsed = ts_labels.astype("datetime64[ns]").astype(np.int64)
+        self._timestamp_ns = parsed[ts_codes]
+
+        self._values: Dict[str, np.ndarray] = {
+            f: np.fromiter((r[f] for r in records), dtype=np.float64, count=self.size)
+            for f in VALUE_FIELDS
+        }
+
+    def aggregate(self, count: int, group_by: str, bucket_seconds: int,
+                  func: str, field: str) -> AggregateResult:
+        """
+        Aggregate `field` over the first `count` rows.
+
+        Raises ValueError on an unknown group key / field / function, a
+        negative `bucket_seconds`, or when `count` is negative or exceeds the
+        pool. `count=0` has no buckets.
+        """
+        if group_by not in GROUP_BY_KEYS:
+            raise ValueError(f"group_by must be one of {GROUP_BY_KEYS}")
+        if field not in VALUE_FIELDS:
+            raise ValueError(f"field must be one of {VALUE_FIELDS}")
+        if func not in AGG_FUNCS:
+            raise ValueError(f"func must be one of {AGG_FUNCS}")
+        if count < 0:
+            raise ValueError("count must not be negative")
+        if bucket_seconds < 0:
+            raise ValueError("bucket_seconds must not be negative")
+        if count > self.size:
+            raise ValueError("count exceeds pool size")
+        if count == 0:
+            return AggregateResult(
+                groups=self._labels[group_by][:0],
+                bucket_start_ns=np.empty(0, dtype=np.int64),
+                values=np.empty(0, dtype=np.float64),
+                samples=np.empty(0, dtype=np.int64),
+            )
+
+        codes = self._codes[group_by][:count]
+        ts = self._timestamp_ns[:count]
+        values = self._values[field][:count]
+
+        if bucket_seconds:
+            width = np.int64(bucket_seconds) * 1_000_000_000
+            bucket_start = (ts // width) * width
+        else:
+            bucket_start = np.zeros(count, dtype=np.int64)
+
+        # Composite (group, bucket) key → dense ids 0..n_out-1
+        buckets, bucket_idx = np.unique(bucket_start, return_inverse=True)
+        key = codes * len(buckets) + bucket_idx
+        out_keys, key_idx, samples = np.unique(key, return_inverse=True,
+                                               return_counts=True)
+
+        if func == "avg":
+            sums = np.bincount(key_idx, weights=values, minlength=len(out_keys))
+            result = sums / samples
+        else:
+            # Sort by (key, value) so each bucket is a contiguous sorted run
+            sorted_vals = values[np.lexsort((values, key_idx))]
+            starts = np.concatenate(([0], np.cumsum(samples)[:-1]))
+            if func == "min":
+                result = sorted_vals[starts]
+            elif func == "max":
+                result = sorted_vals[starts + samples - 1]
+            else:
+                # Linear interpolation, identical to np.percentile's default
+                pos = (samples - 1) * 0.95
+                lo = np.floor(pos).astype(np.int64)
+                hi = np.ceil(pos).astype(np.int64)
+                frac = pos - lo
+                v_lo = sorted_vals[starts + lo]
+                v_hi = sorted_vals[starts + hi]
+                result = v_lo + (v_hi - v_lo) * frac
+
+        return AggregateResult(
+            groups=self._labels[group_by][out_keys // len(buckets)],
+            bucket_start_ns=buckets[out_keys % len(buckets)],
+            values=result,
+            samples=samples,
+        )
@@ -0,0 +1,144 @@
+"""
+Sampled per-request allocation accounting with tracemalloc.
+
+With `--trace-alloc RATE` a fraction RATE of requests is traced: tracemalloc
+is started when the request arrives and stopped when its log line is
+written, so requests that are not sampled run at full speed. The log line
+of a traced request gains
+
+    alloc_current_bytes – still allocated at log time (e.g. the body)
+    alloc_peak_bytes    – high-water mark while the request ran
+    alloc_blocks        – live blocks at log time
+    alloc_top           – top allocation sites [{"site", "bytes", "count"}]
+
+Only one request is traced at a time, so concurrent requests do not pollute
+each other's numbers (and the others are simply not sampled). Memory that C
+extensions allocate outside the Python allocator (upb arenas, gRPC core
+buffers) is invisible to tracemalloc.
+"""
+
+import random
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from utils.logger import register_client_tagger, register_rpc_tagger
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_ALLOC_TOP = 5
+
+_IGNORED_FRAMES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _short_site(filename: str, lineno: int) -> str:
+    path = Path(filename)
+    try:
+        path = path.relative_to(PROJECT_ROOT)
+    except ValueError:
+        # stdlib / site-packages: keep the last two components
+        path = Path(*path.parts[-2:])
+    return f"{path}:{lineno}"
+
+
+class AllocTracker:
+    def __init__(self, sample_rate: float, top_n: int = DEFAULT_ALLOC_TOP):
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self._active: Optional[str] = None      # key of the traced request
+
+    def begin(self, key: Optional[str]) -> bool:
+        """Start tracing for `key` if it is sampled and nothing else is traced."""
+        if key is None or self._active is not None or tracemalloc.is_tracing():
+            return False
+        if random.random() >= self.sample_rate:
+            return False
+        self._active = key
+        tracemalloc.start()
+        return True
+
+    def finish(self, key: Optional[str]) -> dict:
+        """Stop tracing `key` and return its log fields ({} if not traced)."""
+        if key is None or key != self._active:
+            return {}
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
+        self.discard(key)
+
+        stats = snapshot.statistics("lineno")
+        top = [
+            {
+                "site": _short_site(stat.traceback[0].filename, stat.traceback[0].lineno),
+                "bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in stats[:self.top_n]
+        ]
+        return {
+            "alloc_current_bytes": current,
+            "alloc_peak_bytes": peak,
+            "alloc_blocks": sum(stat.count for stat in stats),
+            "alloc_top": top,
+        }
+
+    def discard(self, key: Optional[str]) -> None:
+        """Stop tracing `key` without reporting (request ended without a log line)."""
+        if key is not None and key == self._active:
+            tracemalloc.stop()
+            self._active = None
+
+
+class AllocTrackingMiddleware:
+    """ASGI middleware: start tracing sampled HTTP requests (keyed by `req-id`)."""
+
+    def __init__(self, app, tracker: AllocTracker):
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        req_id = dict(scope["headers"]).get(b"req-id")
+        req_id = req_id.decode() if req_id else None
+        self.tracker.begin(req_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # background tasks (the log line) have run by now
+            self.tracker.discard(req_id)
+
+
+def add_alloc_tracking_args(ap) -> None:
+    ap.add_argument("--trace-alloc", type=float, metavar="RATE",
+                    help="Trace allocations of this fraction of requests with tracemalloc "
+                         "(0 < RATE <= 1)")
+    ap.add_argument("--trace-alloc-top", type=int, default=DEFAULT_ALLOC_TOP,
+                    help="Allocation sites to log per traced request (default: %(default)s)")
+
+
+def alloc_tracker_from_args(args, side: str) -> Optional[AllocTracker]:
+    """
+    Build the tracker and hook it into the log lines of `side`:
+    "server" – log_rpc lines finish the trace of their req_id; the caller
+               still has to start traces (middleware / interceptor).
+    "client" – a one-shot client traces its single request from here on.
+    """
+    if not args.trace_alloc:
+        return None
+    tracker = AllocTracker(args.trace_alloc, args.trace_alloc_top)
+    if side == "server":
+        register_rpc_tagger(lambda t_in, t_out, req_id: tracker.finish(req_id))
+    elif side == "client":
+        tracker.begin("client")
+        register_client_tagger(lambda t0, t_res, req_id: tracker.finish("client"))
+    else:
+        raise ValueError("side must be 'server' or 'client'")
+    return tracker
@@ -0,0 +1,66 @@
+"""
+Building blocks of the bare-ASGI variants of the REST servers (`--bare-asgi`).
+
+On every request the FastAPI apps route, resolve the `Request` /
+`BackgroundTasks` dependencies, build a Response object and schedule the log
+line as a background task. The bare apps are a plain
+`async def app(scope, receive, send)` that serves POST /records and nothing
+else. Under the same uvicorn runner, the latency difference between the two
+is what FastAPI / Starlette costs per request.
+
+Instead of a background task, `t_out` is taken by a send-wrapper
+(`log_on_complete`) right after the final body chunk has been handed to
+uvicorn.
+"""
+
+from typing import Awaitable, Callable, Optional
+
+Send = Callable[[dict], Awaitable[None]]
+
+
+async def read_body(receive) -> Optional[bytes]:
+    """The whole request body; None if the client disconnected first."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def log_on_complete(send: Send, on_complete: Callable[[], None]) -> Send:
+    """Wrap `send` so `on_complete()` runs once the last body chunk is sent."""
+    async def wrapped(message: dict) -> None:
+        await send(message)
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            on_complete()
+    return wrapped
+
+
+async def send_response(send: Send, status: int, body: bytes = b"",
+                        content_type: bytes = b"text/plain") -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def run_lifespan(receive, send, startup: Callable[[], None],
+                       shutdown: Callable[[], None]) -> None:
+    """Answer uvicorn's lifespan protocol, running the two hooks."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            startup()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
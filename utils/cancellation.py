@@ -0,0 +1,80 @@
+"""
+Deadline / cancellation propagation for large responses.
+
+Servers started with `--cancel-chunk-records N` build and serialise a
+`/records` response N records at a time and, between chunks, check whether
+anyone is still waiting for it (gRPC deadline or cancellation, REST client
+disconnect or `req-deadline-ms` budget). Abandoned requests stop early;
+`CancellationStats` counts them and the server time they had already used.
+
+Clients use `read_body_before` to enforce a total deadline on a streamed
+`requests` response – closing the connection is what the server sees.
+"""
+
+from time import perf_counter_ns
+from typing import Iterator, Optional, Tuple
+
+DEFAULT_READ_CHUNK_BYTES = 64 * 1024
+
+
+class RequestCancelled(Exception):
+    """Nobody is waiting for this response any more; `reason` says why."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancellationStats:
+    """Running totals of abandoned requests and the server time they wasted."""
+
+    def __init__(self):
+        self.cancelled = 0
+        self.wasted_ns = 0
+
+    def record(self, t_in: int, reason: str) -> dict:
+        """Count one abandoned request; returns the fields for its log line."""
+        wasted_ns = perf_counter_ns() - t_in
+        self.cancelled += 1
+        self.wasted_ns += wasted_ns
+        return {
+            "cancel_reason": reason,
+            "wasted_ns": wasted_ns,
+            "cancelled_total": self.cancelled,
+            "wasted_ns_total": self.wasted_ns,
+        }
+
+
+def iter_slices(start: int, stop: int, chunk: int) -> Iterator[Tuple[int, int]]:
+    """Yield (lo, hi) bounds covering [start, stop) in steps of `chunk`."""
+    for lo in range(start, stop, chunk):
+        yield lo, min(lo + chunk, stop)
+
+
+def deadline_from_header(t_in: int, value: Optional[str]) -> Optional[int]:
+    """Absolute perf_counter_ns deadline from a `req-deadline-ms` header value."""
+    if not value:
+        return None
+    return t_in + int(float(value) * 1_000_000)
+
+
+def add_cancellation_args(ap) -> None:
+    ap.add_argument("--cancel-chunk-records", type=int, default=0,
+                    help="Build /records responses this many records at a time and stop "
+                         "when the caller has gone away (0 = build in one go)")
+
+
+def read_body_before(res, deadline_ns: int,
+                     chunk_bytes: int = DEFAULT_READ_CHUNK_BYTES) -> Optional[bytes]:
+    """
+    Read a `requests` response opened with `stream=True` until EOF or until
+    perf_counter_ns() passes `deadline_ns`. On expiry the connection is closed
+    (the server observes a disconnect) and None is returned.
+    """
+    parts = []
+    for chunk in res.iter_content(chunk_bytes):
+        parts.append(chunk)
+        if perf_counter_ns() >= deadline_ns:
+            res.close()
+            return None
+    return b"".join(parts)
@@ -6,4 +6,7 @@ PROTOTYPE_RECORD = {
     "timestamp_unit": "MILLISECONDS",
     "cpu_utilization": 59.16598729806647,
     "memory_utilization": 57.18926269056821,
-}
\ No newline at end of file
+}
+
+# How the batch benchmark issues N record-list requests
+BATCH_STRATEGIES = ("batch", "sequential", "concurrent")
@@ -0,0 +1,153 @@
+"""
+CPU affinity and priority of the benchmark's processes, and a record of
+the CPU topology they ran on.
+
+Left alone, the server, the clients, the pid monitors and the netem proxy
+all float across every core, and scheduler migrations show up in the tail
+percentiles. `CpuPlan` pins each role to its own CPU list
+(`os.sched_setaffinity`), optionally renices it, and is applied in the child
+between fork and exec (`Popen(preexec_fn=...)`), so it also holds for
+whatever the child spawns.
+
+`cpu_topology()` reads sysfs: which CPUs are online / isolated, how they
+pair up into cores and packages, and the cpufreq governor and frequencies
+where the kernel exposes them.
+"""
+
+import os
+import platform
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+PIN_ROLES = ("server", "client", "monitor", "proxy")
+SYS_CPU = Path("/sys/devices/system/cpu")
+
+
+def parse_cpu_list(text: str) -> frozenset:
+    """'0-3,6' → {0, 1, 2, 3, 6} (the kernel's cpulist format)."""
+    cpus = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cpus.update(range(int(lo), int(hi or lo) + 1))
+    if not cpus:
+        raise ValueError(f"empty CPU list {text!r}")
+    return frozenset(cpus)
+
+
+def format_cpu_list(cpus: Iterable[int]) -> str:
+    """{0, 1, 2, 3, 6} → '0-3,6'."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(f"{lo}-{hi}" if hi > lo else f"{lo}" for lo, hi in ranges)
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def cpu_topology() -> dict:
+    """The machine's CPUs as seen through sysfs (missing entries are None)."""
+    online = _read(SYS_CPU / "online")
+    cpus = sorted(parse_cpu_list(online)) if online else sorted(os.sched_getaffinity(0))
+    per_cpu = {}
+    for cpu in cpus:
+        base = SYS_CPU / f"cpu{cpu}"
+        freq = base / "cpufreq"
+        per_cpu[cpu] = {
+            "core_id": _read(base / "topology" / "core_id"),
+            "package_id": _read(base / "topology" / "physical_package_id"),
+            "thread_siblings": _read(base / "topology" / "thread_siblings_list"),
+            "governor": _read(freq / "scaling_governor"),
+            "cur_khz": _read(freq / "scaling_cur_freq"),
+            "min_khz": _read(freq / "scaling_min_freq"),
+            "max_khz": _read(freq / "scaling_max_freq"),
+        }
+    model = None
+    for line in (_read(Path("/proc/cpuinfo")) or "").splitlines():
+        if line.startswith("model name"):
+            model = line.partition(":")[2].strip()
+            break
+    return {
+        "machine": platform.machine(),
+        "model": model,
+        "online": online,
+        "isolated": _read(SYS_CPU / "isolated") or None,
+        "allowed": format_cpu_list(os.sched_getaffinity(0)),
+        "governor": cpu_governor(per_cpu),
+        "cpus": per_cpu,
+    }
+
+
+def cpu_governor(per_cpu: dict) -> str:
+    """The cpufreq governor(s) in use, e.g. 'performance' or 'powersave,performance'."""
+    governors = sorted({c["governor"] for c in per_cpu.values() if c["governor"]})
+    return ",".join(governors) or "unknown"
+
+
+class CpuPlan:
+    def __init__(self, pins: Dict[str, frozenset], nice: Optional[int] = None):
+        unknown = set(pins) - set(PIN_ROLES)
+        if unknown:
+            raise ValueError(f"unknown role(s) {', '.join(sorted(unknown))} "
+                             f"(choose from {', '.join(PIN_ROLES)})")
+        allowed = os.sched_getaffinity(0)
+        for role, cpus in pins.items():
+            if not cpus <= allowed:
+                raise ValueError(f"{role}: CPU(s) {format_cpu_list(cpus - allowed)} are not "
+                                 f"available here (allowed: {format_cpu_list(allowed)})")
+        self.pins = pins
+        self.nice = nice
+
+    @classmethod
+    def from_specs(cls, specs: Iterable[str], nice: Optional[int] = None) -> "CpuPlan":
+        """From 'ROLE=CPUS' strings, e.g. ['server=0-1', 'client=2', 'monitor=3']."""
+        pins = {}
+        for spec in specs:
+            role, sep, cpus = spec.partition("=")
+            if not sep:
+                raise ValueError(f"expected ROLE=CPUS, got {spec!r}")
+            pins[role.strip()] = parse_cpu_list(cpus)
+        return cls(pins, nice)
+
+    def preexec(self, role: str) -> Optional[Callable[[], None]]:
+        """`preexec_fn` applying this role's affinity and niceness (None: nothing to do)."""
+        cpus = self.pins.get(role)
+        nice = self.nice if role in ("server", "client") else None
+        if cpus is None and nice is None:
+            return None
+
+        def apply() -> None:
+            if cpus is not None:
+                os.sched_setaffinity(0, cpus)
+            if nice is not None:
+                os.setpriority(os.PRIO_PROCESS, 0, nice)
+        return apply
+
+    def check_nice(self) -> None:
+        """Raise PermissionError if this user cannot set the requested niceness."""
+        if self.nice is None or self.nice >= os.getpriority(os.PRIO_PROCESS, 0):
+            return
+        probe = subprocess.run(
+            [sys.executable, "-c", f"import os; os.setpriority(os.PRIO_PROCESS, 0, {self.nice})"],
+            capture_output=True)
+        if probe.returncode:
+            raise PermissionError(f"raising priority to nice {self.nice} needs CAP_SYS_NICE / root")
+
+    def anchor_fields(self) -> dict:
+        """The plan as `pin_<role>` / `nice` fields for the time anchor."""
+        fields = {f"pin_{role}": format_cpu_list(cpus) for role, cpus in self.pins.items()}
+        if self.nice is not None:
+            fields["nice"] = self.nice
+        return fields
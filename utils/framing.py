@@ -0,0 +1,83 @@
+"""
+Length-prefixed framing of the raw TCP baseline (raw_tcp_server/).
+
+Every message, in either direction, is one frame:
+
+    !I  payload length in bytes
+    !Q  request id – the 64-bit value behind the hex `req_id` of the logs
+    !B  kind – request:  payload encoding (KIND_PROTO / KIND_JSON)
+               response: STATUS_OK / STATUS_ERROR / STATUS_REJECTED
+    payload
+
+Connections are persistent: a client sends one request frame at a time and
+reads its response frame before sending the next. There is no other
+protocol on the wire, so the stack is a lower bound for the HTTP and gRPC
+ones: what remains is the socket, the serialisation and the event loop.
+"""
+
+import asyncio
+import socket
+import struct
+from typing import Optional, Tuple
+
+FRAME_HEADER = struct.Struct("!IQB")
+MAX_FRAME_BYTES = 160 * 1024 * 1024          # same limit as the gRPC server
+
+ENCODINGS = ("proto", "json")
+KIND_PROTO, KIND_JSON = 0, 1
+ENCODING_KINDS = {"proto": KIND_PROTO, "json": KIND_JSON}
+
+STATUS_OK, STATUS_ERROR, STATUS_REJECTED = 0, 1, 2
+
+
+class FrameError(Exception):
+    """The peer sent a frame that violates the framing."""
+
+
+def req_id_to_int(req_id: str) -> int:
+    return int(req_id, 16)
+
+
+def req_id_to_str(value: int) -> str:
+    return f"{value:016x}"
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Tuple[int, int, bytes]]:
+    """Next (req_id, kind, payload) from the stream; None on a clean EOF."""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial:
+            raise FrameError("connection closed inside a frame header")
+        return None
+    length, req_id, kind = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise FrameError(f"frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    return req_id, kind, await reader.readexactly(length)
+
+
+def write_frame(writer: asyncio.StreamWriter, req_id: int, kind: int, payload: bytes) -> None:
+    # two writes: joining would copy a large payload once more
+    writer.write(FRAME_HEADER.pack(len(payload), req_id, kind))
+    writer.write(payload)
+
+
+def _recv_exactly(sock: socket.socket, n: int) -> bytearray:
+    buf = bytearray(n)
+    view = memoryview(buf)
+    while view:
+        received = sock.recv_into(view)
+        if not received:
+            raise FrameError("connection closed inside a frame")
+        view = view[received:]
+    return buf
+
+
+def recv_frame(sock: socket.socket) -> Tuple[int, int, bytearray]:
+    """Blocking counterpart of `read_frame` for the client."""
+    length, req_id, kind = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+    return req_id, kind, _recv_exactly(sock, length)
+
+
+def send_frame(sock: socket.socket, req_id: int, kind: int, payload: bytes) -> None:
+    sock.sendall(FRAME_HEADER.pack(len(payload), req_id, kind) + payload)
@@ -0,0 +1,171 @@
+"""
+Hedged requests (`--hedge-percentile P` / `--hedge-delay-ms D`).
+
+The client sends the request; if no response has arrived after the hedge
+delay, it sends a duplicate on a second channel / connection, takes
+whichever answer comes first and cancels the other: `future.cancel()` for
+gRPC, a socket shutdown for HTTP, which the servers see as a disconnect.
+
+The delay is the P-th percentile of the latency (t_res − t_req) of earlier
+requests for the same count in the client's own log (plain and hedged
+fetches both log `count`), so it follows the server as a benchmark goes
+on. Until MIN_HISTORY such lines exist, the fixed `--hedge-delay-ms` is
+used, or no hedge is sent.
+
+Hedged lines carry `count`, `hedge_delay_ms` (None: not armed), `hedged`
+and `winner` ("primary" / "hedge"). The hedge's server line is logged as
+`<req_id>-h`.
+"""
+
+import json
+import queue
+import socket
+import threading
+from collections import deque
+from contextlib import suppress
+from pathlib import Path
+from typing import Callable, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+from utils.uds import _UnixHTTPConnection, _UnixHTTPConnectionPool
+
+T = TypeVar("T")
+MIN_HISTORY = 20
+HISTORY_LINES = 1_000
+WINNERS = ("primary", "hedge")
+
+
+class HedgePolicy:
+    def __init__(self, percentile: Optional[float] = None, delay_ms: Optional[float] = None,
+                 history: Optional[Path] = None):
+        if percentile is None and delay_ms is None:
+            raise ValueError("a hedge needs a percentile or a fixed delay")
+        self.percentile = percentile
+        self.delay_ms = delay_ms
+        self.history = history
+
+    def delay_for(self, count: int) -> Optional[float]:
+        """Hedge delay in ms for a request of `count` records (None: do not hedge)."""
+        if self.percentile is None or self.history is None or not self.history.exists():
+            return self.delay_ms
+        with open(self.history) as fh:
+            tail = deque(fh, maxlen=HISTORY_LINES)
+        latencies = []
+        for line in tail:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:     # another client process is mid-write
+                continue
+            if rec.get("count") == count and rec.get("status") is None:
+                latencies.append((rec["t_res"] - rec["t_req"]) / 1e6)
+        if len(latencies) < MIN_HISTORY:
+            return self.delay_ms
+        return float(np.percentile(latencies, self.percentile))
+
+
+def add_hedge_args(ap) -> None:
+    ap.add_argument("--hedge-percentile", type=float, metavar="P",
+                    help="Send a duplicate request once this percentile of earlier latencies "
+                         "(same count, from --log-file) has passed without a response")
+    ap.add_argument("--hedge-delay-ms", type=float,
+                    help="Fixed hedge delay; with --hedge-percentile, used until "
+                         f"{MIN_HISTORY} earlier requests are logged")
+
+
+def hedge_policy_from_args(args) -> Optional[HedgePolicy]:
+    if args.hedge_percentile is None and args.hedge_delay_ms is None:
+        return None
+    return HedgePolicy(args.hedge_percentile, args.hedge_delay_ms, args.log_file)
+
+
+def race(attempt: Callable[[int], T], cancel: Callable[[int], None],
+         delay_ms: Optional[float]) -> Tuple[T, int, bool]:
+    """
+    Run `attempt(0)`; if it has not finished after `delay_ms`, run `attempt(1)`
+    alongside it. The first success wins and `cancel` is called on the other.
+    Returns (result, index of the winner, whether the hedge was sent).
+    """
+    done: queue.Queue = queue.Queue()
+
+    def run(i: int) -> None:
+        try:
+            done.put((i, attempt(i), None))
+        except Exception as exc:
+            done.put((i, None, exc))
+
+    # daemon threads: a cancelled loser must not keep the client alive
+    threading.Thread(target=run, args=(0,), daemon=True).start()
+    try:
+        i, result, exc = done.get(timeout=delay_ms / 1000 if delay_ms is not None else None)
+        hedged = False
+    except queue.Empty:
+        threading.Thread(target=run, args=(1,), daemon=True).start()
+        hedged = True
+        i, result, exc = done.get()
+        if exc is not None:                 # the other attempt may still succeed
+            i, result, exc = done.get()
+        cancel(1 - i)
+    if exc is not None:
+        raise exc
+    return result, i, hedged
+
+
+# --------------------------------------------------------------------------- #
+# HTTP: one adapter per attempt, whose sockets can be shut down mid-request    #
+# --------------------------------------------------------------------------- #
+
+class _TrackedHTTPConnection(HTTPConnection):
+    def __init__(self, *args, sockets: list, cancelled: threading.Event, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sockets = sockets
+        self._cancelled = cancelled
+
+    def _new_conn(self) -> socket.socket:
+        sock = super()._new_conn()
+        self._sockets.append(sock)
+        if self._cancelled.is_set():        # cancelled while still connecting
+            sock.shutdown(socket.SHUT_RDWR)
+        return sock
+
+
+class _TrackedUnixHTTPConnection(_TrackedHTTPConnection, _UnixHTTPConnection):
+    pass
+
+
+class CancellableHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter (over `uds_path`, if given) whose `cancel()` aborts its connections from any thread."""
+
+    def __init__(self, uds_path=None, **kwargs):
+        self._uds_path = uds_path
+        self._sockets = []
+        self._cancelled = threading.Event()
+        self._pool = None
+        super().__init__(**kwargs)
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        if self._pool is None:
+            if self._uds_path is not None:
+                self._pool = _UnixHTTPConnectionPool(str(self._uds_path))
+                self._pool.ConnectionCls = _TrackedUnixHTTPConnection
+            else:
+                url = urlparse(request.url)
+                self._pool = HTTPConnectionPool(url.hostname, url.port or 80)
+                self._pool.ConnectionCls = _TrackedHTTPConnection
+            self._pool.conn_kw.update(sockets=self._sockets, cancelled=self._cancelled)
+        return self._pool
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        for sock in self._sockets:
+            with suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+
+    def close(self) -> None:
+        super().close()
+        if self._pool is not None:
+            self._pool.close()
@@ -0,0 +1,77 @@
+"""
+Strong ETags for the REST servers and a matching on-disk client cache.
+
+The record pool never changes after `create_app`, so a response is fully
+determined by (pool content, offset, count, representation). `pool_version`
+hashes the pool's content once; `record_list_etag` combines it with the
+slice and the media type.
+
+The clients are one-shot processes, so their cache lives on disk: one body
+file plus one ETag file per cache key.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+def pool_version(prototype: dict, pool_size: int) -> str:
+    """Short content hash of a pool made of `pool_size` copies of `prototype`."""
+    digest = hashlib.sha256(
+        json.dumps(prototype, sort_keys=True).encode("utf-8")
+        + pool_size.to_bytes(8, "big")
+    )
+    return digest.hexdigest()[:16]
+
+
+def record_list_etag(version: str, offset: int, count: int, representation: str) -> str:
+    return f'"{version}-{offset}-{count}-{representation}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    """`tag` without its weakness indicator: W/"x" → "x"."""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    RFC 9110 If-None-Match on a GET: "*" or a comma-separated list of entity
+    tags, compared weakly (a W/ prefix on either side is ignored).
+    """
+    if not if_none_match:
+        return False
+    opaque = _opaque_tag(etag)
+    return any(tag == "*" or tag == opaque
+               for tag in map(_opaque_tag, if_none_match.split(",")))
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: Path):
+        self._dir = Path(cache_dir)
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self._dir / f"{key}.body", self._dir / f"{key}.etag"
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the cached ETag for `key`, or None."""
+        _, etag_path = self._paths(key)
+        try:
+            return etag_path.read_text()
+        except FileNotFoundError:
+            return None
+
+    def body(self, key: str) -> bytes:
+        body_path, _ = self._paths(key)
+        return body_path.read_bytes()
+
+    def store(self, key: str, etag: str, body: bytes) -> None:
+        body_path, etag_path = self._paths(key)
+        # body first, ETag last: a reader never sees an ETag without its body
+        for path, data in ((body_path, body), (etag_path, etag.encode("utf-8"))):
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
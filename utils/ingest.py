@@ -0,0 +1,80 @@
+"""
+Append-only, in-memory columnar store behind the ingest endpoints
+(gRPC `IngestRecords` / `TelemetrySession`, REST `POST /records/ingest`).
+
+Uploaded records are not kept as dicts / messages. Each batch is split into
+columns as it arrives:
+
+* string fields → dictionary-encoded int32 codes (one label table per field)
+* metric fields → float64 arrays
+
+Columns are kept as a queue of per-batch arrays, so an append costs one pass
+over the batch and never copies what is already stored. Once more than
+`max_rows` rows are held, the oldest batches are dropped, so a long
+benchmark does not grow the server without bound; `rows` keeps counting
+everything ever ingested.
+"""
+
+from collections import deque
+from typing import Deque, Dict, Iterable, List
+
+import numpy as np
+
+from utils.aggregation import VALUE_FIELDS
+
+STRING_FIELDS = ("region", "availability_zone", "hostname", "timestamp", "timestamp_unit")
+DEFAULT_INGEST_CHUNK_RECORDS = 10_000
+DEFAULT_INGEST_MAX_ROWS = 5_000_000
+# telemetry sessions: one store each, so a smaller cap
+DEFAULT_SESSION_WINDOW = 8
+DEFAULT_SESSION_MAX_ROWS = 1_000_000
+
+
+class IngestStore:
+    def __init__(self, max_rows: int = DEFAULT_INGEST_MAX_ROWS):
+        self.max_rows = max_rows
+        self.rows = 0                   # ever ingested
+        self.retained_rows = 0          # currently held
+        self._labels: Dict[str, Dict[str, int]] = {f: {} for f in STRING_FIELDS}
+        self._codes: Dict[str, Deque[np.ndarray]] = {f: deque() for f in STRING_FIELDS}
+        self._values: Dict[str, Deque[np.ndarray]] = {f: deque() for f in VALUE_FIELDS}
+
+    def _append_columns(self, columns: Dict[str, list], n: int) -> int:
+        # convert every column first: a bad value must not leave the columns uneven
+        values = {f: np.asarray(columns[f], dtype=np.float64) for f in VALUE_FIELDS}
+        codes = {}
+        for field in STRING_FIELDS:
+            labels = self._labels[field]
+            codes[field] = np.fromiter(
+                (labels.setdefault(label, len(labels)) for label in columns[field]),
+                dtype=np.int32, count=n)
+        for field in STRING_FIELDS:
+            self._codes[field].append(codes[field])
+        for field in VALUE_FIELDS:
+            self._values[field].append(values[field])
+        self.rows += n
+        self.retained_rows += n
+        while self.retained_rows > self.max_rows and len(self._values[VALUE_FIELDS[0]]) > 1:
+            self.retained_rows -= len(self._values[VALUE_FIELDS[0]].popleft())
+            for field in STRING_FIELDS:
+                self._codes[field].popleft()
+            for field in VALUE_FIELDS[1:]:
+                self._values[field].popleft()
+        return n
+
+    def append_dicts(self, records: List[dict]) -> int:
+        """Append JSON-decoded records; KeyError / ValueError if one is malformed."""
+        columns = {f: [r[f] for r in records] for f in (*STRING_FIELDS, *VALUE_FIELDS)}
+        return self._append_columns(columns, len(records))
+
+    def append_messages(self, records: Iterable) -> int:
+        """Append pb2.Record messages (e.g. IngestRequest.records)."""
+        records = list(records)
+        columns = {f: [getattr(r, f) for r in records] for f in (*STRING_FIELDS, *VALUE_FIELDS)}
+        return self._append_columns(columns, len(records))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays (label tables not included)."""
+        return sum(a.nbytes for arrays in (*self._codes.values(), *self._values.values())
+                   for a in arrays)
@@ -0,0 +1,121 @@
+"""
+Opt-in server instrumentation: GC pauses, event-loop lag and per-request
+overlap tags.
+
+With `--instrument` a server
+
+* times every garbage collection through `gc.callbacks` (per generation),
+* runs a loop-lag probe (utils/loop_lag.py), and
+* adds to every log_rpc line what overlapped the request:
+  `gc_pause_ns` / `gc_collections` / `gc_max_generation` and
+  `loop_lag_max_ns`,
+
+so a slow request can be attributed to a collection or a blocked loop.
+`--gc-freeze` moves the pre-built record pool into the permanent generation
+(`gc.freeze()`), so later collections no longer traverse those dicts.
+"""
+
+import gc
+import json
+from collections import deque
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Optional
+
+from utils.logger import register_rpc_tagger
+from utils.loop_lag import LoopLagMonitor, add_loop_lag_args, monitor_from_args
+
+DEFAULT_GC_HISTORY = 4096
+
+
+class GcPauseMonitor:
+    """Times collections via gc.callbacks; optionally logs one JSON line each."""
+
+    def __init__(self, log_file_path: Optional[Path] = None,
+                 history: int = DEFAULT_GC_HISTORY):
+        self.collections = [0, 0, 0]     # per generation
+        self.pause_ns = [0, 0, 0]
+        self._events = deque(maxlen=history)     # (start, end, generation), oldest first
+        self._start: Optional[int] = None
+        # line-buffered: the server is usually stopped with SIGINT
+        self._fh = open(log_file_path, "w", buffering=1) if log_file_path else None
+
+    def _callback(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._start = perf_counter_ns()
+            return
+        end = perf_counter_ns()
+        generation = info["generation"]
+        pause_ns = end - self._start
+        self._events.append((self._start, end, generation))
+        self.collections[generation] += 1
+        self.pause_ns[generation] += pause_ns
+        if self._fh is not None:
+            self._fh.write(json.dumps({
+                "ts": self._start, "pause_ns": pause_ns, "generation": generation,
+                "collected": info["collected"], "uncollectable": info["uncollectable"],
+            }) + "\n")
+
+    def install(self) -> None:
+        gc.callbacks.append(self._callback)
+
+    def uninstall(self) -> None:
+        gc.callbacks.remove(self._callback)
+
+    def overlap(self, t_in: int, t_out: int) -> dict:
+        """GC time inside [t_in, t_out] and the oldest generation collected."""
+        pause_ns = collections = 0
+        max_generation = None
+        for start, end, generation in reversed(self._events):
+            if end < t_in:
+                break
+            if start <= t_out:
+                pause_ns += min(end, t_out) - max(start, t_in)
+                collections += 1
+                max_generation = max(generation, max_generation or 0)
+        return {
+            "gc_pause_ns": pause_ns,
+            "gc_collections": collections,
+            "gc_max_generation": max_generation,
+        }
+
+
+def freeze_gc() -> None:
+    """Collect once, then exempt everything alive (the record pool) from GC."""
+    gc.collect()
+    gc.freeze()
+
+
+def add_instrumentation_args(ap) -> None:
+    add_loop_lag_args(ap)
+    ap.add_argument("--instrument", action="store_true",
+                    help="Time GC pauses, probe loop lag and tag every log line with "
+                         "what overlapped the request")
+    ap.add_argument("--gc-log", type=Path,
+                    help="With --instrument: one JSON line per collection into this file")
+    ap.add_argument("--gc-freeze", action="store_true",
+                    help="gc.freeze() after the record pool is built")
+
+
+def instrumentation_from_args(args) -> Optional[LoopLagMonitor]:
+    """
+    Install GC timing and the log_rpc overlap tags if `--instrument` is set.
+    Returns the loop-lag monitor the server has to start on its event loop
+    (None when neither --instrument nor --loop-lag-log asked for one).
+    """
+    loop_lag = monitor_from_args(args)
+    if not args.instrument:
+        return loop_lag
+
+    if loop_lag is None:
+        loop_lag = LoopLagMonitor(None, args.loop_lag_interval_ms / 1000)
+    gc_monitor = GcPauseMonitor(args.gc_log)
+    gc_monitor.install()
+
+    frozen = args.gc_freeze
+    register_rpc_tagger(lambda t_in, t_out, _req_id: {
+        **gc_monitor.overlap(t_in, t_out),
+        **loop_lag.overlap(t_in, t_out),
+        "gc_frozen": frozen,
+    })
+    return loop_lag
@@ -2,6 +2,22 @@ import logging
 import sys
 import json
 from time import perf_counter_ns 
+from typing import Callable, Dict
+
+# Callables (t_in, t_out, req_id) -> dict whose fields are added to every
+# log_rpc line; likewise (t0, t_res, req_id) for log_client lines
+_rpc_taggers = []
+_client_taggers = []
+
+
+def register_rpc_tagger(tagger: Callable[[int, int, str], Dict]) -> None:
+    """Add `tagger(t_in, t_out, req_id)`'s fields to every subsequent log_rpc line."""
+    _rpc_taggers.append(tagger)
+
+
+def register_client_tagger(tagger: Callable[[int, int, str], Dict]) -> None:
+    """Add `tagger(t0, t_res, req_id)`'s fields to every subsequent log_client line."""
+    _client_taggers.append(tagger)
 
 
 def setup_logger(name: str, log_file_path: str) -> logging.Logger:
@@ -34,12 +50,15 @@ def log_rpc(
         log: logging.Logger,
         *,
         t_in: float,
-        req_id: str
+        req_id: str,
+        **extra
         ) -> None:
     t_out = perf_counter_ns()
+    for tagger in _rpc_taggers:
+        extra.update(tagger(t_in, t_out, req_id))
     log.info(
         json.dumps(
-            {"t_in": t_in, "t_out": t_out, "req_id": req_id},
+            {"t_in": t_in, "t_out": t_out, "req_id": req_id, **extra},
             separators=(",", ":"),
         )
     )
@@ -53,8 +72,11 @@ def log_client(
         t_res: float,
         req_id: str,
         req_size_bytes=int,
-        res_size_bytes=int
+        res_size_bytes=int,
+        **extra
         ) -> None:
+    for tagger in _client_taggers:
+        extra.update(tagger(t0, t_res, req_id))
     log.info(
         json.dumps(
             {
@@ -63,7 +85,8 @@ def log_client(
                 "t_res": t_res,
                 "req_id": req_id,
                 "req_size_bytes": req_size_bytes,
-                "res_size_bytes": res_size_bytes
+                "res_size_bytes": res_size_bytes,
+                **extra
                 },
             separators=(",", ":"),
         )
@@ -0,0 +1,90 @@
+"""
+Event-loop lag sampler.
+
+A background task sleeps for `interval_s` in a loop and records how much
+later than asked it woke up. Anything that holds the loop (inline
+serialisation of a large response, a GC pause, …) shows up as lag, which is
+exactly the head-of-line delay a small request arriving at that moment would
+see.
+
+With a log file, writes one JSON line per sample, like pid_monitor.py:
+{"ts": <perf_counter_ns at wake-up>, "lag_ns": <wake-up delay>}
+
+Recent samples are also kept in memory so `overlap(t_in, t_out)` can tell
+how badly the loop was blocked while a given request was in flight.
+"""
+
+import asyncio
+import json
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Optional
+
+DEFAULT_LOOP_LAG_INTERVAL_MS = 10.0
+DEFAULT_LOOP_LAG_HISTORY = 4096
+
+
+class LoopLagMonitor:
+    def __init__(self, log_file_path: Optional[Path] = None,
+                 interval_s: float = DEFAULT_LOOP_LAG_INTERVAL_MS / 1000,
+                 history: int = DEFAULT_LOOP_LAG_HISTORY):
+        self.log_file_path = Path(log_file_path) if log_file_path else None
+        self.interval_s = interval_s
+        self.max_lag_ns = 0
+        self._interval_ns = int(interval_s * 1e9)
+        self._samples = deque(maxlen=history)    # (t_sleep, ts, lag_ns), oldest first
+        self._t_sleep: Optional[int] = None      # start of the sleep in progress
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        # line-buffered: the server is usually stopped with SIGINT
+        log = (open(self.log_file_path, "w", buffering=1)
+               if self.log_file_path else nullcontext())
+        with log as fh:
+            while True:
+                self._t_sleep = t_sleep = perf_counter_ns()
+                await asyncio.sleep(self.interval_s)
+                ts = perf_counter_ns()
+                lag_ns = max(ts - t_sleep - self._interval_ns, 0)
+                self.max_lag_ns = max(self.max_lag_ns, lag_ns)
+                self._samples.append((t_sleep, ts, lag_ns))
+                if fh is not None:
+                    fh.write(json.dumps({"ts": ts, "lag_ns": lag_ns}) + "\n")
+
+    def overlap(self, t_in: int, t_out: int) -> dict:
+        """Worst loop lag among the samples overlapping [t_in, t_out]."""
+        max_lag_ns = 0
+        for t_sleep, ts, lag_ns in reversed(self._samples):
+            if ts < t_in:
+                break
+            if t_sleep <= t_out:
+                max_lag_ns = max(max_lag_ns, lag_ns)
+        # the sample in progress: the loop may have been blocked until just now
+        if self._t_sleep is not None:
+            max_lag_ns = max(max_lag_ns,
+                             perf_counter_ns() - self._t_sleep - self._interval_ns)
+        return {"loop_lag_max_ns": max_lag_ns}
+
+    def start(self) -> asyncio.Task:
+        """Start sampling on the running loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+def add_loop_lag_args(ap) -> None:
+    ap.add_argument("--loop-lag-log", type=Path,
+                    help="Sample event-loop lag into this JSON-lines file")
+    ap.add_argument("--loop-lag-interval-ms", type=float, default=DEFAULT_LOOP_LAG_INTERVAL_MS,
+                    help="Loop-lag sampling interval (default: %(default)s)")
+
+
+def monitor_from_args(args) -> Optional[LoopLagMonitor]:
+    if args.loop_lag_log is None:
+        return None
+    return LoopLagMonitor(args.loop_lag_log, args.loop_lag_interval_ms / 1000)
@@ -0,0 +1,102 @@
+"""
+Serialising large `/records` responses off the event loop.
+
+Responses for at least `threshold` records are encoded by a worker pool
+instead of inline on the asyncio loop, so small requests on the same loop
+are not stuck behind them:
+
+* thread  – the server's `encode(records, offset, count)` runs in a thread.
+  json.dumps / SerializeToString hold the GIL for a whole call, so the
+  encoders work OFFLOAD_CHUNK_RECORDS at a time; the loop gets the GIL back
+  between chunks.
+* process – workers build their own copy of the (constant) record pool once,
+  so only (offset, count) goes over the pipe and the encoded body comes back.
+  Workers are spawned, not forked, which keeps gRPC's threads out of them.
+
+Usage inside an asyncio handler:
+
+    if offloader is not None and offloader.wanted(count):
+        body = await offloader.encode(encode_records, records, offset, count)
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from utils.constants import PROTOTYPE_RECORD
+
+OFFLOAD_POOLS = ("thread", "process")
+OFFLOAD_CHUNK_RECORDS = 10_000
+DEFAULT_OFFLOAD_WORKERS = 4
+
+# Record pool of a process-pool worker (set by the initializer)
+_worker_records = None
+
+
+def _init_process_worker(pool_size: int) -> None:
+    global _worker_records
+    _worker_records = [PROTOTYPE_RECORD.copy() for _ in range(pool_size)]
+
+
+def _encode_in_worker(encode: Callable, offset: int, count: int):
+    return encode(_worker_records, offset, count)
+
+
+class Offloader:
+    def __init__(self, threshold: int, pool: str, workers: int, pool_size: int):
+        if threshold < 1:
+            raise ValueError("threshold must be >= 1")
+        if pool not in OFFLOAD_POOLS:
+            raise ValueError(f"pool must be one of {OFFLOAD_POOLS}")
+        self.threshold = threshold
+        self.pool = pool
+
+        self._executor: Executor
+        if pool == "process":
+            self._executor = ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker,
+                initargs=(pool_size,),
+            )
+            # start every worker (and build its pool) now, not on the first request
+            for future in [self._executor.submit(int) for _ in range(workers)]:
+                future.result()
+        else:
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix="offload")
+
+    def wanted(self, count: int) -> bool:
+        return count >= self.threshold
+
+    async def encode(self, encode: Callable, records: list, offset: int, count: int):
+        """
+        Run `encode(records, offset, count)` on the pool. For the process
+        pool `encode` must be importable (module level) and gets the worker's
+        own copy of the pool in place of `records`.
+        """
+        loop = asyncio.get_running_loop()
+        if self.pool == "process":
+            return await loop.run_in_executor(
+                self._executor, _encode_in_worker, encode, offset, count)
+        return await loop.run_in_executor(self._executor, encode, records, offset, count)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def add_offload_args(ap) -> None:
+    ap.add_argument("--offload-threshold", type=int, default=0,
+                    help="Serialise /records responses of at least this many records on a "
+                         "worker pool instead of the event loop (0 = never)")
+    ap.add_argument("--offload-pool", choices=OFFLOAD_POOLS, default="thread",
+                    help="Worker pool for offloaded serialisation (default: %(default)s)")
+    ap.add_argument("--offload-workers", type=int, default=DEFAULT_OFFLOAD_WORKERS,
+                    help="Worker threads / processes (default: %(default)s)")
+
+
+def offloader_from_args(args) -> Optional[Offloader]:
+    if not args.offload_threshold:
+        return None
+    return Offloader(args.offload_threshold, args.offload_pool,
+                     args.offload_workers, args.pool_size)
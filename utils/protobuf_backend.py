@@ -0,0 +1,70 @@
+"""
+Which protobuf runtime backend a process runs on.
+
+`google.protobuf` picks its implementation once, on first import, from
+PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION: upb (the default since 4.21), cpp
+(the legacy C++ extension) or python (pure Python). The generated
+records_pb2.py files do not record it, so the protobuf servers and clients
+call `tag_protobuf_backend()` at start-up. It refuses to run on a backend
+other than the requested one and adds `protobuf_backend` to every log line.
+
+The orchestrator sweeps backends by starting processes with `backend_env()`.
+"""
+
+import os
+import subprocess
+import sys
+from typing import Optional
+
+from utils.logger import register_client_tagger, register_rpc_tagger
+
+BACKEND_ENV = "PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION"
+PROTOBUF_BACKENDS = ("upb", "cpp", "python")
+
+# Loading a generated module is what fails when a backend is missing
+_PROBE = ("import google.protobuf.descriptor_pb2; "
+          "from google.protobuf.internal import api_implementation; "
+          "print(api_implementation.Type())")
+
+
+def active_backend() -> str:
+    from google.protobuf.internal import api_implementation
+    return api_implementation.Type()
+
+
+def backend_env(backend: Optional[str]) -> Optional[dict]:
+    """Environment for a child process on `backend` (None: inherit ours)."""
+    if backend is None:
+        return None
+    return {**os.environ, BACKEND_ENV: backend}
+
+
+def available_backends() -> list:
+    """The backends that actually load here, each probed in a fresh interpreter."""
+    available = []
+    for backend in PROTOBUF_BACKENDS:
+        probe = subprocess.run([sys.executable, "-c", _PROBE], env=backend_env(backend),
+                               capture_output=True, text=True)
+        if probe.returncode == 0 and probe.stdout.strip() == backend:
+            available.append(backend)
+    return available
+
+
+def tag_protobuf_backend(side: str) -> str:
+    """
+    Check that the backend requested through the environment is the one that
+    loaded, and tag every log line of `side` ("server" / "client") with it.
+    """
+    backend = active_backend()
+    requested = os.environ.get(BACKEND_ENV)
+    if requested and requested != backend:
+        raise SystemExit(f"{BACKEND_ENV}={requested} requested, but protobuf loaded {backend}")
+
+    fields = {"protobuf_backend": backend}
+    if side == "server":
+        register_rpc_tagger(lambda t_in, t_out, req_id: fields)
+    elif side == "client":
+        register_client_tagger(lambda t0, t_res, req_id: fields)
+    else:
+        raise ValueError("side must be 'server' or 'client'")
+    return backend
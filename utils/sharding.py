@@ -0,0 +1,23 @@
+from typing import List, Tuple
+
+
+def shard_bounds(count: int, shards: int) -> List[Tuple[int, int]]:
+    """
+    Split `count` records into `shards` contiguous ranges.
+
+    Returns a list of (offset, count) pairs, in order, whose counts differ by
+    at most one; never more ranges than records (a count of 0 yields one
+    empty range so callers still issue a request).
+    """
+    if shards < 1:
+        raise ValueError("shards must be >= 1")
+    shards = max(1, min(shards, count))
+    base, extra = divmod(count, shards)
+
+    bounds = []
+    offset = 0
+    for i in range(shards):
+        n = base + (1 if i < extra else 0)
+        bounds.append((offset, n))
+        offset += n
+    return bounds
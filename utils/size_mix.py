@@ -0,0 +1,109 @@
+"""
+Mixed-size workloads (`--mix SPEC`).
+
+Instead of one `--count` per run, a client sends `--mix-requests` requests
+one after another, each asking for a count drawn from a heavy-tailed
+distribution, so occasional huge requests land among many small ones:
+
+    zipf:a=1.5,scale=10,max=1000000        scale × Zipf(a), capped at max
+    lognormal:median=10,sigma=2.5,max=1000000
+    histogram:10=9900,1000=90,1000000=10   count=weight pairs (empirical mix)
+    histogram:path/to/sizes.csv            the same as "count,weight" rows
+
+Every client line of such a run carries the `count` it asked for and the
+`mix` spec, so latencies can be split by size and by what else was in
+flight (see convert_jsonl_to_csv_mix).
+"""
+
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from utils.logger import register_client_tagger
+
+MIX_KINDS = ("zipf", "lognormal", "histogram")
+DEFAULT_MIX_REQUESTS = 200
+DEFAULT_MAX_COUNT = 1_000_000
+DEFAULTS = {
+    "zipf": {"a": 1.5, "scale": 10, "max": DEFAULT_MAX_COUNT},
+    "lognormal": {"median": 10, "sigma": 2.5, "max": DEFAULT_MAX_COUNT},
+}
+
+
+class SizeMix:
+    def __init__(self, spec: str):
+        kind, _, params = spec.partition(":")
+        if kind not in MIX_KINDS:
+            raise ValueError(f"unknown mix {kind!r} (choose from {', '.join(MIX_KINDS)})")
+        self.spec = spec
+        self.kind = kind
+
+        if kind == "histogram":
+            if not params:
+                raise ValueError("histogram needs count=weight pairs or a CSV path")
+            if "=" in params:
+                pairs = [p.split("=") for p in params.split(",") if p]
+            else:
+                lines = Path(params).read_text().splitlines()
+                pairs = [line.split(",") for line in lines if line.strip()]
+                if pairs and not pairs[0][0].strip().isdigit():
+                    pairs = pairs[1:]                    # header row
+            counts = np.array([int(c) for c, _ in pairs])
+            weights = np.array([float(w) for _, w in pairs])
+            if (counts < 1).any() or (weights < 0).any() or weights.sum() <= 0:
+                raise ValueError(f"bad histogram {params!r}")
+            self.params = {}
+            self.counts = counts
+            self.probs = weights / weights.sum()
+            self.max_count = int(counts.max())
+            return
+
+        self.params = dict(DEFAULTS[kind])
+        for item in filter(None, params.split(",")):
+            name, sep, value = item.partition("=")
+            if not sep or name not in self.params:
+                raise ValueError(f"{kind}: expected {', '.join(self.params)}=VALUE, got {item!r}")
+            self.params[name] = float(value)
+        self.max_count = int(self.params["max"])
+        if kind == "zipf" and self.params["a"] <= 1:
+            raise ValueError("zipf needs a > 1")
+
+    def draw(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """`n` request counts, each in [1, max_count]."""
+        p = self.params
+        if self.kind == "histogram":
+            counts = rng.choice(self.counts, size=n, p=self.probs)
+        elif self.kind == "zipf":
+            counts = p["scale"] * rng.zipf(p["a"], size=n)
+        else:
+            counts = np.rint(rng.lognormal(np.log(p["median"]), p["sigma"], size=n))
+        return np.clip(counts, 1, self.max_count).astype(np.int64)
+
+
+def parse_mix(spec: str) -> SizeMix:
+    """argparse `type=` for --mix."""
+    try:
+        return SizeMix(spec)
+    except (ValueError, OSError) as exc:
+        raise argparse.ArgumentTypeError(str(exc))
+
+
+def add_mix_args(ap) -> None:
+    ap.add_argument("--mix", type=parse_mix, metavar="SPEC",
+                    help="Draw each request's count from this distribution instead of --count "
+                         f"({' / '.join(MIX_KINDS)}, see utils/size_mix.py)")
+    ap.add_argument("--mix-requests", type=int, default=DEFAULT_MIX_REQUESTS,
+                    help="With --mix: requests to send one after another (default: %(default)s)")
+    ap.add_argument("--mix-seed", type=int, help="With --mix: seed of the count generator")
+
+
+def run_mix(fetch: Callable[[int], None], mix: SizeMix, requests: int,
+            seed: Optional[int] = None) -> None:
+    """Call `fetch(count)` for `requests` drawn counts; their client lines carry `count` / `mix`."""
+    current: Dict = {"mix": mix.spec}
+    register_client_tagger(lambda t0, t_res, req_id: current)
+    for count in mix.draw(requests, np.random.default_rng(seed)):
+        current["count"] = int(count)
+        fetch(int(count))
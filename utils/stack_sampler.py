@@ -0,0 +1,157 @@
+"""
+In-process sampling profiler writing collapsed stacks (flamegraph.pl /
+speedscope "folded" format: `root;caller;leaf <count>` per line).
+
+`setitimer(ITIMER_PROF)` delivers SIGPROF every `interval_s` of process CPU
+time; the handler records the main thread's Python stack – the event loop of
+the servers, the request path of the clients. Signals only run between
+bytecodes, so several ticks that fall inside one long C call (json.dumps,
+SerializeToString) arrive as one; each sample is therefore weighted by the
+main thread's CPU time since the previous one instead of counting 1.
+
+Counts are merged into the output file every `flush_s` and at exit, under an
+flock and as a delta, so several processes (concurrent clients, repeated
+runs) can accumulate into one file and a server that gets SIGKILLed loses at
+most the last second.
+"""
+
+import atexit
+import fcntl
+import os
+import signal
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent) + os.sep
+DEFAULT_PROFILE_INTERVAL_MS = 5.0
+DEFAULT_PROFILE_FLUSH_S = 1.0
+
+
+def read_collapsed(path: Path) -> Counter:
+    """Parse a collapsed-stack file into {stack: count}."""
+    counts = Counter()
+    with open(path) as fh:
+        for line in fh:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack:
+                counts[stack] += int(count)
+    return counts
+
+
+def write_collapsed(path: Path, counts: Dict[str, int]) -> None:
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, "w") as fh:
+        for stack, count in sorted(counts.items()):
+            fh.write(f"{stack} {count}\n")
+    os.replace(tmp, path)
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if path.startswith(PROJECT_ROOT):
+        path = path[len(PROJECT_ROOT):]
+    else:
+        # stdlib / site-packages: keep the last two components
+        path = os.sep.join(path.rsplit(os.sep, 2)[-2:])
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    def __init__(self, out_path: Path,
+                 interval_s: float = DEFAULT_PROFILE_INTERVAL_MS / 1000,
+                 flush_s: float = DEFAULT_PROFILE_FLUSH_S):
+        self.out_path = Path(out_path)
+        self.interval_s = interval_s
+        self.flush_s = flush_s
+        self._interval_ns = int(interval_s * 1e9)
+        self._counts = Counter()        # stack → weight, since start
+        self._flushed = Counter()       # part of _counts already in the file
+        self._labels = {}               # code object → frame label
+        self._pending_ns = 0
+        self._last_cpu_ns = 0
+        self._in_handler = False
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()     # periodic vs atexit flush
+
+    # -- signal handler (main thread) --------------------------------------- #
+    def _on_sample(self, signum, frame) -> None:
+        if self._in_handler:            # a tick landed inside the handler itself
+            return
+        self._in_handler = True
+        try:
+            now = time.thread_time_ns()
+            self._pending_ns += now - self._last_cpu_ns
+            self._last_cpu_ns = now
+            weight, self._pending_ns = divmod(self._pending_ns, self._interval_ns)
+            if not weight or frame is None:
+                return
+
+            labels = self._labels
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            stack.reverse()
+            self._counts[";".join(stack)] += weight
+        finally:
+            self._in_handler = False
+
+    # -- lifecycle ----------------------------------------------------------- #
+    def start(self) -> None:
+        """Install the SIGPROF handler; must be called from the main thread."""
+        self._last_cpu_ns = time.thread_time_ns()
+        signal.signal(signal.SIGPROF, self._on_sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval_s, self.interval_s)
+        threading.Thread(target=self._flush_loop, name="stack-sampler", daemon=True).start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        self._stop.set()
+        self.flush()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_s):
+            self.flush()
+
+    def flush(self) -> None:
+        """Add everything sampled since the last flush to the output file."""
+        with self._flush_lock:
+            delta = Counter(self._counts)      # copy; the handler keeps writing
+            delta.subtract(self._flushed)
+            delta = +delta                     # drop zero / negative entries
+            if not delta:
+                return
+            # lock the directory (no stray lock files); released on close
+            dir_fd = os.open(self.out_path.parent, os.O_RDONLY)
+            try:
+                fcntl.flock(dir_fd, fcntl.LOCK_EX)
+                counts = read_collapsed(self.out_path) if self.out_path.exists() else Counter()
+                counts.update(delta)
+                write_collapsed(self.out_path, counts)
+            finally:
+                os.close(dir_fd)
+            self._flushed.update(delta)
+
+
+def add_profile_args(ap) -> None:
+    ap.add_argument("--profile-out", type=Path,
+                    help="Sample the main thread's stack and add collapsed stacks to this file")
+    ap.add_argument("--profile-interval-ms", type=float, default=DEFAULT_PROFILE_INTERVAL_MS,
+                    help="CPU time between samples (default: %(default)s)")
+
+
+def sampler_from_args(args) -> Optional[StackSampler]:
+    """Start a sampler if --profile-out was given."""
+    if args.profile_out is None:
+        return None
+    sampler = StackSampler(args.profile_out, args.profile_interval_ms / 1000)
+    sampler.start()
+    return sampler
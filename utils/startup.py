@@ -0,0 +1,142 @@
+"""
+Server start-up phases and when the record pool is built.
+
+With `--startup-log PATH` a server appends one JSON line per phase,
+`{"phase", "ts", "pid", ...}` with `ts` in perf_counter_ns (comparable
+across processes):
+
+    spawn          the orchestrator's clock just before Popen (`--spawn-ns`)
+    imported       imports done, first line of `__main__` (carries `pool_build`)
+    pool_built     the record pool (and its columnar view) exists; `build_ns`
+                   is how long building it took
+    bound          the socket accepts connections
+    port_open      the orchestrator's wait_for_port got through (it polls)
+    first_request  the first log_rpc line (also carries its `t_in`)
+
+`--pool-build` chooses when the pool is built:
+
+    eager       before binding (the default, as before)
+    lazy        by the first request that needs it, on the event loop
+    background  on a thread started before binding; requests arriving
+                earlier wait for it
+
+so readiness (spawn → bound) can be traded against first-request latency.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, Optional
+
+from utils.aggregation import ColumnarPool
+from utils.constants import PROTOTYPE_RECORD
+from utils.logger import register_rpc_tagger
+
+PHASES = ("spawn", "imported", "pool_built", "bound", "port_open", "first_request")
+POOL_BUILDS = ("eager", "lazy", "background")
+
+
+def append_phase(path: Path, phase: str, ts: int, pid: int, **extra) -> None:
+    with open(path, "a") as fh:
+        fh.write(json.dumps({"phase": phase, "ts": ts, "pid": pid, **extra}) + "\n")
+
+
+class StartupLog:
+    def __init__(self, path: Path, spawn_ns: Optional[int] = None,
+                 imported_ns: Optional[int] = None, pool_build: str = "eager"):
+        self._path = path
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        if spawn_ns is not None:
+            self.mark("spawn", spawn_ns)
+        self.mark("imported", imported_ns, pool_build=pool_build)
+        self._watch_first_request()
+
+    def mark(self, phase: str, ts: Optional[int] = None, **extra) -> None:
+        with self._lock:
+            append_phase(self._path, phase, ts or perf_counter_ns(), self._pid, **extra)
+
+    def _watch_first_request(self) -> None:
+        seen = threading.Event()
+
+        def tag(t_in: int, t_out: int, req_id: str) -> dict:
+            if not seen.is_set():
+                seen.set()
+                self.mark("first_request", t_out, t_in=t_in, req_id=req_id)
+            return {}
+
+        register_rpc_tagger(tag)
+
+
+class RecordPool:
+    """
+    `size` copies of PROTOTYPE_RECORD (and, if `columnar`, their ColumnarPool),
+    built per `build`; `on_built(build_ns)` runs once they exist.
+    """
+
+    def __init__(self, size: int, build: str = "eager", columnar: bool = False,
+                 on_built: Optional[Callable[[int], None]] = None):
+        if build not in POOL_BUILDS:
+            raise ValueError(f"unknown pool build {build!r}")
+        self.size = size
+        self.build = build
+        self._columnar = columnar
+        self._on_built = on_built
+        self._records = None
+        self._columns = None
+        self._lock = threading.Lock()
+        if build == "eager":
+            self._build()
+        elif build == "background":
+            threading.Thread(target=self._build, name="pool-build", daemon=True).start()
+
+    def _build(self) -> None:
+        # lazy: the first caller builds; background: callers block here until the thread is done
+        with self._lock:
+            if self._records is not None:
+                return
+            t_start = perf_counter_ns()
+            records = [PROTOTYPE_RECORD.copy() for _ in range(self.size)]
+            if self._columnar:
+                self._columns = ColumnarPool(records)
+            self._records = records
+            if self._on_built is not None:
+                self._on_built(perf_counter_ns() - t_start)
+
+    @property
+    def records(self) -> list:
+        if self._records is None:
+            self._build()
+        return self._records
+
+    @property
+    def columns(self) -> ColumnarPool:
+        if self._records is None:
+            self._build()
+        return self._columns
+
+
+def add_startup_args(ap) -> None:
+    ap.add_argument("--startup-log", type=Path,
+                    help="Append one JSON line per start-up phase to this file")
+    ap.add_argument("--spawn-ns", type=int,
+                    help="perf_counter_ns at which the launcher spawned this process")
+    ap.add_argument("--pool-build", choices=POOL_BUILDS, default="eager",
+                    help="When to build the record pool (default: %(default)s)")
+
+
+def startup_from_args(args, imported_ns: int) -> Optional[StartupLog]:
+    if args.startup_log is None:
+        return None
+    return StartupLog(args.startup_log, args.spawn_ns, imported_ns, args.pool_build)
+
+
+def record_pool(size: int, build: str, startup_log: Optional[StartupLog],
+                columnar: bool = False) -> RecordPool:
+    """RecordPool that marks `pool_built` in `startup_log`, if given."""
+    on_built = None
+    if startup_log is not None:
+        on_built = lambda build_ns: startup_log.mark("pool_built", build_ns=build_ns)  # noqa: E731
+    return RecordPool(size, build, columnar, on_built)
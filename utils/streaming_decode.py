@@ -0,0 +1,128 @@
+"""
+Incremental decoders for `/records` bodies that are still arriving.
+
+Both take the body in arbitrary chunks (`feed`), decode every record that
+became complete and return how many did, so a streaming client can decode
+while the rest of the body is on the wire instead of after the last byte.
+Decoded records accumulate in `.records`.
+
+* `JsonRecordStream`  – `{"records": [ {...}, {...}, ... ]}`; each record is
+  pulled out with `json.JSONDecoder.raw_decode` as soon as its closing brace
+  has arrived.
+* `ProtoRecordStream` – a serialised `RecordListResponse`, i.e. a run of
+  length-delimited field-1 entries (tag 0x0a, varint length, Record bytes).
+  Only the entry boundaries are walked in Python; the complete prefix of each
+  chunk is parsed in one `MergeFromString` call.
+"""
+
+import codecs
+import json
+import resource
+import sys
+from typing import List, Optional, Tuple
+
+DEFAULT_STREAM_CHUNK_BYTES = 64 * 1024
+
+_WS_AND_COMMA = " \t\r\n,"
+
+
+class JsonRecordStream:
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._in_list = False
+        self.records: List[dict] = []
+        self.done = False
+
+    def feed(self, chunk: bytes) -> int:
+        """Consume `chunk`; returns the number of records completed by it."""
+        self._buf += self._text.decode(chunk)
+        out = self.records
+        n = len(out)
+        pos = 0
+        buf = self._buf
+
+        if not self._in_list:
+            pos = buf.find("[")
+            if pos < 0:
+                return 0
+            pos += 1
+            self._in_list = True
+
+        while not self.done:
+            while pos < len(buf) and buf[pos] in _WS_AND_COMMA:
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                self.done = True
+                break
+            try:
+                record, pos = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break              # record is cut off – wait for more bytes
+            out.append(record)
+
+        self._buf = buf[pos:]
+        return len(out) - n
+
+
+def _read_varint(buf, pos: int) -> Optional[Tuple[int, int]]:
+    """Decode a base-128 varint at `pos`; None if it runs past the buffer."""
+    result = shift = 0
+    while pos < len(buf):
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+    return None
+
+
+class ProtoRecordStream:
+    _RECORDS_TAG = 0x0A          # field 1, wire type 2 (length-delimited)
+
+    def __init__(self, message):
+        """`message` is an empty RecordListResponse that receives the records."""
+        self._message = message
+        self._buf = bytearray()
+        self.records = message.records
+
+    def feed(self, chunk: bytes) -> int:
+        """Consume `chunk`; returns the number of records completed by it."""
+        self._buf += chunk
+        buf = self._buf
+        n = 0
+        pos = 0
+        while pos < len(buf):
+            if buf[pos] != self._RECORDS_TAG:
+                raise ValueError(f"unexpected tag 0x{buf[pos]:02x} at byte {pos}")
+            header = _read_varint(buf, pos + 1)
+            if header is None:
+                break
+            length, start = header
+            end = start + length
+            if end > len(buf):
+                break
+            n += 1
+            pos = end
+
+        if pos:
+            with memoryview(buf) as view:
+                self._message.MergeFromString(view[:pos])
+            del buf[:pos]
+        return n
+
+    @property
+    def done(self) -> bool:
+        """True when no partial record is buffered (check after the last chunk)."""
+        return not self._buf
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -3,7 +3,7 @@ import json
 from pathlib import Path
 
 
-def write_timeline_anchor(file_path: str, mode: str, size: int) -> None:
+def write_timeline_anchor(file_path: str, mode: str, size: int, **extra) -> None:
     """
     Write out a JSON‐line “timeline anchor” tying perf_counter_ns()
     to epoch time.
@@ -12,6 +12,7 @@ def write_timeline_anchor(file_path: str, mode: str, size: int) -> None:
         file_path: where to write the .jsonl anchor
         mode:     e.g. "grpc" or "rest_proto"
         size:      the current workload size
+        extra:     run-wide settings to record with the anchor (e.g. netem_*)
     """
     perf_base_ns = time.perf_counter_ns()
     epoch_base_ns = time.time_ns()
@@ -23,5 +24,6 @@ def write_timeline_anchor(file_path: str, mode: str, size: int) -> None:
             "size":          size,
             "perf_base_ns":  perf_base_ns,
             "epoch_base_ns": epoch_base_ns,
+            **extra,
         }, fh)
         fh.write("\n")
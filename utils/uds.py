@@ -0,0 +1,118 @@
+"""
+Unix domain socket transport (`--uds PATH`).
+
+Servers bind the socket file instead of host:port, and clients reach them
+through it: gRPC via a `unix:` target, the REST clients via a requests
+adapter whose connections are AF_UNIX sockets, the raw TCP client via a
+plain AF_UNIX socket. URLs and Host headers stay as they are; only the
+transport under HTTP / HTTP/2 changes.
+
+Every log line carries `transport` ("tcp" / "uds"), so runs over both can
+be compared side by side.
+"""
+
+import os
+import socket
+from pathlib import Path
+from typing import Optional
+
+import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+from utils.logger import register_client_tagger, register_rpc_tagger
+
+TRANSPORTS = ("tcp", "uds")
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, *args, uds_path: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._uds_path = uds_path
+
+    def _new_conn(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        sock.connect(self._uds_path)
+        return sock
+
+
+class _UnixHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _UnixHTTPConnection
+
+    def __init__(self, uds_path: str, **kwargs):
+        super().__init__("localhost", **kwargs)
+        self.conn_kw["uds_path"] = uds_path
+
+
+class UnixHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that sends every request over the Unix socket at `uds_path`."""
+
+    def __init__(self, uds_path, **kwargs):
+        self._uds_path = str(uds_path)
+        self._maxsize = kwargs.get("pool_maxsize", DEFAULT_POOLSIZE)
+        self._pool = None
+        super().__init__(**kwargs)
+
+    def _unix_pool(self) -> _UnixHTTPConnectionPool:
+        if self._pool is None:
+            self._pool = _UnixHTTPConnectionPool(self._uds_path, maxsize=self._maxsize)
+        return self._pool
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._unix_pool()
+
+    def get_connection(self, url, proxies=None):
+        return self._unix_pool()
+
+    def close(self) -> None:
+        super().close()
+        if self._pool is not None:
+            self._pool.close()
+
+
+def http_client(uds_path: Optional[Path] = None):
+    """`requests` itself over TCP, or a Session sending every http:// request over `uds_path`."""
+    if uds_path is None:
+        return requests
+    session = requests.Session()
+    session.mount("http://", UnixHTTPAdapter(uds_path))
+    return session
+
+
+def http_adapter(uds_path: Optional[Path] = None, **kwargs) -> HTTPAdapter:
+    """HTTPAdapter(**kwargs), over `uds_path` when one is given."""
+    if uds_path is None:
+        return HTTPAdapter(**kwargs)
+    return UnixHTTPAdapter(uds_path, **kwargs)
+
+
+def grpc_target(host: str, port: int, uds_path: Optional[Path] = None) -> str:
+    return f"unix:{uds_path}" if uds_path is not None else f"{host}:{port}"
+
+
+def remove_stale_socket(uds_path: Path) -> None:
+    """Unlink a socket file left behind by a server that did not shut down cleanly."""
+    path = Path(uds_path)
+    if path.is_socket():
+        os.unlink(path)
+
+
+def add_uds_args(ap) -> None:
+    ap.add_argument("--uds", type=Path, metavar="PATH",
+                    help="Use this Unix domain socket instead of TCP host:port")
+
+
+def tag_transport(side: str, uds_path: Optional[Path]) -> str:
+    """Tag every log line of `side` ("server" / "client") with the transport in use."""
+    transport = "uds" if uds_path is not None else "tcp"
+    fields = {"transport": transport}
+    if side == "server":
+        register_rpc_tagger(lambda t_in, t_out, req_id: fields)
+    elif side == "client":
+        register_client_tagger(lambda t0, t_res, req_id: fields)
+    else:
+        raise ValueError("side must be 'server' or 'client'")
+    return transport
@@ -0,0 +1,79 @@
+"""
+Attribute pid_monitor samples to request windows.
+
+pid_monitor writes one sample per interval: `ts` (perf_counter_ns, the clock
+of the request logs), `rss`, and `cpu`, the CPU percent since the previous
+sample of the same process. Sample i therefore covers (ts[i-1], ts[i]] and
+contributes cpu[i] / 100 × (ts[i] − ts[i-1]) ns of CPU time.
+
+`prepare_samples` turns a series into a running CPU-time counter. The CPU a
+process spent in a window [a, b] is then counter(b) − counter(a), with the
+counter interpolated linearly between samples (`np.interp`). The peak RSS
+growth over a window is the largest RSS sampled inside it (`np.maximum.reduceat`)
+minus the RSS of the last sample before it (`np.searchsorted`). Both cost
+O((samples + windows) · log samples) and need no per-request Python loop.
+
+The numbers are the process's, not the request's: requests that overlap in
+time each see all of the CPU spent during their window.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def prepare_samples(samples: pd.DataFrame) -> pd.DataFrame:
+    """
+    Samples sorted by `ts` with a running `cpu_ns_cum` counter. The first
+    sample of each pid adds nothing, since its interval started at the
+    monitor's priming call, not at the previous sample.
+    """
+    samples = samples.sort_values("ts", kind="stable").reset_index(drop=True)
+    dt = samples["ts"].diff().fillna(0).to_numpy()
+    if "pid" in samples.columns:
+        dt[samples["pid"].ne(samples["pid"].shift()).to_numpy()] = 0
+    samples["cpu_ns_cum"] = np.cumsum(samples["cpu"].to_numpy() / 100 * dt)
+    return samples
+
+
+def attribute(samples: pd.DataFrame, start: np.ndarray, end: np.ndarray) -> pd.DataFrame:
+    """
+    Per window [start[i], end[i]]: CPU-seconds, peak RSS growth (bytes) and
+    the number of samples inside it. `samples` comes from `prepare_samples`.
+    Windows outside the sampled span get NaN. So does the RSS growth of a
+    window too short to contain a sample.
+    """
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+    ts = samples["ts"].to_numpy(np.float64)
+    cum = samples["cpu_ns_cum"].to_numpy()
+    rss = samples["rss"].to_numpy(np.float64)
+
+    cpu_s = (np.interp(end, ts, cum) - np.interp(start, ts, cum)) / 1e9
+    covered = (end >= ts[0]) & (start <= ts[-1])
+    cpu_s[~covered] = np.nan
+
+    lo = np.searchsorted(ts, start, side="left")       # first sample in the window
+    hi = np.searchsorted(ts, end, side="right")        # one past the last one
+    inside = hi - lo
+
+    # max over rss[lo:hi] for all windows at once: reduceat over interleaved
+    # (lo, hi) bounds. The odd slots reduce the gap up to the next window;
+    # taking windows in lo order keeps those gaps disjoint, so they add at
+    # most one pass over the samples on top of the windows themselves.
+    order = np.argsort(lo, kind="stable")
+    bounds = np.empty(2 * len(order), dtype=np.intp)
+    bounds[0::2] = lo[order]
+    bounds[1::2] = hi[order]
+    peak = np.full(len(start), np.nan)
+    if len(bounds):
+        padded = np.append(rss, np.nan)                # lo / hi may point one past the end
+        peak[order] = np.maximum.reduceat(padded, bounds)[0::2]
+
+    before = np.where(lo > 0, rss[np.maximum(lo - 1, 0)], np.nan)
+    rss_peak_delta = np.where(inside > 0, peak - before, np.nan)
+
+    return pd.DataFrame({
+        "cpu_s": cpu_s,
+        "rss_peak_delta_bytes": rss_peak_delta,
+        "samples": inside,
+    })